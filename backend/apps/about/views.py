@@ -1,36 +1,16 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
+from apps.utils.cache import content_cache
 from apps.utils.mongo import get_mongo_db, mongo_log
+from apps.utils.responses import cached_json_response
+from apps.utils.serialization import serialize_mongo_doc
 from apps.utils.views import ReloadMixin
 from bson.objectid import ObjectId
 import datetime
 import traceback
 
 
-def serialize_mongo_doc(doc):
-    """Recursively convert MongoDB document to JSON-safe dict."""
-    if doc is None:
-        return None
-    if isinstance(doc, list):
-        return [serialize_mongo_doc(i) for i in doc]
-    if isinstance(doc, dict):
-        result = {}
-        for k, v in doc.items():
-            if k == '_id':
-                result['id'] = str(v)
-            elif isinstance(v, ObjectId):
-                result[k] = str(v)
-            elif isinstance(v, datetime.datetime):
-                result[k] = v.isoformat()
-            elif isinstance(v, (dict, list)):
-                result[k] = serialize_mongo_doc(v)
-            else:
-                result[k] = v
-        return result
-    return doc
-
-
 class AboutViewSet(ReloadMixin, viewsets.ViewSet):
     """
     Pure MongoDB ViewSet for About content.
@@ -51,12 +31,13 @@ class AboutViewSet(ReloadMixin, viewsets.ViewSet):
         db = get_mongo_db()
         return db['about'] if db is not None else None
 
+    @cached_json_response('about')
     def list(self, request):
         try:
             coll = self._coll()
             if coll is None:
                 return Response({"error": "Database not connected"}, status=503)
-            items = [serialize_mongo_doc(i) for i in coll.find()]
+            items = list(coll.find())
             return Response(items)
         except Exception as e:
             print(traceback.format_exc())
@@ -91,6 +72,7 @@ class AboutViewSet(ReloadMixin, viewsets.ViewSet):
 
             res = coll.insert_one(data)
             data['_id'] = res.inserted_id
+            content_cache.bump('about')
             mongo_log('about_logs', {'action': 'create', 'id': str(res.inserted_id)})
             return Response(serialize_mongo_doc(data), status=201)
         except Exception as e:
@@ -116,6 +98,7 @@ class AboutViewSet(ReloadMixin, viewsets.ViewSet):
                 return Response({"detail": "Not found."}, status=404)
 
             item = coll.find_one(query)
+            content_cache.bump('about')
             mongo_log('about_logs', {'action': 'update', 'id': pk})
             return Response(serialize_mongo_doc(item))
         except Exception as e:
@@ -136,6 +119,7 @@ class AboutViewSet(ReloadMixin, viewsets.ViewSet):
             if result.deleted_count == 0:
                 return Response({"detail": "Not found."}, status=404)
 
+            content_cache.bump('about')
             mongo_log('about_logs', {'action': 'delete', 'id': pk})
             return Response({"message": "Deleted successfully."}, status=200)
         except Exception as e:
@@ -0,0 +1,138 @@
+"""
+DRF authentication that resolves MongoUser from JWT claims.
+Usage:
+    # settings.py
+    REST_FRAMEWORK = {
+        'DEFAULT_AUTHENTICATION_CLASSES': (
+            'apps.authentication.authentication.MongoJWTAuthentication',
+        ),
+    }
+
+simplejwt's JWTAuthentication loads a Django ORM user for every request,
+which cannot work on the mongodb_mock database. This class verifies the
+token the same way and builds a MongoUser from its claims (user_id,
+email, username, is_staff, is_superuser; see
+AllowedEmailTokenObtainPairSerializer).
+
+With JWT_USER_CACHE_SIZE > 0 (the default), the user's document is also
+checked so disabled or deleted accounts are rejected before their token
+expires. Documents are kept in a per-process LRU for JWT_USER_CACHE_TTL
+seconds, so only the first request per user and window reads Mongo.
+Entries are also dropped when the 'users' version in content_cache moves:
+seed_users bumps it, and so does the invalidation bus for any write to
+the collection. Set JWT_USER_CACHE_SIZE = 0 to trust the claims alone
+(no DB access); the claims are also used while MongoDB is unreachable.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from bson.objectid import ObjectId
+from django.conf import settings
+from pymongo.errors import PyMongoError
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from apps.utils.cache import content_cache
+from apps.utils.mongo import get_mongo_db
+
+from .serializers import MongoUser
+
+# Everything MongoUser reads except the password hash
+_USER_FIELDS = {
+    'email': 1, 'username': 1, 'first_name': 1, 'last_name': 1,
+    'is_active': 1, 'is_staff': 1, 'is_superuser': 1,
+}
+_CLAIM_FIELDS = ('email', 'username', 'is_staff', 'is_superuser')
+
+_MISSING = object()
+
+
+class UserCache:
+    """
+    Bounded LRU of user_id -> users document (or None if not found), with
+    expiry. Entries are pinned to the 'users' version in content_cache.
+    """
+
+    def __init__(self, max_entries=1000, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def get(self, user_id):
+        """Return the cached document (None for a known-missing user) or _MISSING."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return _MISSING
+            doc, expires_at, version = entry
+            if expires_at <= time.monotonic() or version != content_cache.version('users'):
+                del self._entries[user_id]
+                return _MISSING
+            self._entries.move_to_end(user_id)
+            return doc
+
+    def set(self, user_id, doc, version):
+        with self._lock:
+            self._entries[user_id] = (doc, time.monotonic() + self.ttl, version)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id=None):
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+
+user_cache = UserCache(
+    max_entries=getattr(settings, 'JWT_USER_CACHE_SIZE', 1000),
+    ttl=getattr(settings, 'JWT_USER_CACHE_TTL', 300),
+)
+
+
+def load_user_doc(user_id):
+    """Users document for a token's user_id through user_cache; _MISSING if Mongo is down."""
+    doc = user_cache.get(user_id)
+    if doc is not _MISSING:
+        return doc
+    db = get_mongo_db()
+    if db is None:
+        return _MISSING
+    # Read the version first so a write racing the lookup still invalidates it
+    version = content_cache.version('users')
+    key = ObjectId(user_id) if ObjectId.is_valid(user_id) else user_id
+    try:
+        doc = db['users'].find_one({'_id': key}, _USER_FIELDS)
+    except PyMongoError as e:
+        print(f"[MongoDB] Could not load user {user_id}, using token claims: {e}")
+        return _MISSING
+    user_cache.set(user_id, doc, version)
+    return doc
+
+
+class MongoJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if not user_id:
+            raise InvalidToken("Token contained no recognizable user identification")
+        user_id = str(user_id)
+
+        doc = load_user_doc(user_id) if user_cache.enabled else _MISSING
+        if doc is _MISSING:
+            doc = {claim: validated_token[claim] for claim in _CLAIM_FIELDS if claim in validated_token}
+        elif doc is None:
+            raise AuthenticationFailed("User not found", code='user_not_found')
+        elif not doc.get('is_active', True):
+            raise AuthenticationFailed("User is inactive", code='user_inactive')
+
+        return MongoUser(dict(doc, _id=user_id))
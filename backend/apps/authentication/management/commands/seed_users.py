@@ -10,7 +10,10 @@ their correct hashed passwords, storing them in the 'users' MongoDB collection.
 
 from django.core.management.base import BaseCommand
 from django.contrib.auth.hashers import make_password
-from django.conf import settings
+from apps.authentication.authentication import user_cache
+from apps.utils.cache import content_cache
+from apps.utils.lookup_keys import with_lookup_keys
+from apps.utils.mongo import get_mongo_db
 import datetime
 
 
@@ -67,14 +70,13 @@ class Command(BaseCommand):
     help = "Seed or update Zsyio team users in MongoDB with correct passwords."
 
     def handle(self, *args, **kwargs):
-        client = getattr(settings, 'MONGO_CLIENT', None)
-        if not client:
+        db = get_mongo_db()
+        if db is None:
             self.stderr.write(self.style.ERROR(
                 "MongoDB not connected. Check MONGO_URI in your .env file."
             ))
             return
 
-        db = client['zsyio_db']
         users_collection = db['users']
 
         for user_data in ZSYIO_USERS:
@@ -82,12 +84,12 @@ class Command(BaseCommand):
             raw_password = user_data.pop('password')
             hashed_password = make_password(raw_password)
 
-            update_doc = {
+            update_doc = with_lookup_keys('users', {
                 **user_data,
                 "password": hashed_password,
                 "is_active": True,
                 "updated_at": datetime.datetime.utcnow(),
-            }
+            })
 
             result = users_collection.update_one(
                 {"email": email},
@@ -103,6 +105,10 @@ class Command(BaseCommand):
             else:
                 self.stdout.write(self.style.SUCCESS(f"  🔄 Updated: {email}"))
 
+        # is_active / is_staff may have changed: drop cached user documents
+        content_cache.bump('users')
+        user_cache.invalidate()
+
         self.stdout.write(self.style.SUCCESS(
             "\n✅ All 5 Zsyio team users seeded/updated successfully!"
         ))
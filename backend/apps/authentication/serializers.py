@@ -10,6 +10,8 @@ from rest_framework import serializers
 from django.contrib.auth.hashers import check_password
 from django.conf import settings
 from bson.objectid import ObjectId
+from apps.utils.lookup_keys import lookup_filter
+from apps.utils.mongo import get_mongo_db
 import datetime
 
 
@@ -17,9 +19,9 @@ import datetime
 # Helper: Get MongoDB users collection
 # -----------------------------------------------------------------
 def _get_users_collection():
-    client = getattr(settings, 'MONGO_CLIENT', None)
-    if client:
-        return client['zsyio_db']['users']
+    db = get_mongo_db()
+    if db is not None:
+        return db['users']
     return None
 
 
@@ -94,11 +96,8 @@ class AllowedEmailTokenObtainPairSerializer(serializers.Serializer):
                 {"detail": "Database not available. Please try again later."}
             )
 
-        doc = coll.find_one({"email": email})
-        if not doc:
-            # Also try case-insensitive match
-            import re
-            doc = coll.find_one({"email": re.compile(f"^{re.escape(email)}$", re.I)})
+        # Exact or normalized (email_key) match, both served by an index
+        doc = coll.find_one(lookup_filter('users', email))
 
         if not doc:
             raise serializers.ValidationError(
@@ -122,6 +121,9 @@ class AllowedEmailTokenObtainPairSerializer(serializers.Serializer):
         refresh['user_id'] = user.id
         refresh['email'] = user.email
         refresh['username'] = user.username
+        # Read by MongoJWTAuthentication, so permission checks need no DB lookup
+        refresh['is_staff'] = user.is_staff
+        refresh['is_superuser'] = user.is_superuser
 
         access = refresh.access_token
 
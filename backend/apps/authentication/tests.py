@@ -0,0 +1,64 @@
+from unittest import mock
+
+from bson.objectid import ObjectId
+from django.test import SimpleTestCase
+from pymongo.errors import ServerSelectionTimeoutError
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.utils.cache import content_cache
+from .authentication import MongoJWTAuthentication, user_cache
+
+
+def access_token(user_id, **claims):
+    token = AccessToken()
+    token['user_id'] = user_id
+    for name, value in claims.items():
+        token[name] = value
+    return token
+
+
+class MongoJWTAuthenticationTests(SimpleTestCase):
+    def setUp(self):
+        self.user_id = str(ObjectId())
+        self.db = mock.MagicMock()
+        self.users = self.db.__getitem__.return_value
+        patcher = mock.patch('apps.authentication.authentication.get_mongo_db', return_value=self.db)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        user_cache.invalidate()
+        self.addCleanup(user_cache.invalidate)
+
+    def get_user(self, **claims):
+        return MongoJWTAuthentication().get_user(access_token(self.user_id, **claims))
+
+    def test_user_document_is_cached(self):
+        self.users.find_one.return_value = {'email': 'a@zsyio.com', 'is_staff': True}
+        self.assertTrue(self.get_user().is_staff)
+        self.assertTrue(self.get_user().is_staff)
+        self.assertEqual(self.users.find_one.call_count, 1)
+
+    def test_users_version_bump_invalidates_cache(self):
+        self.users.find_one.return_value = {'email': 'a@zsyio.com', 'is_active': True}
+        self.get_user()
+        self.users.find_one.return_value = {'email': 'a@zsyio.com', 'is_active': False}
+        content_cache.bump('users')
+        with self.assertRaises(AuthenticationFailed):
+            self.get_user()
+
+    def test_unknown_user_is_rejected(self):
+        self.users.find_one.return_value = None
+        with self.assertRaises(AuthenticationFailed):
+            self.get_user()
+
+    def test_claims_are_used_when_mongo_is_unreachable(self):
+        self.users.find_one.side_effect = ServerSelectionTimeoutError('down')
+        user = self.get_user(email='a@zsyio.com', is_staff=True)
+        self.assertEqual(user.id, self.user_id)
+        self.assertTrue(user.is_staff)
+
+    def test_claims_only_without_cache(self):
+        with mock.patch.object(user_cache, 'max_entries', 0):
+            user = self.get_user(email='a@zsyio.com')
+        self.assertEqual(user.email, 'a@zsyio.com')
+        self.users.find_one.assert_not_called()
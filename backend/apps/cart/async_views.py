@@ -0,0 +1,16 @@
+"""
+Async GET handlers for the cart app (enabled by ASYNC_MONGO_VIEWS,
+see apps.utils.async_views). Responses match CartViewSet.list.
+"""
+
+from apps.utils.async_mongo import get_async_mongo_db
+from apps.utils.async_views import json_response
+
+
+async def cart_list(request):
+    db = get_async_mongo_db()
+    if db is None:
+        return json_response([])
+    # CartViewSet disables authentication, so every cart belongs to "anonymous"
+    carts = await db['carts'].find({"user_id": "anonymous"}).to_list(None)
+    return json_response(carts)
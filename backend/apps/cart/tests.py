@@ -1,3 +1,197 @@
-from django.test import TestCase
+import copy
+from unittest import mock
 
-# Create your tests here.
+from bson.objectid import ObjectId
+from django.test import SimpleTestCase
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from rest_framework.test import APIRequestFactory
+
+from .views import CartViewSet, _add_item_pipeline
+
+
+def _path(value, path):
+    for part in path.split('.') if path else ():
+        if isinstance(value, list):
+            value = [v[part] for v in value if isinstance(v, dict) and part in v]
+        else:
+            value = value.get(part) if isinstance(value, dict) else None
+    return value
+
+
+def evaluate(expr, doc, variables=None):
+    """The subset of the aggregation expression language _add_item_pipeline uses."""
+    variables = variables or {}
+    if isinstance(expr, str) and expr.startswith('$$'):
+        name, _, path = expr[2:].partition('.')
+        return _path(variables[name], path)
+    if isinstance(expr, str) and expr.startswith('$'):
+        return _path(doc, expr[1:])
+    if isinstance(expr, list):
+        return [evaluate(e, doc, variables) for e in expr]
+    if not isinstance(expr, dict):
+        return expr
+    if len(expr) != 1 or not next(iter(expr)).startswith('$'):
+        return {k: evaluate(v, doc, variables) for k, v in expr.items()}
+
+    (op, args), = expr.items()
+    if op == '$literal':
+        return args
+    if op == '$cond':
+        condition, then, otherwise = args
+        return evaluate(then if evaluate(condition, doc, variables) else otherwise, doc, variables)
+    if op == '$map':
+        return [
+            evaluate(args['in'], doc, {**variables, args['as']: item})
+            for item in evaluate(args['input'], doc, variables)
+        ]
+    values = evaluate(args, doc, variables)
+    if op == '$isArray':
+        return isinstance(values, list)
+    if op == '$ifNull':
+        return values[0] if values[0] is not None else values[1]
+    if op == '$in':
+        return values[0] in values[1]
+    if op == '$eq':
+        return values[0] == values[1]
+    if op == '$add':
+        return sum(values)
+    if op == '$toInt':
+        return int(values)
+    if op == '$mergeObjects':
+        return {k: v for obj in values for k, v in obj.items()}
+    if op == '$concatArrays':
+        return [item for array in values for item in array]
+    raise NotImplementedError(op)
+
+
+class FakeCarts:
+    """find_one_and_update over in-memory documents with a unique user_id."""
+
+    def __init__(self):
+        self.docs = []
+        self.racing_doc = None   # inserted by a "concurrent" request on the next upsert
+
+    def find_one_and_update(self, query, pipeline, upsert=False, return_document=None):
+        doc = next((d for d in self.docs if d['user_id'] == query['user_id']), None)
+        if doc is None:
+            if not upsert:
+                return None
+            if self.racing_doc is not None:
+                self.docs.append(self.racing_doc)
+                self.racing_doc = None
+                raise DuplicateKeyError('E11000 duplicate key error: user_id')
+            doc = {'_id': ObjectId(), **query}
+            self.docs.append(doc)
+        for stage in pipeline:
+            doc.update({field: evaluate(expr, doc) for field, expr in stage['$set'].items()})
+        return copy.deepcopy(doc)
+
+
+class CartAddItemTests(SimpleTestCase):
+    def setUp(self):
+        self.carts = mock.MagicMock()
+        self.carts.find_one_and_update.return_value = {'_id': 'cart-1', 'user_id': 'anonymous', 'items': []}
+        db = mock.MagicMock()
+        db.__getitem__.return_value = self.carts
+        for patcher in (
+            mock.patch('apps.cart.views.get_mongo_db', return_value=db),
+            mock.patch('apps.cart.views.mongo_log'),
+            mock.patch('apps.cart.views.service_index', {'seo': {'title': 'SEO'}}),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def add_item(self, data):
+        request = APIRequestFactory().post('/api/cart/add_item/', data, format='json')
+        return CartViewSet.as_view({'post': 'add_item'})(request)
+
+    def test_add_item_is_one_upsert(self):
+        response = self.add_item({'service_slug': 'seo', 'quantity': '2'})
+
+        self.assertEqual(response.status_code, 200)
+        self.carts.find_one.assert_not_called()
+        self.carts.update_one.assert_not_called()
+        self.carts.find_one_and_update.assert_called_once()
+        (query, pipeline), kwargs = self.carts.find_one_and_update.call_args
+        self.assertEqual(query, {'user_id': 'anonymous'})
+        self.assertEqual(kwargs, {'upsert': True, 'return_document': ReturnDocument.AFTER})
+        new_item = pipeline[1]['$set']['items']['$cond'][2]['$concatArrays'][1][0]
+        self.assertEqual(new_item, {
+            'service_slug': {'$literal': 'seo'}, 'service_title': {'$literal': 'SEO'}, 'quantity': 2,
+        })
+
+    def test_lost_creation_race_retries_without_upsert(self):
+        self.carts.find_one_and_update.side_effect = [
+            DuplicateKeyError('user_id'), {'_id': 'cart-1', 'user_id': 'anonymous', 'items': []},
+        ]
+        response = self.add_item({'service_slug': 'seo'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.carts.find_one_and_update.call_count, 2)
+        self.assertNotIn('upsert', self.carts.find_one_and_update.call_args.kwargs)
+
+    def test_missing_slug_is_400(self):
+        self.assertEqual(self.add_item({'quantity': 1}).status_code, 400)
+        self.carts.find_one_and_update.assert_not_called()
+
+    def test_request_values_are_literals(self):
+        pipeline = _add_item_pipeline('$items', '$where', 1)
+        slug = {'$literal': '$items'}
+        condition, _, append = pipeline[1]['$set']['items']['$cond']
+        self.assertEqual(condition, {'$in': [slug, '$items.service_slug']})
+        self.assertEqual(append['$concatArrays'][1][0]['service_title'], {'$literal': '$where'})
+
+
+class CartPipelineTests(SimpleTestCase):
+    """Runs _add_item_pipeline against FakeCarts instead of asserting its shape."""
+
+    def setUp(self):
+        self.carts = FakeCarts()
+        db = mock.MagicMock()
+        db.__getitem__.return_value = self.carts
+        for patcher in (
+            mock.patch('apps.cart.views.get_mongo_db', return_value=db),
+            mock.patch('apps.cart.views.mongo_log'),
+            mock.patch('apps.cart.views.service_index', {'seo': {'title': 'SEO'}, 'web': {'title': 'Web'}}),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def add_item(self, slug, quantity=1):
+        request = APIRequestFactory().post('/api/cart/add_item/', {'service_slug': slug, 'quantity': quantity}, format='json')
+        response = CartViewSet.as_view({'post': 'add_item'})(request)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_second_add_increments_quantity(self):
+        self.add_item('seo', 2)
+        cart = self.add_item('seo', 3)
+
+        self.assertEqual(len(self.carts.docs), 1)
+        self.assertEqual(cart['items'], [{'service_slug': 'seo', 'service_title': 'SEO', 'quantity': 5}])
+        self.assertIn('created_at', cart)
+
+    def test_other_slug_is_appended(self):
+        self.add_item('seo')
+        cart = self.add_item('web', 2)
+        self.assertEqual([(i['service_slug'], i['quantity']) for i in cart['items']], [('seo', 1), ('web', 2)])
+
+    def test_legacy_string_quantity_is_incremented(self):
+        self.carts.docs.append({'_id': ObjectId(), 'user_id': 'anonymous', 'items': [
+            {'service_slug': 'seo', 'service_title': 'SEO', 'quantity': '2'},
+        ]})
+        self.assertEqual(self.add_item('seo')['items'][0]['quantity'], 3)
+
+    def test_lost_creation_race_increments_winners_cart(self):
+        self.carts.racing_doc = {'_id': ObjectId(), 'user_id': 'anonymous', 'items': [
+            {'service_slug': 'seo', 'service_title': 'SEO', 'quantity': 1},
+        ]}
+        cart = self.add_item('seo', 2)
+
+        self.assertEqual(len(self.carts.docs), 1)
+        self.assertEqual(cart['items'], [{'service_slug': 'seo', 'service_title': 'SEO', 'quantity': 3}])
+
+    def test_dollar_slug_is_stored_literally(self):
+        cart = self.add_item('$items')
+        self.assertEqual(cart['items'][0]['service_slug'], '$items')
@@ -1,5 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from apps.utils.async_views import async_get
+from . import async_views
 from .views import CartViewSet
 
 router = DefaultRouter()
@@ -8,5 +10,6 @@ router.register(r'', CartViewSet, basename='cart')
 urlpatterns = [
     path('add_item/', CartViewSet.as_view({'post': 'add_item'}), name='cart-add-item'),
     path('clear/', CartViewSet.as_view({'delete': 'clear'}), name='cart-clear'),
+    path('', async_get(CartViewSet.as_view({'get': 'list'}), async_views.cart_list), name='cart-root'),
     path('', include(router.urls)),
 ]
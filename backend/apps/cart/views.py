@@ -2,35 +2,56 @@ from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.parsers import JSONParser, FormParser, MultiPartParser
+from apps.services.lookup import service_index
 from apps.utils.mongo import get_mongo_db, mongo_log
+from apps.utils.serialization import serialize_mongo_doc
 from bson.objectid import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 import datetime
-import re
 import traceback
 import json
 
 
-def serialize_mongo_doc(doc):
-    """Recursively convert MongoDB types to JSON-serializable formats."""
-    if doc is None:
-        return None
-    if isinstance(doc, list):
-        return [serialize_mongo_doc(item) for item in doc]
-    if isinstance(doc, dict):
-        new_doc = {}
-        for k, v in doc.items():
-            if k == '_id':
-                new_doc['id'] = str(v)
-            elif isinstance(v, ObjectId):
-                new_doc[k] = str(v)
-            elif isinstance(v, datetime.datetime):
-                new_doc[k] = v.isoformat()
-            elif isinstance(v, (list, dict)):
-                new_doc[k] = serialize_mongo_doc(v)
-            else:
-                new_doc[k] = v
-        return new_doc
-    return doc
+def _add_item_pipeline(service_slug, service_title, quantity):
+    """
+    Update pipeline that increments `quantity` on the item matching
+    `service_slug`, or appends a new item when there is none. Running it
+    server-side keeps concurrent add_item calls from overwriting each other.
+    Request values are wrapped in $literal so a leading '$' is not read as a
+    field path.
+    """
+    now = datetime.datetime.utcnow()
+    slug = {"$literal": service_slug}
+    new_item = {
+        "service_slug": slug,
+        "service_title": {"$literal": service_title},
+        "quantity": quantity,
+    }
+    return [
+        {"$set": {
+            "items": {"$cond": [{"$isArray": "$items"}, "$items", []]},
+            "created_at": {"$ifNull": ["$created_at", now]},
+            "updated_at": now,
+        }},
+        {"$set": {
+            "items": {"$cond": [
+                {"$in": [slug, "$items.service_slug"]},
+                {"$map": {
+                    "input": "$items",
+                    "as": "item",
+                    "in": {"$cond": [
+                        {"$eq": ["$$item.service_slug", slug]},
+                        {"$mergeObjects": ["$$item", {"quantity": {
+                            "$add": [{"$toInt": {"$ifNull": ["$$item.quantity", 0]}}, quantity]
+                        }}]},
+                        "$$item",
+                    ]},
+                }},
+                {"$concatArrays": ["$items", [new_item]]},
+            ]},
+        }},
+    ]
 
 
 class CartViewSet(viewsets.ViewSet):
@@ -55,7 +76,7 @@ class CartViewSet(viewsets.ViewSet):
         if db is None:
             return Response([])
         user_id = str(request.user.id) if request.user.is_authenticated else "anonymous"
-        carts = [serialize_mongo_doc(c) for c in db['carts'].find({"user_id": user_id})]
+        carts = list(db['carts'].find({"user_id": user_id}))
         return Response(carts)
 
     def retrieve(self, request, pk=None):
@@ -121,52 +142,25 @@ class CartViewSet(viewsets.ViewSet):
             # --- Find service in MongoDB (optional lookup for title) ---
             service_title = str(get_val('service_title', '')).strip()
             if not service_title:
-                # Try to get title from services collection
-                service = db['services'].find_one({"slug": service_slug})
-                if not service:
-                    service = db['services'].find_one(
-                        {"slug": re.compile(f"^{re.escape(service_slug)}$", re.IGNORECASE)}
-                    )
+                # Resolve the title from the in-memory services table
+                service = service_index.get(service_slug)
                 # If not found, just use slug as title — don't block the request
-                service_title = service.get('title', service_slug) if service else service_slug
+                service_title = service['title'] if service else service_slug
 
-            # --- Get or create the user's cart ---
-            cart = db['carts'].find_one({"user_id": user_id})
-            if not cart:
-                new_cart = {
-                    "user_id": user_id,
-                    "items": [],
-                    "created_at": datetime.datetime.utcnow(),
-                    "updated_at": datetime.datetime.utcnow(),
-                }
-                result = db['carts'].insert_one(new_cart)
-                new_cart['_id'] = result.inserted_id
-                cart = new_cart
-
-            # Ensure items list is valid
-            items = cart.get('items') if isinstance(cart.get('items'), list) else []
-
-            # --- Add or increment the item ---
-            found = False
-            for item in items:
-                if item.get('service_slug') == service_slug:
-                    item['quantity'] = int(item.get('quantity', 0)) + quantity
-                    found = True
-                    break
-
-            if not found:
-                items.append({
-                    "service_slug": service_slug,
-                    "service_title": service_title,
-                    "quantity": quantity,
-                })
-
-            # --- Persist changes ---
-            db['carts'].update_one(
-                {"_id": cart['_id']},
-                {"$set": {"items": items, "updated_at": datetime.datetime.utcnow()}}
-            )
-            cart['items'] = items
+            # --- Create the cart and add/increment the item in one atomic upsert ---
+            update = _add_item_pipeline(service_slug, service_title, quantity)
+            try:
+                cart = db['carts'].find_one_and_update(
+                    {"user_id": user_id}, update,
+                    upsert=True, return_document=ReturnDocument.AFTER,
+                )
+            except DuplicateKeyError:
+                # Two first requests raced to create the cart (unique user_id
+                # index); the loser's retry now matches the winner's document
+                cart = db['carts'].find_one_and_update(
+                    {"user_id": user_id}, update,
+                    return_document=ReturnDocument.AFTER,
+                )
 
             mongo_log('cart_activity', {
                 'action': 'add_item',
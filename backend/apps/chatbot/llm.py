@@ -0,0 +1,152 @@
+"""
+Shared LLM clients and model routing for the chatbot.
+Usage:
+    from apps.chatbot.llm import llm_clients
+
+    client, route = llm_clients.get('chat')
+    client.chat.completions.create(model=route.model, messages=[...])
+
+    client, route = llm_clients.get('stream', use_async=True)   # AsyncOpenAI
+
+A route names a kind of call (plain reply, streamed reply, ...) and maps it
+to a model per provider plus its own timeouts and retry budget. The
+provider follows the API key: "sk-or-..." keys go to OpenRouter, anything
+else to OpenAI. Routes can be overridden with the CHATBOT_ROUTES setting
+(JSON in the environment), e.g.
+
+    CHATBOT_ROUTES='{"chat": {"models": {"openai": "gpt-4o-mini"}, "timeout": 20}}'
+
+Clients are created once per process (and per event loop for the async
+flavour) on top of a pooled httpx client, so chat turns reuse warm
+keep-alive connections instead of paying a new TLS handshake each time.
+The openai SDK is only imported when the first client is built; it is
+the single most expensive import in the project.
+"""
+
+import asyncio
+import os
+import threading
+import weakref
+from collections import namedtuple
+
+from django.conf import settings
+
+PROVIDERS = {
+    'openai': {'base_url': None},
+    'openrouter': {'base_url': 'https://openrouter.ai/api/v1'},
+}
+
+# timeout: seconds to wait for the response (for streams: between chunks)
+DEFAULT_ROUTES = {
+    'chat': {
+        'models': {'openai': 'gpt-4o', 'openrouter': 'google/gemini-flash-1.5-8b'},
+        'timeout': 30.0,
+        'connect_timeout': 5.0,
+        'max_retries': 1,
+    },
+    'stream': {
+        'models': {'openai': 'gpt-4o', 'openrouter': 'google/gemini-flash-1.5-8b'},
+        'timeout': 60.0,
+        'connect_timeout': 5.0,
+        'max_retries': 0,
+    },
+}
+
+Route = namedtuple('Route', ['name', 'provider', 'model', 'timeout', 'max_retries'])
+
+
+def provider_for_key(api_key):
+    return 'openrouter' if api_key.startswith('sk-or-') else 'openai'
+
+
+def load_routes(overrides=None):
+    """DEFAULT_ROUTES with CHATBOT_ROUTES merged over it, route by route."""
+    routes = {name: dict(spec, models=dict(spec['models'])) for name, spec in DEFAULT_ROUTES.items()}
+    for name, spec in (overrides or {}).items():
+        route = routes.setdefault(name, {'models': {}})
+        for key, value in spec.items():
+            if key == 'models':
+                route['models'].update(value)
+            else:
+                route[key] = value
+    return routes
+
+
+class LLMClients:
+    def __init__(self, routes, max_connections=20, max_keepalive=10, keepalive_expiry=60.0):
+        self.routes = routes
+        self.limits = {
+            'max_connections': max_connections,
+            'max_keepalive_connections': max_keepalive,
+            'keepalive_expiry': keepalive_expiry,
+        }
+        self._lock = threading.Lock()
+        self._pid = None
+        self._sync = {}
+        # AsyncOpenAI connections belong to the loop that opened them
+        self._async = weakref.WeakKeyDictionary()
+
+    def api_key(self):
+        return getattr(settings, 'OPENAI_API_KEY', None) or os.getenv('OPENAI_API_KEY')
+
+    def route(self, name, api_key):
+        import httpx
+
+        spec = self.routes.get(name)
+        if spec is None:
+            raise KeyError(f"Unknown chatbot route {name!r}")
+        provider = provider_for_key(api_key)
+        model = spec['models'].get(provider) or spec['models'].get('openai')
+        timeout = httpx.Timeout(float(spec.get('timeout', 60.0)), connect=float(spec.get('connect_timeout', 5.0)))
+        return Route(name, provider, model, timeout, int(spec.get('max_retries', 2)))
+
+    def get(self, name='chat', use_async=False):
+        """
+        Return (client, route) for a route, or (None, None) when no API key
+        is configured. The client already carries the route's timeouts.
+        """
+        api_key = self.api_key()
+        if not api_key:
+            return None, None
+        route = self.route(name, api_key)
+        with self._lock:
+            clients = self._clients_for(use_async)
+            key = (api_key, route.name)
+            client = clients.get(key)
+            if client is None:
+                base = clients.get(api_key)
+                if base is None:
+                    base = clients[api_key] = self._build(route.provider, api_key, use_async)
+                # with_options() shares the base client's connection pool
+                client = clients[key] = base.with_options(timeout=route.timeout, max_retries=route.max_retries)
+        return client, route
+
+    def _clients_for(self, use_async):
+        pid = os.getpid()
+        if pid != self._pid:
+            # Forked worker: pooled sockets belong to the parent process
+            self._sync = {}
+            self._async = weakref.WeakKeyDictionary()
+            self._pid = pid
+        if not use_async:
+            return self._sync
+        loop = asyncio.get_running_loop()
+        return self._async.setdefault(loop, {})
+
+    def _build(self, provider, api_key, use_async):
+        import httpx
+        from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+
+        base_url = PROVIDERS[provider]['base_url']
+        limits = httpx.Limits(**self.limits)
+        if use_async:
+            return AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=DefaultAsyncHttpxClient(limits=limits))
+        return OpenAI(api_key=api_key, base_url=base_url, http_client=DefaultHttpxClient(limits=limits))
+
+
+llm_clients = LLMClients(
+    load_routes(getattr(settings, 'CHATBOT_ROUTES', None)),
+    max_connections=getattr(settings, 'CHATBOT_HTTP_MAX_CONNECTIONS', 20),
+    max_keepalive=getattr(settings, 'CHATBOT_HTTP_MAX_KEEPALIVE', 10),
+    keepalive_expiry=getattr(settings, 'CHATBOT_HTTP_KEEPALIVE_EXPIRY', 60.0),
+)
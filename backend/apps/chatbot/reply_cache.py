@@ -0,0 +1,226 @@
+"""
+Reply cache for repeated chatbot questions.
+Usage:
+    from apps.chatbot.reply_cache import reply_cache
+
+    hit = reply_cache.lookup(message)      # (reply, "exact" | "semantic") or None
+    reply_cache.store(message, bot_reply)
+    reply_cache.stats()                    # hit/miss counters, size
+
+Messages are keyed on normalized text (case, punctuation and spacing
+folded), so "What services do you offer?" and "what services do you
+offer" share an entry. Entries expire after CHATBOT_CACHE_TTL seconds and
+the least recently used ones are evicted beyond CHATBOT_CACHE_MAX_ENTRIES.
+
+With CHATBOT_CACHE_SEMANTIC enabled (needs numpy), a miss on the exact key
+falls back to a local vector index: each cached question is embedded as a
+hashed bag of words and bigrams, and the closest one is reused when its
+cosine similarity reaches CHATBOT_CACHE_SIMILARITY. No embedding API is
+called, so both tiers answer in well under a millisecond.
+
+The cache is warmed from the most recent `chat_messages` on first use.
+"""
+
+import datetime
+import importlib.util
+import re
+import threading
+import time
+import unicodedata
+import zlib
+from collections import OrderedDict
+
+from django.conf import settings
+
+from apps.utils.mongo import get_mongo_db
+
+ERROR_PREFIX = "Error processing request"
+
+_WORD_RE = re.compile(r"[^\W_]+(?:'[^\W_]+)?")
+
+
+def normalize_message(message):
+    text = unicodedata.normalize('NFKC', str(message)).casefold()
+    return ' '.join(_WORD_RE.findall(text))
+
+
+class _VectorIndex:
+    """Fixed-capacity matrix of unit-length hashed text vectors, one row per slot."""
+
+    def __init__(self, capacity, dims=1024):
+        # Imported here so numpy only loads when the semantic cache is on
+        import numpy as np
+
+        self.np = np
+        self.dims = dims
+        self.matrix = np.zeros((capacity, dims), dtype=np.float32)
+        self.keys = [None] * capacity
+        self._free = list(range(capacity - 1, -1, -1))
+        self._slots = {}
+
+    def embed(self, key):
+        words = key.split()
+        features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        np = self.np
+        vector = np.zeros(self.dims, dtype=np.float32)
+        for feature in features:
+            vector[zlib.crc32(feature.encode('utf-8')) % self.dims] += 1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def add(self, key):
+        if key in self._slots or not self._free:
+            return
+        slot = self._free.pop()
+        self.matrix[slot] = self.embed(key)
+        self.keys[slot] = key
+        self._slots[key] = slot
+
+    def remove(self, key):
+        slot = self._slots.pop(key, None)
+        if slot is not None:
+            self.matrix[slot] = 0.0
+            self.keys[slot] = None
+            self._free.append(slot)
+
+    def nearest(self, key):
+        """Return (key, similarity) of the closest stored question, or (None, 0.0)."""
+        if not self._slots:
+            return None, 0.0
+        scores = self.matrix @ self.embed(key)
+        slot = int(scores.argmax())
+        return self.keys[slot], float(scores[slot])
+
+
+class ReplyCache:
+    def __init__(self, max_entries=1000, ttl=86400, semantic=False, similarity=0.92,
+                 max_message_length=500, warm_limit=500):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity = similarity
+        self.max_message_length = max_message_length
+        self.warm_limit = warm_limit
+        self._entries = OrderedDict()   # normalized message -> (reply, expires_at)
+        self._index = _VectorIndex(max_entries) if semantic and max_entries > 0 and importlib.util.find_spec('numpy') is not None else None
+        self._lock = threading.Lock()
+        self._warmed = False
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+    def _key(self, message):
+        if self.max_entries <= 0 or not isinstance(message, str) or len(message) > self.max_message_length:
+            return None
+        return normalize_message(message) or None
+
+    def lookup(self, message):
+        """Return (reply, tier) for a cached answer, or None."""
+        key = self._key(message)
+        if key is None:
+            return None
+        if not self._warmed:
+            self.warm()
+        now = time.time()
+        with self._lock:
+            tier = 'exact'
+            entry = self._live(key, now)
+            if entry is None and self._index is not None:
+                nearest, score = self._index.nearest(key)
+                if nearest is not None and score >= self.similarity:
+                    key, tier = nearest, 'semantic'
+                    entry = self._live(key, now)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            if tier == 'exact':
+                self.hits += 1
+            else:
+                self.semantic_hits += 1
+            return entry[0], tier
+
+    def store(self, message, reply, expires_at=None):
+        key = self._key(message)
+        if key is None or not isinstance(reply, str) or not reply or reply.startswith(ERROR_PREFIX):
+            return
+        with self._lock:
+            self._put(key, reply, expires_at or time.time() + self.ttl)
+
+    def _live(self, key, now):
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] <= now:
+            self._drop(key)
+            return None
+        return entry
+
+    def _put(self, key, reply, expires_at):
+        self._entries[key] = (reply, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+        # After eviction, so a full index has a free slot for the new key
+        if self._index is not None:
+            self._index.add(key)
+
+    def _drop(self, key):
+        self._entries.pop(key, None)
+        if self._index is not None:
+            self._index.remove(key)
+
+    def warm(self):
+        """Seed the cache from recent first-turn chat history (once per process)."""
+        with self._lock:
+            if self._warmed:
+                return
+            self._warmed = True
+        db = get_mongo_db()
+        if db is None or self.warm_limit <= 0:
+            return
+        try:
+            docs = list(
+                db['chat_messages']
+                # Follow-up answers depend on their conversation, like in the views
+                .find({"first_turn": True}, {"_id": 0, "user_message": 1, "bot_response": 1, "timestamp": 1})
+                .sort("timestamp", -1)
+                .limit(self.warm_limit)
+            )
+        except Exception as e:
+            print(f"[MongoDB] Could not warm chatbot reply cache: {e}")
+            return
+        now = time.time()
+        # Oldest first, so the most recent answer to a question wins
+        for doc in reversed(docs):
+            timestamp = doc.get('timestamp')
+            if not isinstance(timestamp, datetime.datetime):
+                continue
+            if timestamp.tzinfo is None:
+                # chat_messages timestamps are naive UTC (datetime.utcnow())
+                timestamp = timestamp.replace(tzinfo=datetime.timezone.utc)
+            age = now - timestamp.timestamp()
+            if age < self.ttl:
+                self.store(doc.get('user_message'), doc.get('bot_response'), expires_at=now - age + self.ttl)
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._entries):
+                self._drop(key)
+
+    def stats(self):
+        lookups = self.hits + self.semantic_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "semanticHits": self.semantic_hits,
+            "misses": self.misses,
+            "hitRate": round((self.hits + self.semantic_hits) / lookups, 4) if lookups else 0.0,
+            "semantic": self._index is not None,
+        }
+
+
+reply_cache = ReplyCache(
+    max_entries=getattr(settings, 'CHATBOT_CACHE_MAX_ENTRIES', 1000),
+    ttl=getattr(settings, 'CHATBOT_CACHE_TTL', 86400),
+    semantic=getattr(settings, 'CHATBOT_CACHE_SEMANTIC', False),
+    similarity=getattr(settings, 'CHATBOT_CACHE_SIMILARITY', 0.92),
+    warm_limit=getattr(settings, 'CHATBOT_CACHE_WARM', 500),
+)
@@ -0,0 +1,234 @@
+"""
+Catalog retrieval for chatbot prompts.
+Usage:
+    from apps.chatbot.retrieval import catalog_index
+
+    catalog_index.search("how much is a react website", k=4)
+    # [(score, "Service: Web Development - Custom web applications ..."), ...]
+
+The `services`, `technologies` and `projects` collections and the pricing
+rules (apps.estimation.rules) are flattened into short text snippets and
+indexed with BM25. Each source is its own segment: a segment is only
+re-read and re-tokenized when its version moves (the content_cache
+namespace bumped by the catalog write views, or a new pricing engine), and
+the term weights are then recomputed from the cached tokens, so a write to
+one collection never reloads the others. CHATBOT_INDEX_MAX_AGE bounds how
+stale a segment can get when versions are not shared between workers.
+"""
+
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+from bson.decimal128 import Decimal128
+from django.conf import settings
+from pymongo import DESCENDING
+
+from apps.estimation.rules import rules_store
+from apps.utils.cache import content_cache
+from apps.utils.mongo import get_mongo_db
+
+_RETRY_AFTER = 30
+_TOKEN_RE = re.compile(r"[^\W_]+")
+_PLACEHOLDER_RE = re.compile(r"\s*\([^)]*\{[^}]*\}[^)]*\)|\{[^}]*\}")
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from have how i in is it me my of on or "
+    "our the to we what which who will with you your".split()
+)
+
+
+def tokenize(text):
+    tokens = []
+    for word in _TOKEN_RE.findall(str(text).casefold()):
+        if word in STOPWORDS:
+            continue
+        # Cheap plural folding: "websites" ~ "website", "costs" ~ "cost"
+        if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+def _text(value):
+    if isinstance(value, Decimal128):
+        value = value.to_decimal()
+    if isinstance(value, (list, tuple)):
+        return ', '.join(str(v) for v in value if v)
+    return '' if value is None else str(value)
+
+
+def _join(*parts):
+    return ' '.join(part for part in parts if part)
+
+
+# ---------------------------------------------------------------------
+# Sources: version token + loader returning a list of snippets
+# ---------------------------------------------------------------------
+
+def _services(db):
+    snippets = []
+    projection = {'_id': 0, 'title': 1, 'description': 1, 'base_rate': 1, 'hourly_rate': 1}
+    for doc in db['services'].find({}, projection):
+        rates = []
+        if doc.get('base_rate') is not None:
+            rates.append(f"base rate {_text(doc['base_rate'])}")
+        if doc.get('hourly_rate') is not None:
+            rates.append(f"hourly rate {_text(doc['hourly_rate'])}")
+        snippets.append(_join(
+            f"Service: {_text(doc.get('title'))} -", _text(doc.get('description')),
+            f"({', '.join(rates)})" if rates else '',
+        ))
+    return snippets
+
+
+def _technologies(db):
+    by_category = defaultdict(list)
+    for doc in db['technologies'].find({}, {'_id': 0, 'name': 1, 'category': 1}):
+        if doc.get('name'):
+            by_category[doc.get('category') or 'Other'].append(doc['name'])
+    return [f"Technologies ({category}): {', '.join(names)}" for category, names in by_category.items()]
+
+
+def _projects(db, limit):
+    snippets = []
+    projection = {'_id': 0, 'title': 1, 'category': 1, 'summary': 1, 'tech_stack': 1, 'tags': 1, 'client': 1}
+    for doc in db['projects'].find({}, projection).sort('created_at', DESCENDING).limit(limit):
+        snippets.append(_join(
+            f"Project: {_text(doc.get('title'))}",
+            f"({_text(doc.get('category'))}) -" if doc.get('category') else '-',
+            _text(doc.get('summary')),
+            f"Client: {_text(doc.get('client'))}." if doc.get('client') else '',
+            f"Built with {_text(doc.get('tech_stack'))}." if doc.get('tech_stack') else '',
+            f"Tags: {_text(doc.get('tags'))}." if doc.get('tags') else '',
+        ))
+    return snippets
+
+
+def _pricing(engine):
+    snippets = []
+    for service_id, rule in engine.rules.items():
+        lines = []
+        for line in rule.get('lines') or []:
+            label = _PLACEHOLDER_RE.sub('', str(line.get('label', ''))).strip()
+            entry = f"{label} = {line.get('amount')}"
+            if line.get('when') not in (None, ''):
+                entry += f" if {line['when']}"
+            lines.append(entry)
+        snippets.append(f"Estimate pricing for {service_id.replace('-', ' ')} ({service_id}): {'; '.join(lines)}")
+    return snippets
+
+
+# ---------------------------------------------------------------------
+# BM25
+# ---------------------------------------------------------------------
+
+class _BM25:
+    """Immutable BM25 index: term -> [(snippet index, weight)]."""
+
+    def __init__(self, segments, k1=1.2, b=0.75):
+        docs = [(text, tokens) for name in sorted(segments) for text, tokens in segments[name]]
+        self.texts = [text for text, _ in docs]
+        df = Counter()
+        for _, tokens in docs:
+            df.update(set(tokens))
+        count = len(docs)
+        avgdl = (sum(len(tokens) for _, tokens in docs) / count) if count else 0.0
+        postings = defaultdict(list)
+        for i, (_, tokens) in enumerate(docs):
+            norm = k1 * (1 - b + b * len(tokens) / avgdl) if avgdl else k1
+            for term, tf in Counter(tokens).items():
+                idf = math.log(1 + (count - df[term] + 0.5) / (df[term] + 0.5))
+                postings[term].append((i, idf * tf * (k1 + 1) / (tf + norm)))
+        self.postings = dict(postings)
+
+    def search(self, query, k):
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            for i, weight in self.postings.get(term, ()):
+                scores[i] += weight
+        best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(round(score, 4), self.texts[i]) for i, score in best]
+
+
+class CatalogIndex:
+    def __init__(self, max_age=300, max_projects=500, max_snippet_chars=400):
+        self.max_age = max_age
+        self.max_projects = max_projects
+        self.max_snippet_chars = max_snippet_chars
+        self._lock = threading.Lock()
+        self._segments = {}   # source -> [(text, tokens)]
+        self._versions = {}
+        self._index = _BM25({})
+        self._expires_at = 0.0
+        self._retry_at = 0.0
+
+    def _sources(self):
+        """source -> (version token, loader(db) -> snippets)"""
+        engine = rules_store.get().engine
+        return {
+            'services': (content_cache.version('services'), _services),
+            'technologies': (content_cache.version('technologies'), _technologies),
+            'projects': (content_cache.version('projects'), lambda db: _projects(db, self.max_projects)),
+            # A new engine object is only built when the pricing rules change
+            'pricing': (engine, lambda db: _pricing(engine)),
+        }
+
+    def _stale_sources(self, sources, now):
+        if now < self._retry_at:
+            return []
+        if now >= self._expires_at:
+            return list(sources)
+        return [name for name, (version, _) in sources.items() if self._versions.get(name) != version]
+
+    def refresh(self):
+        """Reload the segments whose source changed and rebuild the weights."""
+        sources = self._sources()
+        if not self._stale_sources(sources, time.monotonic()):
+            return
+        with self._lock:
+            stale = self._stale_sources(sources, time.monotonic())
+            if not stale:
+                return
+            db = get_mongo_db()
+            segments = dict(self._segments)
+            versions = dict(self._versions)
+            failed = False
+            for name in stale:
+                version, load = sources[name]
+                if db is None and name != 'pricing':
+                    failed = True
+                    continue
+                try:
+                    texts = load(db)
+                except Exception as e:
+                    print(f"[CatalogIndex] Could not load {name}, keeping {len(segments.get(name, []))} snippets: {e}")
+                    failed = True
+                    continue
+                segments[name] = [(text[:self.max_snippet_chars], tokenize(text)) for text in texts]
+                versions[name] = version
+            self._index = _BM25(segments)
+            self._segments, self._versions = segments, versions
+            if failed:
+                self._retry_at = time.monotonic() + _RETRY_AFTER
+            else:
+                self._expires_at = time.monotonic() + self.max_age
+
+    def search(self, query, k=4, min_ratio=0.25):
+        """
+        Top-k (score, snippet) pairs for a query, best first. Hits scoring
+        below min_ratio of the best one are dropped to keep prompts short.
+        """
+        self.refresh()
+        hits = self._index.search(query, k)
+        return [hit for hit in hits if hit[0] >= hits[0][0] * min_ratio] if hits else hits
+
+    def stats(self):
+        return {name: len(snippets) for name, snippets in self._segments.items()}
+
+
+catalog_index = CatalogIndex(
+    max_age=getattr(settings, 'CHATBOT_INDEX_MAX_AGE', 300),
+    max_projects=getattr(settings, 'CHATBOT_INDEX_MAX_PROJECTS', 500),
+)
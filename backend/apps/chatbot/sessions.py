@@ -0,0 +1,182 @@
+"""
+Server-side chat sessions with a bounded rolling context.
+Usage:
+    from apps.chatbot.sessions import chat_sessions
+
+    session = chat_sessions.get(request.data.get('session'), user_id)
+    messages = session.prompt(system_prompt, message)
+    ...
+    chat_sessions.append(session, message, bot_reply, user_id)
+
+A session keeps the most recent turns verbatim. Once they exceed
+CHATBOT_SESSION_TOKEN_BUDGET (estimated at ~4 characters per token), the
+oldest exchanges are folded into a short extractive summary - the first
+sentence of each question and answer - which is itself capped at
+CHATBOT_SESSION_SUMMARY_BUDGET. Each prompt therefore stays bounded no
+matter how long the conversation runs, without an extra model call.
+
+Sessions are served from an in-process LRU (CHATBOT_SESSION_CACHE_SIZE)
+and fall back to one `chat_sessions` document per session, which is
+rewritten off the request path after every turn and expires after 30 days
+of inactivity (TTL index on updated_at). With several workers, a worker's
+LRU copy can miss turns answered by another worker until it is evicted.
+"""
+
+import datetime
+import os
+import re
+import secrets
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+from apps.utils.mongo import get_mongo_db
+
+_SESSION_ID_RE = re.compile(r'^[A-Za-z0-9_-]{8,64}$')
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s')
+
+
+def estimate_tokens(text):
+    return len(text) // 4 + 4
+
+
+def _first_sentence(text, limit):
+    text = ' '.join(str(text).split())
+    sentence = _SENTENCE_RE.split(text, 1)[0]
+    return sentence if len(sentence) <= limit else sentence[:limit - 3].rstrip() + '...'
+
+
+class ChatSession:
+    """Immutable snapshot of a conversation; append() returns a new one."""
+    __slots__ = ('id', 'user_id', 'summary', 'turns', 'is_new')
+
+    def __init__(self, id, user_id, summary=(), turns=(), is_new=False):
+        self.id = id
+        self.user_id = user_id
+        self.summary = tuple(summary)   # extractive summary lines, oldest first
+        self.turns = tuple(turns)       # (role, content) pairs, oldest first
+        self.is_new = is_new
+
+    def prompt(self, system_prompt, message):
+        """The chat completion messages for the next user message."""
+        messages = [{"role": "system", "content": system_prompt}]
+        if self.summary:
+            messages.append({
+                "role": "system",
+                "content": "Earlier in this conversation:\n" + '\n'.join(self.summary),
+            })
+        messages.extend({"role": role, "content": content} for role, content in self.turns)
+        messages.append({"role": "user", "content": message})
+        return messages
+
+
+class ChatSessionStore:
+    def __init__(self, max_sessions=1000, token_budget=1500, summary_budget=300):
+        self.max_sessions = max_sessions
+        self.token_budget = token_budget
+        self.summary_budget = summary_budget
+        self._lock = threading.Lock()
+        self._sessions = OrderedDict()
+        self._executor = None
+        self._pid = None
+
+    def get(self, session_id, user_id):
+        """
+        The session for `session_id`, or a fresh one when the id is unknown,
+        malformed or belongs to another user.
+        """
+        if isinstance(session_id, str) and _SESSION_ID_RE.match(session_id):
+            session = self._cached(session_id) or self._load(session_id)
+            if session is not None and session.user_id in (user_id, 'anonymous'):
+                return session
+        return ChatSession(secrets.token_urlsafe(16), user_id, is_new=True)
+
+    def append(self, session, message, reply, user_id):
+        """Record one exchange, compact the window and persist it in the background."""
+        turns = list(session.turns) + [('user', message), ('assistant', reply)]
+        summary = list(session.summary)
+        while len(turns) > 2 and sum(estimate_tokens(content) for _, content in turns) > self.token_budget:
+            (_, question), (_, answer) = turns[:2]
+            del turns[:2]
+            summary.append(f"User asked: {_first_sentence(question, 160)} Assistant: {_first_sentence(answer, 200)}")
+        while summary and sum(estimate_tokens(line) for line in summary) > self.summary_budget:
+            summary.pop(0)
+        # An anonymous session is claimed by the user who continues it after logging in
+        owner = user_id if session.user_id == 'anonymous' else session.user_id
+        updated = ChatSession(session.id, owner, summary, turns)
+        self._remember(updated)
+        self._submit(self._save, updated)
+        return updated
+
+    def _cached(self, session_id):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def _remember(self, session):
+        with self._lock:
+            self._sessions[session.id] = session
+            self._sessions.move_to_end(session.id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def _load(self, session_id):
+        db = get_mongo_db()
+        if db is None:
+            return None
+        try:
+            doc = db['chat_sessions'].find_one({'_id': session_id})
+        except Exception as e:
+            print(f"[MongoDB] Could not load chat session: {e}")
+            return None
+        if doc is None:
+            return None
+        session = ChatSession(
+            session_id,
+            doc.get('user_id', 'anonymous'),
+            doc.get('summary') or (),
+            ((turn.get('role'), turn.get('content', '')) for turn in doc.get('turns') or ()),
+        )
+        self._remember(session)
+        return session
+
+    def _submit(self, fn, *args):
+        # One writer thread per process keeps a session's updates in order
+        pid = os.getpid()
+        if self._executor is None or self._pid != pid:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='chat-sessions')
+            self._pid = pid
+        self._executor.submit(fn, *args)
+
+    def _save(self, session):
+        db = get_mongo_db()
+        if db is None:
+            return
+        now = datetime.datetime.utcnow()
+        try:
+            db['chat_sessions'].update_one(
+                {'_id': session.id},
+                {
+                    '$set': {
+                        'user_id': session.user_id,
+                        'summary': list(session.summary),
+                        'turns': [{'role': role, 'content': content} for role, content in session.turns],
+                        'updated_at': now,
+                    },
+                    '$setOnInsert': {'created_at': now},
+                },
+                upsert=True,
+            )
+        except Exception as e:
+            print(f"[MongoDB] Could not save chat session: {e}")
+
+
+chat_sessions = ChatSessionStore(
+    max_sessions=getattr(settings, 'CHATBOT_SESSION_CACHE_SIZE', 1000),
+    token_budget=getattr(settings, 'CHATBOT_SESSION_TOKEN_BUDGET', 1500),
+    summary_budget=getattr(settings, 'CHATBOT_SESSION_SUMMARY_BUDGET', 300),
+)
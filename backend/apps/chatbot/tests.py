@@ -1,3 +1,249 @@
-from django.test import TestCase
+import datetime
+import json
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.test import SimpleTestCase
+from rest_framework.test import APIRequestFactory
+
+from .llm import LLMClients, load_routes
+from .reply_cache import ReplyCache
+from .retrieval import CatalogIndex, _BM25, tokenize
+from .sessions import ChatSession, ChatSessionStore, estimate_tokens
+from .views import ChatView
+
+
+def parse_events(response):
+    """[(event, data)] from a text/event-stream response."""
+    body = b''.join(response.streaming_content).decode()
+    events = []
+    for block in body.strip().split('\n\n'):
+        event, data = block.split('\n')
+        events.append((event[len('event: '):], json.loads(data[len('data: '):])))
+    return events
+
+
+def chunk(content):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))])
+
+
+class LLMClientsTests(SimpleTestCase):
+    def test_routes_merge_overrides(self):
+        routes = load_routes({
+            'chat': {'models': {'openai': 'gpt-4o-mini'}, 'timeout': 20},
+            'summary': {'models': {'openai': 'small'}},
+        })
+        self.assertEqual(routes['chat']['models']['openai'], 'gpt-4o-mini')
+        self.assertEqual(routes['chat']['models']['openrouter'], 'google/gemini-flash-1.5-8b')
+        self.assertEqual((routes['chat']['timeout'], routes['chat']['max_retries']), (20, 1))
+        self.assertEqual(routes['summary'], {'models': {'openai': 'small'}})
+
+    def test_clients_are_pooled_per_key_and_route(self):
+        clients = LLMClients(load_routes())
+        with mock.patch.object(clients, 'api_key', return_value='sk-or-test'):
+            chat, route = clients.get('chat')
+            self.assertIs(clients.get('chat')[0], chat)
+            stream, _ = clients.get('stream')
+        self.assertEqual((route.provider, route.max_retries), ('openrouter', 1))
+        self.assertEqual(str(chat.base_url), 'https://openrouter.ai/api/v1/')
+        self.assertIsNot(stream, chat)
+        # Both routes share the base client's connection pool
+        self.assertIs(stream._client, chat._client)
+
+    def test_no_key_means_no_client(self):
+        clients = LLMClients(load_routes())
+        with mock.patch.object(clients, 'api_key', return_value=None):
+            self.assertEqual(clients.get('chat'), (None, None))
+
+
+class ReplyCacheTests(SimpleTestCase):
+    def make_cache(self, **kwargs):
+        cache = ReplyCache(**kwargs)
+        cache._warmed = True
+        return cache
+
+    def test_exact_hit_ignores_case_and_punctuation(self):
+        cache = self.make_cache()
+        cache.store('What services do you offer?', 'Web and apps.')
+        self.assertEqual(cache.lookup('what services do you offer'), ('Web and apps.', 'exact'))
+
+    def test_error_replies_are_not_cached(self):
+        cache = self.make_cache()
+        cache.store('hello', 'Error processing request: timeout')
+        self.assertIsNone(cache.lookup('hello'))
+
+    def test_new_entries_stay_in_semantic_index_when_full(self):
+        cache = self.make_cache(max_entries=2, semantic=True, similarity=0.5)
+        for n, question in enumerate(['how much is a website', 'do you build apps', 'where is your office']):
+            cache.store(question, f'answer {n}')
+        self.assertEqual(sorted(cache._index._slots), ['do you build apps', 'where is your office'])
+        self.assertEqual(cache.lookup('where is the office'), ('answer 2', 'semantic'))
+
+    def test_warm_only_reads_first_turns(self):
+        db = mock.MagicMock()
+        find = db.__getitem__.return_value.find
+        find.return_value.sort.return_value.limit.return_value = [{
+            'user_message': 'hi',
+            'bot_response': 'Hello!',
+            'timestamp': datetime.datetime.utcnow(),
+        }]
+        cache = ReplyCache()
+        with mock.patch('apps.chatbot.reply_cache.get_mongo_db', return_value=db):
+            cache.warm()
+        self.assertEqual(find.call_args[0][0], {'first_turn': True})
+        self.assertEqual(cache.lookup('hi'), ('Hello!', 'exact'))
+
+
+class CatalogRetrievalTests(SimpleTestCase):
+    def test_tokenize_drops_stopwords_and_folds_plurals(self):
+        self.assertEqual(
+            tokenize('How much do the Websites cost? Business apps'),
+            ['much', 'website', 'cost', 'business', 'app'],
+        )
+
+    def test_bm25_prefers_rare_terms(self):
+        texts = ['Service: Web Development', 'Service: Hosting', 'Service: Logo Designing', 'Technology: React web']
+        index = _BM25({'catalog': [(text, tokenize(text)) for text in texts]})
+        hits = index.search('react service', k=2)
+        self.assertEqual(hits[0][1], 'Technology: React web')
+        self.assertEqual(len(hits), 2)
+        self.assertEqual(index.search('blockchain', k=2), [])
+
+    def test_only_changed_sources_are_reloaded(self):
+        index = CatalogIndex()
+        loaders = {
+            'services': mock.Mock(return_value=['Service: Hosting - servers and domains']),
+            'projects': mock.Mock(return_value=['Project: Shop - an online store']),
+        }
+        versions = {'services': 1, 'projects': 1}
+        index._sources = lambda: {name: (versions[name], loaders[name]) for name in loaders}
+        with mock.patch('apps.chatbot.retrieval.get_mongo_db', return_value=mock.MagicMock()):
+            self.assertEqual(index.search('online store', k=1)[0][1], 'Project: Shop - an online store')
+            index.search('hosting')
+            versions['services'] = 2
+            loaders['services'].return_value = ['Service: Hosting - managed cloud servers']
+            hits = index.search('cloud hosting', k=1)
+
+        self.assertEqual(hits[0][1], 'Service: Hosting - managed cloud servers')
+        self.assertEqual(loaders['services'].call_count, 2)
+        self.assertEqual(loaders['projects'].call_count, 1)
+        self.assertEqual(index.stats(), {'services': 1, 'projects': 1})
+
+
+class ChatSessionTests(SimpleTestCase):
+    def setUp(self):
+        self.db = mock.MagicMock()
+        patcher = mock.patch('apps.chatbot.sessions.get_mongo_db', return_value=self.db)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.store = ChatSessionStore(token_budget=100, summary_budget=40)
+        self.store._submit = lambda fn, *args: fn(*args)
+
+    def test_old_turns_are_folded_into_a_bounded_summary(self):
+        session = self.store.get(None, 'u1')
+        self.assertTrue(session.is_new)
+        for n in range(6):
+            session = self.store.append(session, f'Question {n}? ' + 'x' * 80, f'Answer {n}. More detail.', 'u1')
+
+        self.assertFalse(session.is_new)
+        self.assertLessEqual(sum(estimate_tokens(content) for _, content in session.turns), 100)
+        self.assertLessEqual(sum(estimate_tokens(line) for line in session.summary), 40)
+        self.assertEqual([content for role, content in session.turns if role == 'assistant'],
+                         ['Answer 4. More detail.', 'Answer 5. More detail.'])
+        self.assertEqual(session.summary[-1], 'User asked: Question 3? Assistant: Answer 3.')
+
+        messages = session.prompt('system', 'next')
+        self.assertEqual(messages[1]['content'], 'Earlier in this conversation:\n' + '\n'.join(session.summary))
+        self.assertEqual(messages[-1], {'role': 'user', 'content': 'next'})
+        self.assertEqual(len(messages), 3 + len(session.turns))
+
+    def test_sessions_are_not_shared_between_users(self):
+        session = self.store.append(self.store.get(None, 'u1'), 'hi', 'hello', 'u1')
+        self.assertEqual(self.store.get(session.id, 'u1').turns, session.turns)
+        self.assertNotEqual(self.store.get(session.id, 'u2').id, session.id)
+        self.assertTrue(self.store.get('../bad id', 'u1').is_new)
+
+    def test_anonymous_session_is_claimed_on_login(self):
+        session = self.store.append(self.store.get(None, 'anonymous'), 'hi', 'hello', 'anonymous')
+        session = self.store.append(self.store.get(session.id, 'u1'), 'again', 'hello again', 'u1')
+        self.assertEqual(session.user_id, 'u1')
+        self.assertEqual(self.store.get(session.id, 'u2').turns, ())
+
+    def test_saved_and_loaded_from_mongo(self):
+        session = self.store.append(self.store.get(None, 'u1'), 'hi', 'hello', 'u1')
+        (query, update), kwargs = self.db['chat_sessions'].update_one.call_args
+        self.assertEqual(query, {'_id': session.id})
+        turns = [{'role': 'user', 'content': 'hi'}, {'role': 'assistant', 'content': 'hello'}]
+        self.assertEqual(update['$set']['turns'], turns)
+        self.assertTrue(kwargs['upsert'])
+
+        self.db['chat_sessions'].find_one.return_value = {'user_id': 'u1', 'summary': [], 'turns': turns}
+        loaded = ChatSessionStore().get(session.id, 'u1')
+        self.assertEqual(loaded.turns, (('user', 'hi'), ('assistant', 'hello')))
+        self.assertIsInstance(loaded, ChatSession)
+
+
+class ChatStreamTests(SimpleTestCase):
+    def setUp(self):
+        self.client = mock.MagicMock()
+        self.reply_cache = ReplyCache()
+        self.reply_cache._warmed = True
+        self.mongo_log = mock.MagicMock()
+        sessions = ChatSessionStore()
+        sessions._submit = lambda fn, *args: fn(*args)   # save inline, not on the writer thread
+        for patcher in (
+            mock.patch('apps.chatbot.views.llm_clients', **{
+                'api_key.return_value': 'key', 'get.return_value': (self.client, SimpleNamespace(model='m')),
+            }),
+            mock.patch('apps.chatbot.views.reply_cache', self.reply_cache),
+            mock.patch('apps.chatbot.views.chat_sessions', sessions),
+            mock.patch('apps.chatbot.views.catalog_index.search', return_value=[]),
+            mock.patch('apps.chatbot.views.get_mongo_db', return_value=None),
+            mock.patch('apps.chatbot.views.mongo_log', self.mongo_log),
+            mock.patch('apps.chatbot.sessions.get_mongo_db', return_value=None),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def post(self, **data):
+        request = APIRequestFactory().post('/api/chatbot/', dict(data, stream=True), format='json')
+        return ChatView.as_view()(request)
+
+    def test_reply_is_streamed_then_recorded(self):
+        self.client.chat.completions.create.return_value = iter([chunk('Hel'), chunk(None), chunk('lo!')])
+        response = self.post(message='hi')
+
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(response['X-Accel-Buffering'], 'no')
+        self.mongo_log.assert_not_called()   # nothing is recorded before the stream is consumed
+        events = parse_events(response)
+        self.assertEqual([event for event, _ in events], ['meta', 'delta', 'delta', 'done'])
+        self.assertEqual(events[-1][1], {'id': 'pending', 'response': 'Hello!'})
+        self.assertEqual(self.client.chat.completions.create.call_args.kwargs['stream'], True)
+        self.assertEqual(self.reply_cache.lookup('hi'), ('Hello!', 'exact'))
+        self.mongo_log.assert_called_once_with('chat_logs', {
+            'user_message': 'hi', 'bot_response': 'Hello!', 'chat_id': 'pending',
+        })
+
+    def test_failed_stream_ends_with_error_and_is_not_cached(self):
+        def broken():
+            yield chunk('Hel')
+            raise TimeoutError('timed out')
+
+        self.client.chat.completions.create.return_value = broken()
+        events = parse_events(self.post(message='hi'))
+
+        self.assertEqual([event for event, _ in events], ['meta', 'delta', 'error'])
+        self.assertEqual(events[-1][1], {'error': 'Error processing request: timed out'})
+        self.assertIsNone(self.reply_cache.lookup('hi'))
+
+    def test_cached_reply_is_streamed_without_the_model(self):
+        self.reply_cache.store('hi', 'Hello again!')
+        events = parse_events(self.post(message='hi'))
+
+        self.client.chat.completions.create.assert_not_called()
+        self.assertEqual(events[0][1]['cached'], True)
+        self.assertEqual(events[1:], [
+            ('delta', {'content': 'Hello again!'}),
+            ('done', {'id': 'pending', 'response': 'Hello again!'}),
+        ])
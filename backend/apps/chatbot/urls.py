@@ -1,6 +1,7 @@
 from django.urls import path
-from .views import ChatView
+from .views import ChatCacheStatsView, ChatView
 
 urlpatterns = [
     path('', ChatView.as_view(), name='chat'),
+    path('cache/', ChatCacheStatsView.as_view(), name='chat-cache-stats'),
 ]
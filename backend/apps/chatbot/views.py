@@ -1,60 +1,212 @@
-import os
-from openai import OpenAI
+import json
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.permissions import IsAdminUser
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from apps.utils.mongo import get_mongo_db, mongo_log
+from .llm import llm_clients
+from .reply_cache import reply_cache
+from .retrieval import catalog_index
+from .sessions import chat_sessions
 import datetime
 from bson.objectid import ObjectId
 
+SYSTEM_PROMPT = "You are a helpful assistant for Zsyio, a digital agency."
+
+
+def build_system_prompt(message):
+    """SYSTEM_PROMPT plus the catalog snippets most relevant to the message."""
+    top_k = getattr(settings, 'CHATBOT_CONTEXT_TOP_K', 4)
+    if top_k <= 0:
+        return SYSTEM_PROMPT
+    try:
+        hits = catalog_index.search(message, k=top_k)
+    except Exception as e:
+        print(f"[CatalogIndex] Search failed: {e}")
+        hits = []
+    if not hits:
+        return SYSTEM_PROMPT
+    facts = '\n'.join(f"- {text}" for _, text in hits)
+    return f"{SYSTEM_PROMPT}\n\nUse these facts from the Zsyio catalog when they are relevant:\n{facts}"
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _cached_events(chat_id, session_id, reply):
+    return [
+        _sse('meta', {"id": chat_id, "session": session_id, "cached": True}),
+        _sse('delta', {"content": reply}),
+        _sse('done', {"id": chat_id, "response": reply}),
+    ]
+
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+
+def _persist_chat(chat_id, message, bot_reply, user_id, session_id, first_turn):
+    """Queue both chat writes on the mongo_log write-behind queue."""
+    if chat_id != "pending":
+        mongo_log('chat_messages', {
+            "_id": ObjectId(chat_id),
+            "user_message": message,
+            "bot_response": bot_reply,
+            "timestamp": datetime.datetime.utcnow(),
+            "user_id": user_id,
+            "session_id": session_id,
+            # Only first turns may seed the reply cache (ReplyCache.warm)
+            "first_turn": first_turn
+        })
+    mongo_log('chat_logs', {
+        'user_message': message,
+        'bot_response': bot_reply,
+        'chat_id': chat_id
+    })
+
+
+def _complete_turn(chat_id, session, message, bot_reply, user_id, ok=True):
+    """Record a finished exchange in the session, reply cache and chat logs."""
+    if ok:
+        if session.is_new:
+            # Follow-up answers depend on the conversation, only first turns are reusable
+            reply_cache.store(message, bot_reply)
+        chat_sessions.append(session, message, bot_reply, user_id)
+    _persist_chat(chat_id, message, bot_reply, user_id, session.id, session.is_new)
+
+
 class ChatView(APIView):
+    """
+    POST /api/chatbot/
+    Body: { "message": "...", "session": "<session id>", "stream": false }
+
+    Replies carry a "session" id; send it back with the next message to
+    continue the conversation (apps.chatbot.sessions keeps a bounded window
+    of recent turns plus a summary of older ones). Without it, or with an
+    unknown id, a new session is started.
+
+    With "stream": true (or Accept: text/event-stream) the reply is relayed
+    as Server-Sent Events while the model generates it:
+        event: meta   data: {"id": "<chat id>", "session": "<session id>"}
+        event: delta  data: {"content": "<text chunk>"}     (repeated)
+        event: done   data: {"id": "<chat id>", "response": "<full reply>"}
+        event: error  data: {"error": "..."}                 (instead of done)
+    Under ASGI the stream is produced by the async client, so waiting on the
+    model does not hold a worker thread. The chat is persisted through the
+    mongo_log write-behind queue once the reply is complete.
+
+    Models, timeouts and pooled clients come from apps.chatbot.llm (routes
+    "chat" and "stream"). Repeated questions are answered from
+    apps.chatbot.reply_cache without calling the model; such replies carry
+    "cached": "exact" | "semantic" (or "cached": true in the meta event).
+    The system prompt carries the top CHATBOT_CONTEXT_TOP_K catalog snippets
+    for the message (apps.chatbot.retrieval).
+    """
+
     def post(self, request):
         message = request.data.get('message')
         if not message:
             return Response({"error": "Message is required"}, status=400)
-            
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
+
+        user_id = str(request.user.id) if request.user.is_authenticated else "anonymous"
+        wants_stream = request.data.get('stream') in (True, 'true', '1') or \
+            'text/event-stream' in request.META.get('HTTP_ACCEPT', '')
+        session = chat_sessions.get(request.data.get('session'), user_id)
+        cached = reply_cache.lookup(message) if session.is_new else None
+        if cached is None and not llm_clients.api_key():
             return Response({"response": "Server configuration error: API Key missing."}, status=500)
 
-        # Configure OpenAI client
-        if api_key.startswith("sk-or-"):
-            client = OpenAI(
-                api_key=api_key,
-                base_url="https://openrouter.ai/api/v1"
-            )
-            model = "google/gemini-flash-1.5-8b"
-        else:
-            client = OpenAI(api_key=api_key)
-            model = "gpt-4o"
+        chat_id = str(ObjectId()) if get_mongo_db() is not None else "pending"
+        if cached is not None:
+            bot_reply, tier = cached
+            _complete_turn(chat_id, session, message, bot_reply, user_id)
+            if not wants_stream:
+                return Response({"response": bot_reply, "id": chat_id, "session": session.id, "cached": tier})
+
+        messages = session.prompt(build_system_prompt(message), message)
 
+        if wants_stream:
+            if cached is not None:
+                events = _cached_events(chat_id, session.id, cached[0])
+                if hasattr(request, 'scope'):
+                    events = _aiter(events)
+            elif hasattr(request, 'scope'):  # ASGIRequest
+                events = self.stream_async(messages, chat_id, session, message, user_id)
+            else:
+                events = self.stream_sync(messages, chat_id, session, message, user_id)
+            response = StreamingHttpResponse(events, content_type='text/event-stream')
+            response['Cache-Control'] = 'no-cache'
+            # Keep reverse proxies (nginx, Render) from buffering the stream
+            response['X-Accel-Buffering'] = 'no'
+            return response
+
+        client, route = llm_clients.get('chat')
+        ok = True
         try:
-            completion = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant for Zsyio, a digital agency."},
-                    {"role": "user", "content": message},
-                ]
-            )
-            bot_reply = completion.choices[0].message.content
+            completion = client.chat.completions.create(model=route.model, messages=messages)
+            bot_reply = completion.choices[0].message.content or ""
         except Exception as e:
             bot_reply = f"Error processing request: {str(e)}"
+            ok = False
 
-        # Direct MongoDB storage
-        db = get_mongo_db()
-        chat_id = "pending"
-        if db is not None:
-            res = db['chat_messages'].insert_one({
-                "user_message": message,
-                "bot_response": bot_reply,
-                "timestamp": datetime.datetime.utcnow(),
-                "user_id": str(request.user.id) if request.user.is_authenticated else "anonymous"
-            })
-            chat_id = str(res.inserted_id)
-
-        mongo_log('chat_logs', {
-            'user_message': message,
-            'bot_response': bot_reply,
-            'chat_id': chat_id
-        })
+        _complete_turn(chat_id, session, message, bot_reply, user_id, ok)
+        return Response({"response": bot_reply, "id": chat_id, "session": session.id})
+
+    def stream_sync(self, messages, chat_id, session, message, user_id):
+        client, route = llm_clients.get('stream')
+        yield _sse('meta', {"id": chat_id, "session": session.id})
+        parts = []
+        ok = False
+        try:
+            stream = client.chat.completions.create(model=route.model, messages=messages, stream=True)
+            for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    parts.append(delta)
+                    yield _sse('delta', {"content": delta})
+        except Exception as e:
+            error = f"Error processing request: {str(e)}"
+            if not parts:
+                parts.append(error)
+            yield _sse('error', {"error": error})
+        else:
+            ok = True
+            yield _sse('done', {"id": chat_id, "response": ''.join(parts)})
+        finally:
+            # Also runs when the client disconnects mid-stream
+            _complete_turn(chat_id, session, message, ''.join(parts), user_id, ok)
+
+    async def stream_async(self, messages, chat_id, session, message, user_id):
+        client, route = llm_clients.get('stream', use_async=True)
+        yield _sse('meta', {"id": chat_id, "session": session.id})
+        parts = []
+        ok = False
+        try:
+            stream = await client.chat.completions.create(model=route.model, messages=messages, stream=True)
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    parts.append(delta)
+                    yield _sse('delta', {"content": delta})
+        except Exception as e:
+            error = f"Error processing request: {str(e)}"
+            if not parts:
+                parts.append(error)
+            yield _sse('error', {"error": error})
+        else:
+            ok = True
+            yield _sse('done', {"id": chat_id, "response": ''.join(parts)})
+        finally:
+            # Only enqueues (mongo_log, session writer), so this does not block the event loop
+            _complete_turn(chat_id, session, message, ''.join(parts), user_id, ok)
+
+
+class ChatCacheStatsView(APIView):
+    """GET /api/chatbot/cache/ - reply cache counters for this process (staff only)"""
+    permission_classes = [IsAdminUser]
 
-        return Response({"response": bot_reply, "id": chat_id})
+    def get(self, request):
+        return Response(reply_cache.stats())
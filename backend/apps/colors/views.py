@@ -2,28 +2,13 @@ from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from .models import ColorPalette, ColorScheme, CustomColor, GradientPreset
+from apps.utils.cache import content_cache
 from apps.utils.mongo import get_mongo_db, mongo_log
+from apps.utils.responses import cached_json_response
+from apps.utils.serialization import serialize_mongo_doc
 from bson.objectid import ObjectId
 import datetime
 
-def serialize_mongo_doc(doc):
-    if doc is None: return None
-    if isinstance(doc, list):
-        return [serialize_mongo_doc(item) for item in doc]
-    if isinstance(doc, dict):
-        new_doc = {}
-        for k, v in doc.items():
-            if k == '_id':
-                new_doc['id'] = str(v)
-            elif isinstance(v, (ObjectId, datetime.datetime)):
-                new_doc[k] = str(v) if isinstance(v, ObjectId) else v.isoformat()
-            elif isinstance(v, (list, dict)):
-                new_doc[k] = serialize_mongo_doc(v)
-            else:
-                new_doc[k] = v
-        return new_doc
-    return doc
-
 class ColorPaletteViewSet(viewsets.ViewSet):
     permission_classes = [permissions.AllowAny]
 
@@ -31,10 +16,11 @@ class ColorPaletteViewSet(viewsets.ViewSet):
         db = get_mongo_db()
         return db['color_palettes'] if db is not None else None
 
+    @cached_json_response('color_palettes')
     def list(self, request):
         coll = self.get_collection()
         if coll is None: return Response([])
-        return Response([serialize_mongo_doc(p) for p in coll.find()])
+        return Response(list(coll.find()))
 
     def create(self, request):
         coll = self.get_collection()
@@ -42,15 +28,18 @@ class ColorPaletteViewSet(viewsets.ViewSet):
         data = request.data.copy()
         res = coll.insert_one(data)
         data['id'] = str(res.inserted_id)
+        content_cache.bump('color_palettes')
         return Response(serialize_mongo_doc(data), status=201)
 
     @action(detail=False, methods=['get'])
+    @cached_json_response('color_palettes')
     def active(self, request):
         coll = self.get_collection()
         if coll is None: return Response([])
-        return Response([serialize_mongo_doc(p) for p in coll.find({"is_active": True})])
+        return Response(list(coll.find({"is_active": True})))
 
     @action(detail=False, methods=['get'])
+    @cached_json_response('color_palettes')
     def default(self, request):
         coll = self.get_collection()
         if coll is None: return Response(status=404)
@@ -61,31 +50,34 @@ class ColorPaletteViewSet(viewsets.ViewSet):
 class ColorSchemeViewSet(viewsets.ViewSet):
     permission_classes = [permissions.AllowAny]
 
+    @cached_json_response('color_schemes')
     def list(self, request):
         db = get_mongo_db()
-        if not db: return Response([])
-        return Response([serialize_mongo_doc(s) for s in db['color_schemes'].find()])
+        if db is None: return Response([])
+        return Response(list(db['color_schemes'].find()))
 
     @action(detail=False, methods=['get'])
+    @cached_json_response('color_schemes')
     def by_theme(self, request):
         theme_type = request.query_params.get('type', 'light')
         db = get_mongo_db()
-        if not db: return Response([])
-        schemes = [serialize_mongo_doc(s) for s in db['color_schemes'].find({"theme_type": theme_type, "is_active": True})]
+        if db is None: return Response([])
+        schemes = list(db['color_schemes'].find({"theme_type": theme_type, "is_active": True}))
         return Response({"success": True, "theme_type": theme_type, "data": schemes})
 
 class CustomColorViewSet(viewsets.ViewSet):
     permission_classes = [permissions.AllowAny]
 
+    @cached_json_response('custom_colors')
     def list(self, request):
         db = get_mongo_db()
-        if not db: return Response([])
-        return Response([serialize_mongo_doc(c) for c in db['custom_colors'].find()])
+        if db is None: return Response([])
+        return Response(list(db['custom_colors'].find()))
 
     @action(detail=False, methods=['css_variables'])
     def css_variables(self, request):
         db = get_mongo_db()
-        if not db: return Response({})
+        if db is None: return Response({})
         colors = db['custom_colors'].find({"is_active": True})
         css_vars = {c.get('css_variable'): {"value": c.get('color_value')} for c in colors}
         return Response({"success": True, "css_variables": css_vars})
@@ -93,13 +85,15 @@ class CustomColorViewSet(viewsets.ViewSet):
 class GradientPresetViewSet(viewsets.ViewSet):
     permission_classes = [permissions.AllowAny]
 
+    @cached_json_response('gradient_presets')
     def list(self, request):
         db = get_mongo_db()
-        if not db: return Response([])
-        return Response([serialize_mongo_doc(g) for g in db['gradient_presets'].find()])
+        if db is None: return Response([])
+        return Response(list(db['gradient_presets'].find()))
 
     @action(detail=False, methods=['get'])
+    @cached_json_response('gradient_presets')
     def active(self, request):
         db = get_mongo_db()
-        if not db: return Response([])
-        return Response([serialize_mongo_doc(g) for g in db['gradient_presets'].find({"is_active": True})])
+        if db is None: return Response([])
+        return Response(list(db['gradient_presets'].find({"is_active": True})))
@@ -0,0 +1,33 @@
+"""
+Async GET handlers for the config app (enabled by ASYNC_MONGO_VIEWS,
+see apps.utils.async_views). Responses match ConfigView.
+"""
+
+from apps.utils.async_mongo import get_async_mongo_db
+from apps.utils.async_views import json_response
+from apps.utils.responses import async_cached_json_response
+
+from .views import DEFAULT_PALETTE
+
+
+@async_cached_json_response('site_config')
+async def site_config(request):
+    db = get_async_mongo_db()
+    config = None
+    if db is not None:
+        config = await db['site_config'].find_one()
+
+    if not config:
+        config = {
+            "site_name": "Zsyio",
+            "site_tagline": "Innovative Digital Solutions",
+            "contact_email": "contact@zsyio.com"
+        }
+        if db is not None:
+            await db['site_config'].insert_one(config)
+
+    if '_id' in config:
+        config['id'] = str(config.pop('_id'))
+
+    config['theme_colors'] = DEFAULT_PALETTE
+    return json_response(config)
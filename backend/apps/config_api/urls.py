@@ -1,8 +1,11 @@
 from django.urls import path
-from .views import ConfigView, PrivacyConsentView, GlobalDataView
+from apps.utils.async_views import async_get
+from . import async_views
+from .views import ConfigView, PrivacyConsentView, GlobalDataView, MongoPoolStatsView
 
 urlpatterns = [
-    path('', ConfigView.as_view(), name='site-config'),
+    path('', async_get(ConfigView.as_view(), async_views.site_config), name='site-config'),
     path('privacy-consent/', PrivacyConsentView.as_view(), name='privacy-consent'),
     path('global-data/', GlobalDataView.as_view(), name='global-data'),
+    path('mongo-pool/', MongoPoolStatsView.as_view(), name='mongo-pool-stats'),
 ]
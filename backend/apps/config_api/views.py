@@ -4,7 +4,9 @@ from rest_framework.response import Response
 from .serializers import SiteConfigSerializer, PrivacyConsentSerializer
 from .models import SiteConfig, PrivacyConsent
 from rest_framework import status
-from apps.utils.mongo import get_mongo_db, mongo_log
+from rest_framework.permissions import IsAdminUser
+from apps.utils.mongo import get_mongo_db, mongo_log, mongo_pool_stats
+from apps.utils.responses import cached_json_response
 from bson.objectid import ObjectId
 import datetime
 
@@ -69,6 +71,7 @@ DEFAULT_PALETTE = {
 }
 
 class ConfigView(APIView):
+    @cached_json_response('site_config')
     def get(self, request):
         db = get_mongo_db()
         config = None
@@ -90,7 +93,15 @@ class ConfigView(APIView):
         config['theme_colors'] = DEFAULT_PALETTE
         return Response(config)
 
+class MongoPoolStatsView(APIView):
+    """GET /api/config/mongo-pool/ - MongoDB pool counters for the worker that answers (staff only)"""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(mongo_pool_stats())
+
 class GlobalDataView(APIView):
+    @cached_json_response()
     def get(self, request):
         data = {
             "navLinks": [
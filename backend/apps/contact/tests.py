@@ -1,6 +1,7 @@
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase, override_settings
 from rest_framework.test import APIClient
 from rest_framework import status
+from apps.utils.mailer import flush_email_queue, get_sender
 from .models import ContactSubmission
 
 class ContactSubmissionTests(TestCase):
@@ -28,3 +29,22 @@ class ContactSubmissionTests(TestCase):
         response = self.client.post(self.url, self.invalid_payload, format='json')
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(ContactSubmission.objects.count(), 0)
+
+
+@override_settings(EMAIL_SENDER='stub', EMAIL_QUEUE_BACKEND='thread')
+class ContactEmailQueueTests(SimpleTestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.outbox = get_sender('stub').outbox
+        self.outbox.clear()
+
+    def test_emails_are_queued(self):
+        response = self.client.post('/api/contact/', {
+            'name': 'Jane Doe',
+            'email': 'jane@example.com',
+            'message': 'Hello'
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(flush_email_queue(timeout=5))
+        self.assertEqual(len(self.outbox), 2)
+        self.assertEqual(self.outbox[1]['to'], ['jane@example.com'])
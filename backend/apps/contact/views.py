@@ -2,9 +2,9 @@ from rest_framework import generics, status, permissions
 from rest_framework.response import Response
 from .serializers import ContactSubmissionSerializer
 from django.conf import settings
-import resend
-import os
 import datetime
+from apps.utils.email_templates import email_message
+from apps.utils.mailer import send_email
 from apps.utils.mongo import get_mongo_db, mongo_log
 
 class ContactSubmissionView(generics.CreateAPIView):
@@ -41,36 +41,16 @@ class ContactSubmissionView(generics.CreateAPIView):
             'created_at': datetime.datetime.utcnow()
         })
         
-        # Email logic
-        try:
-            resend.api_key = getattr(settings, 'RESEND_API_KEY', os.getenv("RESEND_API_KEY"))
-            from_email = getattr(settings, 'RESEND_FROM_EMAIL', "onboarding@resend.dev") or "onboarding@resend.dev"
-            admin_email_to = getattr(settings, 'RESEND_ADMIN_EMAIL', "contact@zsyio.com") or "contact@zsyio.com"
-            
-            # Admin Notification
-            try:
-                resend.Emails.send({
-                    "from": f"Zsyio Contact <{from_email}>",
-                    "to": [admin_email_to],
-                    "subject": f"New Contact Form Submission from {name}",
-                    "html": f"<p><strong>Name:</strong> {name}<br><strong>Email:</strong> {email}<br><strong>Message:</strong> {message}</p>",
-                    "reply_to": email,
-                })
-            except Exception as e:
-                print(f"Error sending admin email: {str(e)}")
+        # Emails are queued (apps.utils.mailer) so the response does not wait on Resend
+        admin_email_to = getattr(settings, 'RESEND_ADMIN_EMAIL', "contact@zsyio.com") or "contact@zsyio.com"
 
-            # User Auto-Reply
-            try:
-                resend.Emails.send({
-                    "from": f"Zsyio Team <{from_email}>",
-                    "to": [email],
-                    "subject": "We received your message - Zsyio",
-                    "html": f"<p>Hi {name},</p><p>We have received your message and will get back to you shortly.</p>",
-                })
-            except Exception as e:
-                print(f"Error sending user auto-reply: {str(e)}")
-                
-        except Exception as e:
-            print(f"Critical error in contact email logic: {str(e)}")
+        # Admin Notification
+        send_email(email_message(
+            'contact_admin', [admin_email_to], reply_to=email,
+            name=name, email=email, message=message,
+        ), kind='contact_admin')
+
+        # User Auto-Reply
+        send_email(email_message('contact_auto_reply', [email], name=name), kind='contact_auto_reply')
 
         return Response({"status": "success", "message": "Message sent successfully"}, status=status.HTTP_201_CREATED)
@@ -0,0 +1,47 @@
+"""
+Store pricing rules in the `estimation_rules` collection (type "pricing").
+
+Usage:
+    python manage.py load_pricing_rules                  # store DEFAULT_PRICING_RULES
+    python manage.py load_pricing_rules --file rules.json
+"""
+
+import datetime
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.estimation.pricing import DEFAULT_PRICING_RULES, PricingEngine, RuleError
+from apps.utils.cache import content_cache
+from apps.utils.mongo import get_mongo_db
+
+
+class Command(BaseCommand):
+    help = 'Validate and store the estimation pricing rules'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', help='JSON file mapping service id -> rule')
+
+    def handle(self, *args, **options):
+        rules = DEFAULT_PRICING_RULES
+        if options['file']:
+            with open(options['file'], encoding='utf-8') as fh:
+                rules = json.load(fh)
+
+        # Compile before writing so a bad rule never reaches the API
+        try:
+            PricingEngine(rules)
+        except RuleError as e:
+            raise CommandError(f"Invalid rules: {e}")
+
+        db = get_mongo_db()
+        if db is None:
+            raise CommandError('Could not connect to MongoDB')
+
+        db['estimation_rules'].update_one(
+            {"type": "pricing"},
+            {"$set": {"data": rules, "updated_at": datetime.datetime.utcnow()}},
+            upsert=True,
+        )
+        content_cache.bump('estimation_rules')
+        self.stdout.write(self.style.SUCCESS(f"Stored pricing rules for {len(rules)} services"))
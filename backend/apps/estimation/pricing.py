@@ -0,0 +1,286 @@
+"""
+Data-driven pricing for EstimateView.
+Usage:
+    from apps.estimation.rules import get_pricing_engine
+
+    engine = get_pricing_engine()
+    engine.estimate('web-development', {'pages': 3, 'features': {'cms': True}})
+    # {'total': 80000, 'breakdown': [{'label': 'Base Development', 'value': 50000}, ...]}
+
+    engine.estimate_many([('hosting', {'years': 1}), ('hosting', {'years': 3})])
+
+Rules live in the `estimation_rules` collection as {"type": "pricing",
+"data": {<service id>: <rule>}} and fall back to DEFAULT_PRICING_RULES. A
+rule declares its parameters and an ordered list of lines:
+
+    "deployment": {
+        "params": {"environments": {"type": "int", "default": 1}},
+        "lines": [
+            {"label": "Base Setup", "amount": "5000"},
+            {"label": "Environments ({environments})", "amount": "environments * 2500"},
+        ],
+    }
+
+`amount`, `when` and the {...} placeholders in `label` are arithmetic
+expressions over the declared parameters (+ - * / // %, comparisons,
+and/or/not, x if c else y, max/min/int/float/round/abs). A line is only
+added when `when` is truthy and the amount is positive. Each rule is
+compiled once into a plain Python function; apps.estimation.rules keeps
+the compiled engine for the current rules document.
+"""
+
+import ast
+import re
+import string
+
+# Mirrors the original hardcoded calculate_cost, line for line (including
+# the web-designing package being listed twice).
+DEFAULT_PRICING_RULES = {
+    "web-designing": {
+        "params": {
+            "pages": {"type": "int", "default": 1},
+            "iterations": {"type": "int", "default": 1},
+            "logo": {"type": "raw", "default": False},
+        },
+        "lines": [
+            {"label": "Base Price", "amount": "15000"},
+            {"label": "Pages ({pages})", "amount": "pages * 2000"},
+            {
+                "label": "Extra Iterations ({max(1, iterations - 1) - 1 if iterations > 1 else 0})",
+                "amount": "max(0, iterations - 2) * 5000",
+            },
+            {"label": "Base Design Package", "amount": "15000"},
+            {"label": "Additional Pages ({pages})", "amount": "pages * 2000"},
+            {"label": "Design Iterations", "amount": "max(1, iterations - 1) * 5000"},
+            {"label": "Logo Design", "amount": "6000", "when": "logo"},
+        ],
+    },
+    "web-development": {
+        "params": {
+            "pages": {"type": "int", "default": 1},
+            "cms": {"type": "raw", "from": "features.cms", "default": False},
+            "auth": {"type": "raw", "from": "features.auth", "default": False},
+            "payments": {"type": "raw", "from": "features.payments", "default": False},
+        },
+        "lines": [
+            {"label": "Base Development", "amount": "50000"},
+            {"label": "Pages Implementation ({pages})", "amount": "pages * 5000"},
+            {"label": "CMS Integration", "amount": "15000", "when": "cms"},
+            {"label": "Authentication System", "amount": "14000", "when": "auth"},
+            {"label": "Payment Gateway", "amount": "20000", "when": "payments"},
+        ],
+    },
+    "deployment": {
+        "params": {"environments": {"type": "int", "default": 1}},
+        "lines": [
+            {"label": "Base Setup", "amount": "5000"},
+            {"label": "Environments ({environments})", "amount": "environments * 2500"},
+        ],
+    },
+    "company-details": {
+        "params": {"pages": {"type": "int", "default": 1}},
+        "lines": [
+            {"label": "Base Package", "amount": "4000"},
+            {"label": "Pages Content ({pages})", "amount": "pages * 1500"},
+        ],
+    },
+    "hosting": {
+        "params": {"years": {"type": "int", "default": 1}},
+        "lines": [
+            {"label": "Hosting ({years} years)", "amount": "5000 * years"},
+        ],
+    },
+    "app-development": {
+        "params": {
+            "screens": {"type": "int", "default": 5},
+            "platform": {"type": "raw", "default": "single"},
+        },
+        "lines": [
+            {"label": "Base App Development", "amount": "50000"},
+            {"label": "Screens ({screens})", "amount": "screens * 4000"},
+            {"label": "Dual Platform (iOS + Android)", "amount": "12000", "when": "platform == 'both'"},
+        ],
+    },
+    "logo-designing": {
+        "params": {
+            "concepts": {"type": "int", "default": 1},
+            "revisions": {"type": "int", "default": 2},
+        },
+        "lines": [
+            {"label": "Base Logo Package", "amount": "6000"},
+            {"label": "Concepts ({concepts})", "amount": "concepts * 2000"},
+            {"label": "Extra Revisions ({max(0, revisions - 2)})", "amount": "max(0, revisions - 2) * 1500"},
+        ],
+    },
+    "data-solutions": {
+        "params": {
+            "dashboards": {"type": "int", "default": 1},
+            "integrations": {"type": "int", "default": 0},
+        },
+        "lines": [
+            {"label": "Base Data Setup", "amount": "18000"},
+            {"label": "Dashboards ({dashboards})", "amount": "dashboards * 5000"},
+            {"label": "Integrations ({integrations})", "amount": "integrations * 4000"},
+        ],
+    },
+}
+
+
+class RuleError(ValueError):
+    """A pricing rule could not be compiled."""
+
+
+_PARAM_RE = re.compile(r'^[a-z][a-z0-9_]*$')
+_FUNCTIONS = {'max': max, 'min': min, 'int': int, 'float': float, 'round': round, 'abs': abs}
+_COERCE = {'int': int, 'float': float, 'bool': bool, 'raw': None}
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare, ast.IfExp,
+    ast.Call, ast.Name, ast.Constant, ast.Load,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod,
+    ast.UAdd, ast.USub, ast.Not, ast.And, ast.Or,
+    ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+)
+
+
+def _parse_expr(source, names):
+    """Parse and validate an expression, returning its ast.Expression."""
+    try:
+        tree = ast.parse(str(source).strip(), mode='eval')
+    except SyntaxError as e:
+        raise RuleError(f"Invalid expression {source!r}: {e.msg}")
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise RuleError(f"{type(node).__name__} is not allowed in {source!r}")
+        if isinstance(node, ast.Name) and node.id not in names and node.id not in _FUNCTIONS:
+            raise RuleError(f"Unknown name {node.id!r} in {source!r}")
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in _FUNCTIONS or node.keywords:
+                raise RuleError(f"Only {', '.join(_FUNCTIONS)} can be called in {source!r}")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float, str, bool, type(None))):
+            raise RuleError(f"Unsupported constant in {source!r}")
+    return tree
+
+
+def _compile_expr(source, names):
+    """Validate an expression and return its Python source."""
+    return f"({ast.unparse(_parse_expr(source, names).body)})"
+
+
+def _compile_label(label, names):
+    """Turn 'Pages ({pages})' into a Python string expression."""
+    parts = []
+    try:
+        pieces = list(string.Formatter().parse(str(label)))
+    except ValueError as e:
+        raise RuleError(f"Invalid label {label!r}: {e}")
+    for literal, field, spec, conversion in pieces:
+        if literal:
+            parts.append(repr(literal))
+        if field is not None:
+            if spec or conversion:
+                raise RuleError(f"Format specs are not supported in label {label!r}")
+            parts.append(f"_str{_compile_expr(field, names)}")
+    return ' + '.join(parts) or "''"
+
+
+def compile_rule(service_id, rule):
+    """Compile one service rule into a function params -> (total, breakdown)."""
+    if not isinstance(rule, dict):
+        raise RuleError(f"{service_id}: a rule must be an object")
+    params = rule.get('params') or {}
+    lines = rule.get('lines') or []
+    if not isinstance(params, dict):
+        raise RuleError(f"{service_id}: params must be an object")
+    if not isinstance(lines, list):
+        raise RuleError(f"{service_id}: lines must be a list")
+    names = set(params)
+    src = ["def _price(_p):"]
+    for name, spec in params.items():
+        if not isinstance(name, str) or not _PARAM_RE.match(name) or name in _FUNCTIONS:
+            raise RuleError(f"{service_id}: invalid parameter name {name!r}")
+        if not isinstance(spec, dict):
+            raise RuleError(f"{service_id}: the spec for {name!r} must be an object")
+        kind = spec.get('type', 'raw')
+        if kind not in _COERCE:
+            raise RuleError(f"{service_id}: unknown type {kind!r} for {name!r}")
+        path = tuple(str(spec.get('from', name)).split('.'))
+        default = spec.get('default')
+        if len(path) == 1:
+            value = f"_p.get({path[0]!r}, {default!r})"
+        else:
+            value = f"_get(_p, {path!r}, {default!r})"
+        src.append(f"    {name} = {value}" if kind == 'raw' else f"    {name} = _{kind}({value})")
+    src.append("    _total = 0")
+    src.append("    _lines = []")
+    for line in lines:
+        if not isinstance(line, dict) or 'label' not in line or 'amount' not in line:
+            raise RuleError(f"{service_id}: every line needs a label and an amount")
+        indent = "    "
+        if line.get('when') not in (None, ''):
+            src.append(f"    if {_compile_expr(line['when'], names)}:")
+            indent = "        "
+        src.append(f"{indent}_amount = {_compile_expr(line['amount'], names)}")
+        src.append(f"{indent}if _amount > 0:")
+        src.append(f"{indent}    _total += _amount")
+        src.append(f"{indent}    _lines.append({{'label': {_compile_label(line['label'], names)}, 'value': _amount}})")
+    src.append("    return _total, _lines")
+
+    namespace = {
+        '__builtins__': {}, '_get': _get, '_str': str,
+        '_int': int, '_float': float, '_bool': bool, **_FUNCTIONS,
+    }
+    try:
+        exec(compile('\n'.join(src), f'<pricing:{service_id}>', 'exec'), namespace)
+    except SyntaxError as e:
+        raise RuleError(f"{service_id}: {e.msg}")
+    return namespace['_price']
+
+
+def _get(params, path, default):
+    value = params
+    for key in path:
+        if not isinstance(value, dict) or key not in value:
+            return default
+        value = value[key]
+    return value
+
+
+class PricingEngine:
+    def __init__(self, rules):
+        self.rules = rules
+        self._table = {service_id: compile_rule(service_id, rule) for service_id, rule in rules.items()}
+
+    def estimate(self, service_id, params=None):
+        """
+        Price one configuration. Unknown services cost 0; parameters that
+        cannot be coerced raise ValueError.
+        """
+        price = self._table.get(service_id)
+        if price is None:
+            return {"total": 0, "breakdown": []}
+        if not isinstance(params, dict):
+            params = {}
+        try:
+            total, breakdown = price(params)
+        except (TypeError, ArithmeticError) as e:
+            raise ValueError(str(e))
+        return {"total": total, "breakdown": breakdown}
+
+    def estimate_many(self, requests):
+        """
+        Price a list of (service_id, params) pairs. Each result is the
+        estimate() dict, or {"error": ...} for a configuration that failed.
+        """
+        table = self._table
+        results = []
+        for service_id, params in requests:
+            price = table.get(service_id)
+            if price is None:
+                results.append({"total": 0, "breakdown": []})
+                continue
+            try:
+                total, breakdown = price(params if isinstance(params, dict) else {})
+                results.append({"total": total, "breakdown": breakdown})
+            except (TypeError, ValueError, ArithmeticError) as e:
+                results.append({"error": str(e)})
+        return results
@@ -0,0 +1,168 @@
+"""
+In-process store for the `estimation_rules` documents.
+Usage:
+    from apps.estimation.rules import get_pricing_engine, rules_store
+
+    snapshot = rules_store.get()
+    snapshot.inputs           # estimator defaults (type "defaults")
+    snapshot.body, .etag      # the same, pre-encoded for EstimateRulesView
+    get_pricing_engine()      # compiled PricingEngine (type "pricing")
+
+Both documents are read with one query. After the first load, requests
+never wait on Mongo: when the 'estimation_rules' version in content_cache
+moves (load_pricing_rules, invalidation events) or the snapshot is older
+than ESTIMATION_RULES_MAX_AGE, the current snapshot keeps being served
+while a single background thread reloads it (stale-while-revalidate).
+"""
+
+import hashlib
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+
+from apps.estimation.pricing import DEFAULT_PRICING_RULES, PricingEngine
+from apps.utils.cache import content_cache
+from apps.utils.mongo import get_mongo_db
+from apps.utils.serialization import dumps
+
+# Hardcoded defaults as fallback
+DEFAULT_INPUTS = {
+  "web-designing": {
+    "pages": 1,
+    "iterations": 1,
+    "logo": False,
+  },
+  "web-development": {
+    "pages": 1,
+    "features": {
+      "cms": False,
+      "auth": False,
+      "payments": False,
+    },
+  },
+  "deployment": {
+    "environments": 1,
+  },
+  "company-details": {
+    "pages": 1,
+  },
+  "hosting": {
+    "years": 1,
+  },
+  "app-development": {
+    "screens": 5,
+    "platform": "single",
+  },
+  "logo-designing": {
+    "concepts": 1,
+    "revisions": 2,
+  },
+  "data-solutions": {
+    "dashboards": 1,
+    "integrations": 0,
+  },
+}
+
+RulesSnapshot = namedtuple('RulesSnapshot', ['inputs', 'body', 'etag', 'pricing_rules', 'engine'])
+
+_DEFAULT_ENGINE = PricingEngine(DEFAULT_PRICING_RULES)
+_RETRY_AFTER = 30
+
+
+def _snapshot(inputs, pricing_rules, previous=None):
+    """Build a snapshot; stored rules that fail to compile keep `previous` (or the defaults)."""
+    try:
+        if pricing_rules is DEFAULT_PRICING_RULES:
+            engine = _DEFAULT_ENGINE
+        elif previous is not None and previous.pricing_rules == pricing_rules:
+            engine = previous.engine
+        else:
+            engine = PricingEngine(pricing_rules)
+        body = dumps(inputs)
+    except Exception as e:
+        print(f"[Pricing] Stored rules rejected, keeping the current rules: {e}")
+        return previous or _DEFAULT_SNAPSHOT
+    etag = f'"{hashlib.sha1(body).hexdigest()}"'
+    return RulesSnapshot(inputs, body, etag, pricing_rules, engine)
+
+
+_DEFAULT_SNAPSHOT = _snapshot(DEFAULT_INPUTS, DEFAULT_PRICING_RULES)
+
+
+class RulesStore:
+    def __init__(self, max_age=300):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._version = None
+        self._expires_at = 0.0
+        self._refreshing = False
+
+    def get(self):
+        version = content_cache.version('estimation_rules')
+        snapshot = self._snapshot
+        if snapshot is None:
+            # Only the very first request in a process waits for Mongo
+            with self._lock:
+                if self._snapshot is None:
+                    self._apply(version, self._load(None))
+            return self._snapshot
+        if version != self._version or time.monotonic() >= self._expires_at:
+            self._refresh_in_background(version)
+        return snapshot
+
+    def _refresh_in_background(self, version):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(
+            target=self._refresh, args=(version,),
+            name='estimation-rules-refresh', daemon=True,
+        ).start()
+
+    def _refresh(self, version):
+        try:
+            loaded = self._load(self._snapshot)
+            with self._lock:
+                self._apply(version, loaded)
+        finally:
+            self._refreshing = False
+
+    def _apply(self, version, loaded):
+        snapshot, fresh = loaded
+        self._snapshot = snapshot
+        self._version = version
+        self._expires_at = time.monotonic() + (self.max_age if fresh else min(self.max_age, _RETRY_AFTER))
+
+    def _load(self, previous):
+        """Return (snapshot, fresh); keeps `previous` when Mongo is unavailable."""
+        fallback = previous or _DEFAULT_SNAPSHOT
+        db = get_mongo_db()
+        if db is None:
+            return fallback, False
+        try:
+            docs = {
+                doc.get('type'): doc
+                for doc in db['estimation_rules'].find({"type": {"$in": ["defaults", "pricing"]}}, {"_id": 0})
+            }
+        except Exception as e:
+            print(f"[MongoDB] Could not load estimation rules: {e}")
+            return fallback, False
+
+        defaults_doc = docs.get('defaults')
+        inputs = defaults_doc.get('data', DEFAULT_INPUTS) if defaults_doc else DEFAULT_INPUTS
+        pricing = (docs.get('pricing') or {}).get('data')
+        if not isinstance(pricing, dict) or not pricing:
+            pricing = DEFAULT_PRICING_RULES
+        return _snapshot(inputs, pricing, previous), True
+
+
+rules_store = RulesStore(max_age=getattr(settings, 'ESTIMATION_RULES_MAX_AGE', 300))
+
+
+def get_pricing_engine():
+    """The compiled engine for the current rules snapshot."""
+    return rules_store.get().engine
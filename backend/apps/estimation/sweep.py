@@ -0,0 +1,381 @@
+"""
+Vectorized scenario sweeps over the pricing rules.
+Usage:
+    from apps.estimation.rules import get_pricing_engine
+    from apps.estimation.sweep import run_sweep
+
+    result = run_sweep(
+        get_pricing_engine(), 'web-development',
+        grid={'pages': {'start': 1, 'stop': 50}, 'features.cms': [False, True]},
+        params={'features': {'auth': True}},
+    )
+    result['totals']   # 100 totals, first axis varies slowest
+    result['points']   # [{'params': {'pages': 1, 'features.cms': False}, 'estimatedCost': ..., 'breakdown': [...]}, ...]
+
+Grid keys are request parameter paths (the rule's `from`, or the parameter
+name); values are a list or an inclusive {start, stop, step} range. Each
+rule is translated once into a NumPy version of its expressions, so a
+sweep evaluates every line for every point in one array pass. Without
+NumPy, or for a rule (or grid) that cannot be evaluated element-wise with
+the same results, points are priced one by one with
+PricingEngine.estimate_many.
+"""
+
+import ast
+import math
+import string
+import weakref
+from functools import reduce
+from itertools import compress, product
+
+from apps.estimation.pricing import _COERCE, _get, _parse_expr, RuleError
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Typed int axes stay in int64 only while products cannot overflow
+_INT64_SAFE = 2 ** 31
+
+# engine -> {service_id: vectorized function, or None when not vectorizable}
+_vectorized = weakref.WeakKeyDictionary()
+
+
+# ---------------------------------------------------------------------
+# Grid handling
+# ---------------------------------------------------------------------
+def _axis_values(key, spec):
+    """(values, length) for one grid axis; ranges stay lazy until the budget check."""
+    if isinstance(spec, dict):
+        try:
+            start, stop, step = int(spec['start']), int(spec['stop']), int(spec.get('step', 1))
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"grid.{key} needs integer start and stop")
+        if step == 0:
+            raise ValueError(f"grid.{key}: step cannot be 0")
+        values = range(start, stop + (1 if step > 0 else -1), step)
+        # len(range) raises OverflowError past sys.maxsize
+        length = max((stop - start) // step + 1, 0)
+    elif isinstance(spec, list):
+        values, length = spec, len(spec)
+    else:
+        raise ValueError(f"grid.{key} must be a list or a {{start, stop, step}} range")
+    if not length:
+        raise ValueError(f"grid.{key} is empty")
+    return values, length
+
+
+def parse_grid(grid, max_points):
+    """Return [(key, values)] and the point count; raises ValueError."""
+    if not isinstance(grid, dict) or not grid:
+        raise ValueError("grid must be a non-empty object")
+    axes = [(str(key), *_axis_values(key, spec)) for key, spec in grid.items()]
+    count = math.prod(length for _, _, length in axes)
+    if count > max_points:
+        raise ValueError(f"Sweep has {count} points, at most {max_points} allowed")
+    return [(key, list(values)) for key, values, _ in axes], count
+
+
+def _with_path(params, path, value):
+    """Copy of `params` with `value` set at the dotted `path`."""
+    head = path[0]
+    result = dict(params) if isinstance(params, dict) else {}
+    if len(path) == 1:
+        result[head] = value
+    else:
+        result[head] = _with_path(result.get(head), path[1:], value)
+    return result
+
+
+def _points(axes, base):
+    """Per-point request params, in the same order as the vectorized pass."""
+    points = [base]
+    for key, values in axes:
+        path = tuple(key.split('.'))
+        points = [_with_path(point, path, value) for point in points for value in values]
+    return points
+
+
+# ---------------------------------------------------------------------
+# NumPy translation
+# ---------------------------------------------------------------------
+def _truth(x):
+    return np.asarray(x).astype(bool)
+
+
+def _where(cond, a, b):
+    return np.where(cond, a, b)
+
+
+def _vnot(x):
+    return np.logical_not(_truth(x))
+
+
+def _vmax(*args):
+    return reduce(np.maximum, args)
+
+
+def _vmin(*args):
+    return reduce(np.minimum, args)
+
+
+def _vint(x):
+    arr = np.asarray(x)
+    if arr.dtype.kind in 'iub':
+        return arr.astype(np.int64)
+    if arr.dtype.kind == 'f':
+        return np.trunc(arr).astype(np.int64)
+    return np.vectorize(int, otypes=[object])(arr)
+
+
+def _vfloat(x):
+    arr = np.asarray(x)
+    if arr.dtype.kind in 'iufb':
+        return arr.astype(np.float64)
+    return np.vectorize(float, otypes=[object])(arr)
+
+
+def _vround(x, ndigits=None):
+    arr = np.asarray(x)
+    if ndigits is None and arr.dtype.kind in 'iu':
+        return arr
+    if ndigits is None and arr.dtype.kind == 'f':
+        # rint rounds half to even, like round()
+        return np.rint(arr).astype(np.int64)
+    return np.vectorize(lambda v: round(v, ndigits), otypes=[object])(arr)
+
+
+def _vabs(x):
+    return np.abs(x)
+
+
+_VECTOR_FUNCTIONS = {'max': '_vmax', 'min': '_vmin', 'int': '_vint', 'float': '_vfloat', 'round': '_vround', 'abs': '_vabs'}
+
+
+def _call(name, *args):
+    return ast.Call(func=ast.Name(id=name, ctx=ast.Load()), args=list(args), keywords=[])
+
+
+def _fold(op, values):
+    # Same values as Python: `a and b` is b if a else a, `a or b` is a if a else b
+    result = values[0]
+    for value in values[1:]:
+        if isinstance(op, ast.And):
+            result = _call('_where', _call('_truth', result), value, result)
+        else:
+            result = _call('_where', _call('_truth', result), result, value)
+    return result
+
+
+class _Vectorize(ast.NodeTransformer):
+    """Rewrite a validated rule expression so it works element-wise on arrays."""
+
+    def visit_Call(self, node):
+        self.generic_visit(node)
+        return _call(_VECTOR_FUNCTIONS[node.func.id], *node.args)
+
+    def visit_IfExp(self, node):
+        self.generic_visit(node)
+        return _call('_where', _call('_truth', node.test), node.body, node.orelse)
+
+    def visit_BoolOp(self, node):
+        self.generic_visit(node)
+        return _fold(node.op, node.values)
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not):
+            return _call('_vnot', node.operand)
+        return node
+
+    def visit_Compare(self, node):
+        self.generic_visit(node)
+        if len(node.ops) == 1:
+            return node
+        operands = [node.left] + node.comparators
+        pairs = [
+            ast.Compare(left=left, ops=[op], comparators=[right])
+            for left, op, right in zip(operands, node.ops, operands[1:])
+        ]
+        return _fold(ast.And(), pairs)
+
+
+def _vector_expr(source, names):
+    tree = _Vectorize().visit(_parse_expr(source, names))
+    return f"({ast.unparse(ast.fix_missing_locations(tree).body)})"
+
+
+def _vector_label(label, names):
+    parts = []
+    for literal, field, spec, conversion in string.Formatter().parse(str(label)):
+        if literal:
+            parts.append(f"(True, {literal!r})")
+        if field is not None:
+            if spec or conversion:
+                raise RuleError(f"Format specs are not supported in label {label!r}")
+            parts.append(f"(False, {_vector_expr(field, names)})")
+    return f"({', '.join(parts)},)" if parts else "()"
+
+
+def compile_rule_vectorized(service_id, rule):
+    """
+    Compile one service rule into a function {param: array} -> [(when,
+    amount, label_parts)], one tuple per line.
+    """
+    params = rule.get('params') or {}
+    names = set(params)
+    src = ["def _sweep(_a):"]
+    for name in params:
+        src.append(f"    {name} = _a[{name!r}]")
+    src.append("    return [")
+    for line in rule.get('lines') or []:
+        when = line.get('when')
+        when_src = "True" if when in (None, '') else f"_truth{_vector_expr(when, names)}"
+        src.append(f"        ({when_src}, {_vector_expr(line['amount'], names)}, {_vector_label(line['label'], names)}),")
+    src.append("    ]")
+
+    namespace = {
+        '__builtins__': {}, '_truth': _truth, '_where': _where, '_vnot': _vnot,
+        '_vmax': _vmax, '_vmin': _vmin, '_vint': _vint, '_vfloat': _vfloat,
+        '_vround': _vround, '_vabs': _vabs,
+    }
+    exec(compile('\n'.join(src), f'<sweep:{service_id}>', 'exec'), namespace)
+    return namespace['_sweep']
+
+
+def _vector_fn(engine, service_id):
+    if np is None:
+        return None
+    table = _vectorized.setdefault(engine, {})
+    if service_id not in table:
+        try:
+            table[service_id] = compile_rule_vectorized(service_id, engine.rules[service_id])
+        except (RuleError, SyntaxError, KeyError) as e:
+            print(f"[Pricing] '{service_id}' cannot be vectorized, sweeps use the scalar engine: {e}")
+            table[service_id] = None
+    return table[service_id]
+
+
+def _axis_array(values, kind):
+    coerce = _COERCE[kind]
+    if coerce is not None:
+        values = [coerce(v) for v in values]
+    if kind == 'int' and all(-_INT64_SAFE < v < _INT64_SAFE for v in values):
+        return np.array(values, dtype=np.int64)
+    if kind == 'float':
+        return np.array(values, dtype=np.float64)
+    if kind == 'bool':
+        return np.array(values, dtype=bool)
+    arr = np.empty(len(values), dtype=object)
+    arr[:] = values
+    return arr
+
+
+def _column(value, count):
+    return np.broadcast_to(np.asarray(value), (count,)).tolist()
+
+
+def _grid_keys(rule):
+    return {str(spec.get('from', name)) for name, spec in (rule.get('params') or {}).items()}
+
+
+def _run_vectorized(fn, rule, axes, count, base):
+    """
+    Evaluate every line for every point. Returns (totals, lines) where lines
+    holds (include mask, amounts, label parts) arrays per rule line.
+    """
+    shape = [len(values) for _, values in axes]
+    index = np.indices(shape).reshape(len(shape), -1)
+    positions = {key: i for i, (key, _) in enumerate(axes)}
+
+    arrays = {}
+    for name, spec in (rule.get('params') or {}).items():
+        kind = spec.get('type', 'raw')
+        key = str(spec.get('from', name))
+        if key in positions:
+            arrays[name] = _axis_array(axes[positions[key]][1], kind)[index[positions[key]]]
+        else:
+            arrays[name] = _axis_array([_get(base, tuple(key.split('.')), spec.get('default'))], kind)
+
+    totals = np.zeros(count, dtype=np.int64)
+    lines = []
+    with np.errstate(divide='raise', over='raise', invalid='raise'):
+        for when, amount, label_parts in fn(arrays):
+            amount = np.broadcast_to(amount, (count,))
+            include = np.broadcast_to(np.logical_and(when, amount > 0), (count,))
+            totals = totals + np.where(include, amount, 0)
+            lines.append((include, amount, label_parts))
+    return totals, lines
+
+
+def _breakdowns(lines, count):
+    breakdowns = [[] for _ in range(count)]
+    for include, amounts, label_parts in lines:
+        amounts = amounts.tolist()
+        rows = list(compress(range(count), include.tolist()))
+        fmt = ''.join(
+            value.replace('{', '{{').replace('}', '}}') if is_literal else '{}'
+            for is_literal, value in label_parts
+        )
+        columns = [_column(value, count) for is_literal, value in label_parts if not is_literal]
+        if not columns:
+            label = fmt.format()
+            for i in rows:
+                breakdowns[i].append({"label": label, "value": amounts[i]})
+            continue
+        values = list(zip(*columns))
+        for i in rows:
+            breakdowns[i].append({"label": fmt.format(*values[i]), "value": amounts[i]})
+    return breakdowns
+
+
+def run_sweep(engine, service_id, grid, params=None, max_points=10000, breakdown=True):
+    """
+    Price every point of `grid` (over the fixed `params`) for one service.
+    Raises ValueError for a malformed grid or parameters that cannot be
+    coerced.
+    """
+    axes, count = parse_grid(grid, max_points)
+    base = params if isinstance(params, dict) else {}
+    rule = engine.rules.get(service_id)
+    if rule is not None:
+        unknown = [key for key, _ in axes if key not in _grid_keys(rule)]
+        if unknown:
+            raise ValueError(f"Unknown grid parameter(s) for {service_id}: {', '.join(unknown)}")
+
+    computed = None
+    fn = _vector_fn(engine, service_id) if rule is not None else None
+    if fn is not None:
+        try:
+            computed = _run_vectorized(fn, rule, axes, count, base)
+        except (TypeError, ArithmeticError):
+            # e.g. a division by zero in a branch np.where evaluates anyway;
+            # the scalar engine decides whether it is a real error
+            computed = None
+
+    if computed is not None:
+        totals_arr, lines = computed
+        totals = totals_arr.tolist()
+        breakdowns = _breakdowns(lines, count) if breakdown else None
+    else:
+        estimates = engine.estimate_many([(service_id, p) for p in _points(axes, base)])
+        for estimate in estimates:
+            if 'error' in estimate:
+                raise ValueError(estimate['error'])
+        totals = [e['total'] for e in estimates]
+        breakdowns = [e['breakdown'] for e in estimates]
+
+    result = {
+        "serviceId": service_id,
+        "axes": {key: values for key, values in axes},
+        "count": count,
+        "totals": totals,
+    }
+    if breakdown:
+        keys = [key for key, _ in axes]
+        result["points"] = [
+            {"params": dict(zip(keys, combo)), "estimatedCost": total, "breakdown": items}
+            for combo, total, items in zip(product(*(values for _, values in axes)), totals, breakdowns)
+        ]
+    return result
@@ -1,3 +1,168 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.test import SimpleTestCase
+from pymongo.errors import ServerSelectionTimeoutError
+
+from apps.utils.cache import content_cache
+
+from apps.estimation.pricing import DEFAULT_PRICING_RULES, PricingEngine, RuleError, compile_rule
+from apps.estimation.rules import DEFAULT_INPUTS, RulesStore, _DEFAULT_ENGINE, _snapshot
+from apps.estimation.sweep import parse_grid, run_sweep
+
+
+def fake_db(docs):
+    db = mock.MagicMock()
+    db.__getitem__.return_value.find.return_value = docs
+    return db
+
+
+class CompileRuleShapeTests(SimpleTestCase):
+    def test_malformed_rules_raise_rule_error(self):
+        for rule in (
+            'not a rule',
+            {'params': ['years']},
+            {'params': {'years': 'int'}},
+            {'lines': {'label': 'Base', 'amount': '1'}},
+            {'lines': ['Base']},
+            {'lines': [{'label': 'Base'}]},
+        ):
+            with self.subTest(rule=rule), self.assertRaises(RuleError):
+                compile_rule('hosting', rule)
+
+    def test_default_rules_compile(self):
+        engine = PricingEngine(DEFAULT_PRICING_RULES)
+        self.assertEqual(engine.estimate('hosting', {'years': 2})['total'], 10000)
+
+
+class PricingDslTests(SimpleTestCase):
+    rule = {
+        'params': {
+            'pages': {'type': 'int', 'default': 1},
+            'cms': {'type': 'raw', 'from': 'features.cms', 'default': False},
+        },
+        'lines': [
+            {'label': 'Base', 'amount': '1000'},
+            {'label': 'Pages ({pages}, {pages * 2} sides)', 'amount': 'max(0, pages - 1) * 100'},
+            {'label': 'CMS', 'amount': '500 if pages < 10 else 800', 'when': 'cms and not pages == 0'},
+        ],
+    }
+
+    def test_lines_labels_and_conditions(self):
+        price = compile_rule('site', self.rule)
+        self.assertEqual(price({'pages': '3', 'features': {'cms': True}}), (1700, [
+            {'label': 'Base', 'value': 1000},
+            {'label': 'Pages (3, 6 sides)', 'value': 200},
+            {'label': 'CMS', 'value': 500},
+        ]))
+        # Non-positive amounts and false `when` lines are left out
+        self.assertEqual(price({}), (1000, [{'label': 'Base', 'value': 1000}]))
+
+    def test_unsafe_expressions_are_rejected(self):
+        for amount in (
+            "__import__('os')", 'pages.__class__', 'open', '[pages]', 'pages ** 99',
+            'lambda: 1', 'max(pages, key=abs)', 'unknown * 2', '(',
+        ):
+            rule = {'params': {'pages': {'type': 'int'}}, 'lines': [{'label': 'X', 'amount': amount}]}
+            with self.subTest(amount=amount), self.assertRaises(RuleError):
+                compile_rule('site', rule)
+
+    def test_estimate_errors(self):
+        engine = PricingEngine({'site': self.rule})
+        self.assertEqual(engine.estimate('unknown', {}), {'total': 0, 'breakdown': []})
+        with self.assertRaises(ValueError):
+            engine.estimate('site', {'pages': 'many'})
+        results = engine.estimate_many([('site', {'pages': 2}), ('site', {'pages': 'many'}), ('unknown', None)])
+        self.assertEqual(results[0]['total'], 1100)
+        self.assertIn('error', results[1])
+        self.assertEqual(results[2], {'total': 0, 'breakdown': []})
+
+    def test_defaults_match_the_original_calculation(self):
+        engine = PricingEngine(DEFAULT_PRICING_RULES)
+        self.assertEqual(engine.estimate('web-development', {'pages': 3, 'features': {'cms': True}})['total'], 80000)
+        # The base price and pages are listed twice, as in the original calculate_cost
+        self.assertEqual(
+            engine.estimate('web-designing', {'pages': 3, 'iterations': 2, 'logo': True})['total'],
+            15000 + 3 * 2000 + 15000 + 3 * 2000 + 5000 + 6000,
+        )
+
+
+class RulesSnapshotTests(SimpleTestCase):
+    def test_bad_stored_rules_keep_previous_snapshot(self):
+        previous = _snapshot(DEFAULT_INPUTS, DEFAULT_PRICING_RULES)
+        bad = {'hosting': {'params': {'years': 'int'}}}
+        self.assertIs(_snapshot(DEFAULT_INPUTS, bad, previous), previous)
+
+    def test_store_serves_defaults_when_stored_rules_are_malformed(self):
+        db = fake_db([{'type': 'pricing', 'data': {'hosting': {'params': {'years': 'int'}}}}])
+        with mock.patch('apps.estimation.rules.get_mongo_db', return_value=db):
+            snapshot = RulesStore().get()
+        self.assertIs(snapshot.engine, _DEFAULT_ENGINE)
+
+
+class SyncThread:
+    """threading.Thread stand-in that runs the refresh inline."""
+
+    def __init__(self, target, args=(), **kwargs):
+        self.target, self.args = target, args
+
+    def start(self):
+        self.target(*self.args)
+
+
+class RulesStoreRefreshTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch('apps.estimation.rules.threading.Thread', SyncThread)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_snapshot_is_reused_until_the_version_moves(self):
+        db = fake_db([{'type': 'defaults', 'data': {'hosting': {'years': 2}}}])
+        store = RulesStore()
+        with mock.patch('apps.estimation.rules.get_mongo_db', return_value=db):
+            first = store.get()
+            self.assertIs(store.get(), first)
+            self.assertEqual(db['estimation_rules'].find.call_count, 1)
+            self.assertEqual(first.body, b'{"hosting":{"years":2}}')
+
+            db['estimation_rules'].find.return_value = [{'type': 'defaults', 'data': {'hosting': {'years': 3}}}]
+            content_cache.bump('estimation_rules')
+            # The bump is picked up in the background; this request still gets the old snapshot
+            self.assertIs(store.get(), first)
+            self.assertEqual(store.get().inputs, {'hosting': {'years': 3}})
+            self.assertNotEqual(store.get().etag, first.etag)
+
+    def test_mongo_errors_keep_the_current_snapshot(self):
+        db = fake_db([{'type': 'defaults', 'data': {'hosting': {'years': 2}}}])
+        store = RulesStore()
+        with mock.patch('apps.estimation.rules.get_mongo_db', return_value=db):
+            first = store.get()
+            db['estimation_rules'].find.side_effect = ServerSelectionTimeoutError('down')
+            content_cache.bump('estimation_rules')
+            store.get()
+            self.assertIs(store.get(), first)
+
+
+class SweepTests(SimpleTestCase):
+    def test_huge_range_is_rejected_by_point_budget(self):
+        with self.assertRaisesMessage(ValueError, 'at most 100 allowed'):
+            parse_grid({'pages': {'start': 0, 'stop': 10 ** 30}}, 100)
+
+    def test_range_lengths(self):
+        axes, count = parse_grid({'pages': {'start': 10, 'stop': 0, 'step': -3}, 'cms': [False, True]}, 100)
+        self.assertEqual(axes, [('pages', [10, 7, 4, 1]), ('cms', [False, True])])
+        self.assertEqual(count, 8)
+        with self.assertRaisesMessage(ValueError, 'grid.pages is empty'):
+            parse_grid({'pages': {'start': 5, 'stop': 1}}, 100)
+
+    def test_vectorized_sweep_matches_engine(self):
+        engine = PricingEngine(DEFAULT_PRICING_RULES)
+        for service_id, grid in (
+            ('web-development', {'pages': {'start': 1, 'stop': 12}, 'features.cms': [False, True]}),
+            ('app-development', {'screens': [1, 5, 20], 'platform': ['single', 'both']}),
+            ('hosting', {'years': {'start': 1, 'stop': 5}}),
+        ):
+            with self.subTest(service_id=service_id):
+                vectorized = run_sweep(engine, service_id, grid)
+                with mock.patch('apps.estimation.sweep._vector_fn', return_value=None):
+                    scalar = run_sweep(engine, service_id, grid)
+                self.assertEqual(vectorized, scalar)
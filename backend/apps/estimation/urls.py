@@ -1,7 +1,8 @@
 from django.urls import path
-from .views import EstimateView, EstimateRulesView
+from .views import EstimateView, EstimateRulesView, EstimateSweepView
 
 urlpatterns = [
     path('calculate/', EstimateView.as_view(), name='calculate_estimate'),
+    path('sweep/', EstimateSweepView.as_view(), name='estimate_sweep'),
     path('rules/', EstimateRulesView.as_view(), name='estimate_rules'),
 ]
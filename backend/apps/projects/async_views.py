@@ -0,0 +1,28 @@
+"""
+Async GET handlers for the projects app (enabled by ASYNC_MONGO_VIEWS,
+see apps.utils.async_views). Responses match ProjectViewSet.list.
+"""
+
+from apps.utils.async_mongo import get_async_mongo_db
+from apps.utils.async_views import json_response
+from apps.utils.pagination import keyset_filter
+from apps.utils.responses import async_cached_json_response
+
+from .views import PAGE_SORT, finish_page, parse_list_params
+
+
+@async_cached_json_response('projects')
+async def project_list(request):
+    db = get_async_mongo_db()
+    if db is None: return json_response([])
+    try:
+        limit, after, projection, requested = parse_list_params(request.GET)
+    except ValueError as e:
+        return json_response({"detail": str(e)}, status=400)
+
+    cursor = db['projects'].find(keyset_filter('created_at', after), projection).sort(PAGE_SORT)
+    if limit is not None:
+        cursor = cursor.limit(limit + 1)
+    projects = await cursor.to_list(None)
+    projects, headers = finish_page(request, request.GET, projects, limit, requested)
+    return json_response(projects, headers=headers)
@@ -1,3 +1,126 @@
-from django.test import TestCase
+import copy
+import datetime
+import json
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from bson.objectid import ObjectId
+from django.test import SimpleTestCase
+from rest_framework.test import APIRequestFactory
+
+from apps.utils.cache import content_cache
+from apps.utils.pagination import decode_cursor, encode_cursor, keyset_filter
+
+from . import async_views
+from .views import ProjectViewSet
+
+
+def fake_db(collection):
+    db = mock.MagicMock()
+    db.__getitem__.return_value = collection
+    return db
+
+
+def project_docs(count):
+    start = datetime.datetime(2025, 1, 1)
+    return [
+        {'_id': ObjectId(), 'title': f'Project {i}', 'created_at': start - datetime.timedelta(days=i)}
+        for i in range(count)
+    ]
+
+
+class ProjectListPaginationTests(SimpleTestCase):
+    def setUp(self):
+        content_cache.bump('projects')
+        self.coll = mock.MagicMock()
+        patcher = mock.patch('apps.projects.views.get_mongo_db', return_value=fake_db(self.coll))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get(self, url):
+        return ProjectViewSet.as_view({'get': 'list'})(APIRequestFactory().get(url))
+
+    def test_page_with_next_cursor(self):
+        docs = project_docs(3)
+        self.coll.find.return_value.sort.return_value.limit.return_value = copy.deepcopy(docs)
+        response = self.get('/api/projects/?limit=2&fields=title')
+
+        self.assertEqual(response.status_code, 200)
+        body = json.loads(response.content)
+        self.assertEqual(body, [{'id': str(docs[0]['_id']), 'title': 'Project 0'},
+                                {'id': str(docs[1]['_id']), 'title': 'Project 1'}])
+        self.coll.find.assert_called_once_with({}, {'title': 1, '_id': 1, 'created_at': 1})
+        self.coll.find.return_value.sort.return_value.limit.assert_called_once_with(3)
+        cursor = response['X-Next-Cursor']
+        self.assertEqual(decode_cursor(cursor), (docs[1]['created_at'], docs[1]['_id']))
+        self.assertTrue(response['Link'].startswith('</api/projects/?'))
+        self.assertIn(f'cursor={cursor}', response['Link'])
+
+        self.coll.find.return_value.sort.return_value.limit.return_value = docs[2:]
+        response = self.get(f'/api/projects/?limit=2&cursor={cursor}')
+        self.assertEqual(self.coll.find.call_args.args[0], keyset_filter('created_at', decode_cursor(cursor)))
+        self.assertFalse(response.has_header('X-Next-Cursor'))
+
+    def test_no_paging_params_returns_every_project(self):
+        docs = project_docs(3)
+        # A plain list as the sorted cursor: calling .limit() on it would fail
+        self.coll.find.return_value.sort.return_value = copy.deepcopy(docs)
+        response = self.get('/api/projects/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(json.loads(response.content)), 3)
+        self.assertFalse(response.has_header('X-Next-Cursor'))
+
+    def test_cursor_without_limit_uses_page_size(self):
+        docs = project_docs(3)
+        self.coll.find.return_value.sort.return_value.limit.return_value = copy.deepcopy(docs)
+        with self.settings(PROJECTS_PAGE_SIZE=2):
+            response = self.get(f'/api/projects/?cursor={encode_cursor(docs[0], "created_at")}')
+        self.coll.find.return_value.sort.return_value.limit.assert_called_once_with(3)
+        self.assertTrue(response.has_header('X-Next-Cursor'))
+
+    def test_bad_cursor_is_400(self):
+        self.assertEqual(self.get('/api/projects/?cursor=bogus').status_code, 400)
+        self.coll.find.assert_not_called()
+
+
+class AsyncProjectListTests(SimpleTestCase):
+    def test_async_list_matches_sync_list(self):
+        docs = project_docs(3)
+        coll = mock.MagicMock()
+        # finish_page() trims fields in place, so each path gets its own documents
+        coll.find.return_value.sort.return_value.limit.return_value = copy.deepcopy(docs)
+        acoll = mock.MagicMock()
+        acoll.find.return_value.sort.return_value.limit.return_value.to_list = mock.AsyncMock(return_value=copy.deepcopy(docs))
+        url = '/api/projects/?limit=2&fields=title'
+
+        content_cache.bump('projects')
+        with mock.patch('apps.projects.views.get_mongo_db', return_value=fake_db(coll)):
+            sync = ProjectViewSet.as_view({'get': 'list'})(APIRequestFactory().get(url))
+        content_cache.bump('projects')
+        with mock.patch('apps.projects.async_views.get_async_mongo_db', return_value=fake_db(acoll)):
+            response = async_to_sync(async_views.project_list)(APIRequestFactory().get(url))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, sync.content)
+        self.assertEqual(response['ETag'], sync['ETag'])
+        self.assertEqual(response['X-Next-Cursor'], sync['X-Next-Cursor'])
+        self.assertEqual(acoll.find.call_args, coll.find.call_args)
+
+
+class ProjectUpdateTests(SimpleTestCase):
+    def test_update_sets_updated_at(self):
+        oid = ObjectId()
+        coll = mock.MagicMock()
+        coll.find_one.return_value = {'_id': oid, 'title': 'New'}
+        request = APIRequestFactory().put(f'/api/projects/{oid}/', {'title': 'New'}, format='json')
+        view = ProjectViewSet.as_view({'put': 'update'})
+        with mock.patch('apps.projects.views.get_mongo_db', return_value=fake_db(coll)), \
+                mock.patch('apps.projects.views.mongo_log'):
+            response = view(request, pk=str(oid))
+
+        self.assertEqual(response.status_code, 200)
+        query, update = coll.update_one.call_args.args
+        self.assertEqual(query, {'_id': oid})
+        self.assertEqual(update['$set']['title'], 'New')
+        self.assertIn('updated_at', update['$set'])
@@ -1,5 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from apps.utils.async_views import async_get
+from . import async_views
 from .views import ProjectViewSet, ProjectCreateView, ProjectDeleteView
 
 router = DefaultRouter()
@@ -9,5 +11,6 @@ urlpatterns = [
     path('create/', ProjectCreateView.as_view(), name='project-create'),
     path('delete/<str:pk>/', ProjectDeleteView.as_view(), name='project-delete'),
     path('delete/<str:pk>', ProjectDeleteView.as_view(), name='project-delete-no-slash'),
+    path('', async_get(ProjectViewSet.as_view({'get': 'list', 'post': 'create'}), async_views.project_list), name='project-list-create'),
     path('', include(router.urls)),
 ]
@@ -3,7 +3,11 @@ from rest_framework.response import Response
 from django.conf import settings
 from .models import Project
 from .serializers import ProjectSerializer
+from apps.utils.cache import content_cache
 from apps.utils.mongo import get_mongo_db, mongo_log
+from apps.utils.pagination import decode_cursor, encode_cursor, keyset_filter, parse_fields, parse_limit
+from apps.utils.responses import cached_json_response
+from apps.utils.serialization import serialize_mongo_doc
 from apps.utils.views import ReloadMixin
 from bson.objectid import ObjectId
 import datetime
@@ -12,39 +16,73 @@ def get_projects_collection():
     db = get_mongo_db()
     return db['projects'] if db is not None else None
 
-def serialize_mongo_doc(doc):
-    """Recursively convert MongoDB ObjectId and datetime to JSON serializable formats."""
-    if doc is None:
-        return None
-    if isinstance(doc, list):
-        return [serialize_mongo_doc(item) for item in doc]
-    if isinstance(doc, dict):
-        new_doc = {}
-        for k, v in doc.items():
-            if k == '_id':
-                new_doc['id'] = str(v)
-            elif isinstance(v, (ObjectId, datetime.datetime)):
-                if isinstance(v, datetime.datetime):
-                    new_doc[k] = v.isoformat()
-                else:
-                    new_doc[k] = str(v)
-            elif isinstance(v, (list, dict)):
-                new_doc[k] = serialize_mongo_doc(v)
-            else:
-                new_doc[k] = v
-        return new_doc
-    return doc
+PAGE_SORT = [('created_at', -1), ('_id', -1)]
+
+def parse_list_params(query_params):
+    """
+    (limit, after, projection, requested) for a list request; raises ValueError.
+    limit is None when the client sent neither limit nor cursor (no paging).
+    """
+    after = decode_cursor(query_params.get('cursor'))
+    limit = parse_limit(
+        query_params.get('limit'),
+        default=getattr(settings, 'PROJECTS_PAGE_SIZE', 50) if after is not None else None,
+        maximum=getattr(settings, 'PROJECTS_MAX_PAGE_SIZE', 100),
+    )
+    projection, requested = parse_fields(query_params.get('fields'), always=('_id', 'created_at'))
+    return limit, after, projection, requested
+
+def finish_page(request, query_params, projects, limit, requested):
+    """Trim the limit + 1 lookahead and build the next-page headers."""
+    headers = {}
+    if limit is not None and len(projects) > limit:
+        projects = projects[:limit]
+        next_cursor = encode_cursor(projects[-1], 'created_at')
+        params = query_params.copy()
+        params['cursor'] = next_cursor
+        params['limit'] = limit
+        headers['X-Next-Cursor'] = next_cursor
+        # Relative to the request URL (RFC 8288), so a cached response is
+        # valid whichever host or scheme it is served through
+        headers['Link'] = f'<{request.path}?{params.urlencode()}>; rel="next"'
+
+    if requested is not None and 'created_at' not in requested:
+        # created_at is only projected to build the cursor
+        for project in projects:
+            project.pop('created_at', None)
+    return projects, headers
 
 class ProjectViewSet(ReloadMixin, viewsets.ModelViewSet):
     queryset = Project.objects.none()
     serializer_class = ProjectSerializer
     permission_classes = [permissions.AllowAny]
     
+    @cached_json_response('projects')
     def list(self, request, *args, **kwargs):
+        """
+        Newest first. Without limit or cursor every project is returned;
+        with either, one page at a time (keyset on created_at, _id).
+        Query params:
+            limit  - page size, capped at PROJECTS_MAX_PAGE_SIZE
+            cursor - opaque value from the previous page's X-Next-Cursor header
+                     (pages default to PROJECTS_PAGE_SIZE)
+            fields - comma separated projection, e.g. fields=title,summary,image,tags
+        The body stays a plain list; the next page is advertised through the
+        X-Next-Cursor and Link headers.
+        """
         coll = get_projects_collection()
         if coll is None: return Response([])
-        projects = [serialize_mongo_doc(p) for p in coll.find().sort('created_at', -1)]
-        return Response(projects)
+        try:
+            limit, after, projection, requested = parse_list_params(request.query_params)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=400)
+
+        cursor = coll.find(keyset_filter('created_at', after), projection).sort(PAGE_SORT)
+        if limit is not None:
+            cursor = cursor.limit(limit + 1)
+        projects = list(cursor)
+        projects, headers = finish_page(request, request.query_params, projects, limit, requested)
+        return Response(projects, headers=headers)
 
     def retrieve(self, request, pk=None, *args, **kwargs):
         coll = get_projects_collection()
@@ -69,6 +107,7 @@ class ProjectViewSet(ReloadMixin, viewsets.ModelViewSet):
         res = coll.insert_one(data)
         data['id'] = str(res.inserted_id)
         data.pop('_id', None)
+        content_cache.bump('projects')
         
         mongo_log('project_logs', {
             'action': 'create',
@@ -85,12 +124,14 @@ class ProjectViewSet(ReloadMixin, viewsets.ModelViewSet):
         data = request.data.copy()
         data.pop('id', None)
         data.pop('_id', None)
+        data['updated_at'] = datetime.datetime.utcnow()
         
         coll.update_one(query, {"$set": data})
         project = coll.find_one(query)
         
         if not project:
             return Response({"detail": "Project not found."}, status=404)
+        content_cache.bump('projects')
             
         mongo_log('project_logs', {
             'action': 'update',
@@ -113,6 +154,7 @@ class ProjectViewSet(ReloadMixin, viewsets.ModelViewSet):
             return Response({"detail": "Project not found."}, status=404)
             
         coll.delete_one(query)
+        content_cache.bump('projects')
         mongo_log('project_logs', {
             'action': 'delete',
             'project_id': pk,
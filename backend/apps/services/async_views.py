@@ -0,0 +1,78 @@
+"""
+Async GET handlers for the services app (enabled by ASYNC_MONGO_VIEWS,
+see apps.utils.async_views). Responses match ServiceViewSet/TechnologyViewSet.
+"""
+
+from bson.objectid import ObjectId
+
+from apps.utils.async_mongo import get_async_mongo_db
+from apps.utils.async_views import json_response
+from apps.utils.cache import content_cache
+from apps.utils.responses import async_cached_json_response
+from apps.utils.serialization import serialize_mongo_doc
+
+
+@async_cached_json_response('services')
+async def service_list(request):
+    db = get_async_mongo_db()
+    if db is None: return json_response([])
+    async def load():
+        return [serialize_mongo_doc(s) for s in await db['services'].find().to_list(None)]
+
+    services = await content_cache.aget_or_set('services:list', ('services',), load)
+    return json_response(services)
+
+
+@async_cached_json_response('services', 'technologies')
+async def combined_list(request):
+    db = get_async_mongo_db()
+    if db is None: return json_response({"services": [], "technologies": []})
+
+    async def load():
+        return {
+            "services": [serialize_mongo_doc(s) for s in await db['services'].find().to_list(None)],
+            "technologies": [serialize_mongo_doc(t) for t in await db['technologies'].find().to_list(None)],
+        }
+
+    return json_response(await content_cache.aget_or_set('services:combined', ('services', 'technologies'), load))
+
+
+async def service_detail(request, slug=None):
+    db = get_async_mongo_db()
+    if db is None: return json_response({"detail": "Not found."}, status=404)
+    query = {"slug": slug}
+    if ObjectId.is_valid(slug):
+        query = {"$or": [{"slug": slug}, {"_id": ObjectId(slug)}]}
+
+    service = await db['services'].find_one(query)
+    if not service:
+        return json_response({"detail": "Service not found."}, status=404)
+    return json_response(service)
+
+
+@async_cached_json_response('technologies')
+async def technology_list(request):
+    db = get_async_mongo_db()
+    if db is None: return json_response([])
+    async def load():
+        return [serialize_mongo_doc(t) for t in await db['technologies'].find().to_list(None)]
+
+    techs = await content_cache.aget_or_set('technologies:list', ('technologies',), load)
+    return json_response(techs)
+
+
+@async_cached_json_response('technologies')
+async def technology_categorized(request):
+    db = get_async_mongo_db()
+    if db is None: return json_response([])
+
+    async def load():
+        grouped_data = {}
+        async for tech in db['technologies'].find():
+            category = tech.get('category', 'Uncategorized')
+            if category not in grouped_data:
+                grouped_data[category] = []
+            grouped_data[category].append(serialize_mongo_doc(tech))
+        return [{"category": category, "items": items} for category, items in grouped_data.items()]
+
+    return json_response(await content_cache.aget_or_set('technologies:categorized', ('technologies',), load))
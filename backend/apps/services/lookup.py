@@ -0,0 +1,89 @@
+"""
+Process-wide, read-only slug -> service summary table.
+Usage:
+    from apps.services.lookup import service_index
+
+    service = service_index.get('web-development')
+    # {'slug': ..., 'title': ..., 'base_rate': ..., 'hourly_rate': ...} or None
+
+The table is loaded on first use with one projected query and swapped out
+whole (never mutated) when the 'services' version in content_cache moves,
+i.e. after any write through ServiceViewSet or an invalidation event.
+SERVICE_INDEX_MAX_AGE bounds how stale it can get when versions are not
+shared between workers. Lookups are case-insensitive (see
+apps.utils.lookup_keys.normalize_key).
+"""
+
+import threading
+import time
+from types import MappingProxyType
+
+from bson.decimal128 import Decimal128
+from django.conf import settings
+
+from apps.utils.cache import content_cache
+from apps.utils.lookup_keys import normalize_key
+from apps.utils.mongo import get_mongo_db
+
+_PROJECTION = {'_id': 0, 'slug': 1, 'title': 1, 'base_rate': 1, 'hourly_rate': 1}
+_RETRY_AFTER = 30
+
+
+def _rate(value):
+    return value.to_decimal() if isinstance(value, Decimal128) else value
+
+
+class ServiceIndex:
+    def __init__(self, max_age=300):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._table = MappingProxyType({})
+        self._version = None
+        self._expires_at = 0.0
+        self._retry_at = 0.0
+
+    def _stale(self, version, now):
+        if now < self._retry_at:
+            return False
+        return version != self._version or now >= self._expires_at
+
+    def table(self):
+        """The current immutable mapping, reloading it first if it is stale."""
+        version = content_cache.version('services')
+        if self._stale(version, time.monotonic()):
+            self._reload(version)
+        return self._table
+
+    def get(self, slug):
+        if not slug:
+            return None
+        return self.table().get(normalize_key(slug))
+
+    def _reload(self, version):
+        with self._lock:
+            # Another thread may have reloaded while we waited for the lock
+            if not self._stale(version, time.monotonic()):
+                return
+            db = get_mongo_db()
+            if db is None:
+                self._retry_at = time.monotonic() + _RETRY_AFTER
+                return
+            try:
+                table = {}
+                for doc in db['services'].find({'slug': {'$type': 'string'}}, _PROJECTION):
+                    table[normalize_key(doc['slug'])] = MappingProxyType({
+                        'slug': doc['slug'],
+                        'title': doc.get('title') or doc['slug'],
+                        'base_rate': _rate(doc.get('base_rate')),
+                        'hourly_rate': _rate(doc.get('hourly_rate')),
+                    })
+            except Exception as e:
+                print(f"[ServiceIndex] Reload failed, keeping {len(self._table)} entries: {e}")
+                self._retry_at = time.monotonic() + _RETRY_AFTER
+                return
+            self._table = MappingProxyType(table)
+            self._version = version
+            self._expires_at = time.monotonic() + self.max_age
+
+
+service_index = ServiceIndex(max_age=getattr(settings, 'SERVICE_INDEX_MAX_AGE', 300))
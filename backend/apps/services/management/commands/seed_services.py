@@ -1,5 +1,6 @@
 import datetime
 from django.core.management.base import BaseCommand
+from apps.utils.lookup_keys import with_lookup_keys
 from apps.utils.mongo import get_mongo_db
 
 class Command(BaseCommand):
@@ -58,7 +59,7 @@ class Command(BaseCommand):
                 "created_at": datetime.datetime.utcnow()
             }
         ]
-        db['services'].insert_many(services)
+        db['services'].insert_many([with_lookup_keys('services', s) for s in services])
         self.stdout.write(self.style.SUCCESS(f'Successfully seeded {len(services)} services'))
 
         # 3. Seed Technologies (Diverse Icons)
@@ -1,3 +1,75 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from bson.objectid import ObjectId
+from django.test import SimpleTestCase
+from rest_framework.test import APIRequestFactory
+
+from apps.utils.cache import content_cache
+
+from .lookup import ServiceIndex
+from .views import ServiceViewSet
+
+
+def fake_db(services):
+    db = mock.MagicMock()
+    db.__getitem__.return_value.find.return_value = services
+    db.__getitem__.return_value.insert_one.return_value.inserted_id = ObjectId()
+    return db
+
+
+class ServiceCatalogCacheTests(SimpleTestCase):
+    def setUp(self):
+        content_cache.bump('services')
+
+    def test_list_is_read_once_until_a_write(self):
+        db = fake_db([{'_id': ObjectId(), 'slug': 'hosting', 'title': 'Hosting'}])
+        factory = APIRequestFactory()
+        list_view = ServiceViewSet.as_view({'get': 'list'})
+        with mock.patch('apps.services.views.get_mongo_db', return_value=db), \
+                mock.patch('apps.services.views.mongo_log'):
+            first = list_view(factory.get('/api/services/services/'))
+            second = list_view(factory.get('/api/services/services/'))
+            self.assertEqual(db['services'].find.call_count, 1)
+            self.assertEqual(first.content, second.content)
+
+            create = ServiceViewSet.as_view({'post': 'create'})
+            create(factory.post('/api/services/services/', {'slug': 'seo', 'title': 'SEO'}, format='json'))
+            list_view(factory.get('/api/services/services/'))
+            self.assertEqual(db['services'].find.call_count, 2)
+
+    def test_cached_list_is_already_serialized(self):
+        oid = ObjectId()
+        db = fake_db([{'_id': oid, 'slug': 'hosting', 'title': 'Hosting'}])
+        with mock.patch('apps.services.views.get_mongo_db', return_value=db):
+            ServiceViewSet.as_view({'get': 'list'})(APIRequestFactory().get('/api/services/services/'))
+        cached = content_cache.lookup('services:list', content_cache.versions(('services',)))
+        self.assertEqual(cached, [{'id': str(oid), 'slug': 'hosting', 'title': 'Hosting'}])
+
+
+class ServiceIndexTests(SimpleTestCase):
+    def test_table_is_loaded_once_per_version(self):
+        db = fake_db([{'slug': 'Web-Development', 'title': 'Web Development', 'base_rate': 100}])
+        index = ServiceIndex()
+        with mock.patch('apps.services.lookup.get_mongo_db', return_value=db):
+            self.assertEqual(index.get(' web-development')['title'], 'Web Development')
+            self.assertIsNone(index.get('hosting'))
+            self.assertEqual(db['services'].find.call_count, 1)
+
+            db['services'].find.return_value = [{'slug': 'hosting'}]
+            content_cache.bump('services')
+            self.assertEqual(index.get('Hosting')['title'], 'hosting')
+            self.assertIsNone(index.get('web-development'))
+        with self.assertRaises(TypeError):
+            index.table()['x'] = {}
+
+    def test_failed_reload_keeps_the_table(self):
+        db = fake_db([{'slug': 'seo', 'title': 'SEO'}])
+        index = ServiceIndex()
+        with mock.patch('apps.services.lookup.get_mongo_db', return_value=db):
+            index.get('seo')
+            db['services'].find.side_effect = RuntimeError('down')
+            content_cache.bump('services')
+            self.assertEqual(index.get('seo')['title'], 'SEO')
+            index.get('seo')
+        # Retried after _RETRY_AFTER, not on every lookup
+        self.assertEqual(db['services'].find.call_count, 2)
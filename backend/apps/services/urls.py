@@ -1,4 +1,6 @@
 from django.urls import path
+from apps.utils.async_views import async_get
+from . import async_views
 from .views import ServiceViewSet, TechnologyViewSet
 
 service_list = ServiceViewSet.as_view({
@@ -32,19 +34,19 @@ technology_categorized = TechnologyViewSet.as_view({
 urlpatterns = [
     # Technologies URLs
     # Place specific non-param routes first
-    path('technologies/categorized/', technology_categorized, name='technology-categorized'),
+    path('technologies/categorized/', async_get(technology_categorized, async_views.technology_categorized), name='technology-categorized'),
     # Root combined view
-    path('', ServiceViewSet.as_view({'get': 'combined_list'}), name='services-root'),
+    path('', async_get(ServiceViewSet.as_view({'get': 'combined_list'}), async_views.combined_list), name='services-root'),
     
-    path('technologies/', technology_list, name='technology-list-create'),
+    path('technologies/', async_get(technology_list, async_views.technology_list), name='technology-list-create'),
     
     # Allow string identifier for flexible lookup (ID or Name)
     path('technologies/<str:identifier>/', technology_detail, name='technology-detail-delete'),
 
     # Services URLs
-    path('services/', service_list, name='service-list-create'),
-    path('services/<str:slug>/', service_detail, name='service-detail-delete'),
+    path('services/', async_get(service_list, async_views.service_list), name='service-list-create'),
+    path('services/<str:slug>/', async_get(service_detail, async_views.service_detail), name='service-detail-delete'),
     
     # Root endpoint fallback
-    path('<str:slug>/', service_detail, name='service-detail-root'),
+    path('<str:slug>/', async_get(service_detail, async_views.service_detail), name='service-detail-root'),
 ]
@@ -4,9 +4,12 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from .models import Service, Technology
 from .serializers import ServiceSerializer, TechnologySerializer
+from apps.utils.cache import content_cache
+from apps.utils.lookup_keys import with_lookup_keys
 from apps.utils.mongo import get_mongo_db, mongo_log
+from apps.utils.responses import cached_json_response
+from apps.utils.serialization import serialize_mongo_doc
 from apps.utils.views import ReloadMixin
-import decimal
 from bson.objectid import ObjectId
 import datetime
 
@@ -14,53 +17,35 @@ def get_collection(name):
     db = get_mongo_db()
     return db[name] if db is not None else None
 
-def serialize_mongo_doc(doc):
-    """Recursively convert MongoDB ObjectId, datetime, and decimal to JSON serializable formats."""
-    if doc is None:
-        return None
-    if isinstance(doc, list):
-        return [serialize_mongo_doc(item) for item in doc]
-    if isinstance(doc, dict):
-        new_doc = {}
-        for k, v in doc.items():
-            if k == '_id':
-                new_doc['id'] = str(v)
-            elif isinstance(v, (ObjectId, datetime.datetime, decimal.Decimal)):
-                if isinstance(v, datetime.datetime):
-                    new_doc[k] = v.isoformat()
-                else:
-                    new_doc[k] = str(v)
-            elif isinstance(v, (list, dict)):
-                new_doc[k] = serialize_mongo_doc(v)
-            else:
-                new_doc[k] = v
-        return new_doc
-    return doc
-
 class ServiceViewSet(ReloadMixin, viewsets.ModelViewSet):
     queryset = Service.objects.none()
     serializer_class = ServiceSerializer
     permission_classes = [permissions.AllowAny]
     lookup_field = 'slug'
 
+    @cached_json_response('services')
     def list(self, request, *args, **kwargs):
         coll = get_collection('services')
         if coll is None: return Response([])
-        services = [serialize_mongo_doc(s) for s in coll.find()]
+        services = content_cache.get_or_set(
+            'services:list', ('services',),
+            lambda: [serialize_mongo_doc(s) for s in coll.find()],
+        )
         return Response(services)
 
     @action(detail=False, methods=['get'])
+    @cached_json_response('services', 'technologies')
     def combined_list(self, request):
         db = get_mongo_db()
-        if not db: return Response({"services": [], "technologies": []})
-        
-        services = [serialize_mongo_doc(s) for s in db['services'].find()]
-        techs = [serialize_mongo_doc(t) for t in db['technologies'].find()]
-        
-        return Response({
-            "services": services,
-            "technologies": techs
-        })
+        if db is None: return Response({"services": [], "technologies": []})
+
+        def load():
+            return {
+                "services": [serialize_mongo_doc(s) for s in db['services'].find()],
+                "technologies": [serialize_mongo_doc(t) for t in db['technologies'].find()],
+            }
+
+        return Response(content_cache.get_or_set('services:combined', ('services', 'technologies'), load))
 
     def retrieve(self, request, slug=None, *args, **kwargs):
         coll = get_collection('services')
@@ -80,9 +65,10 @@ class ServiceViewSet(ReloadMixin, viewsets.ModelViewSet):
         if coll is None: return Response({"error": "DB error"}, status=500)
         data = request.data.copy()
         data['created_at'] = datetime.datetime.utcnow()
-        res = coll.insert_one(data)
+        res = coll.insert_one(with_lookup_keys('services', data))
         data['id'] = str(res.inserted_id)
         data.pop('_id', None)
+        content_cache.bump('services')
         mongo_log('service_logs', {'action': 'create', 'service_id': data['id'], 'title': data.get('title')})
         return Response(serialize_mongo_doc(data), status=201)
 
@@ -96,9 +82,11 @@ class ServiceViewSet(ReloadMixin, viewsets.ModelViewSet):
         data = request.data.copy()
         data.pop('id', None)
         data.pop('_id', None)
-        coll.update_one(query, {"$set": data})
+        data['updated_at'] = datetime.datetime.utcnow()
+        coll.update_one(query, {"$set": with_lookup_keys('services', data)})
         service = coll.find_one(query)
         if not service: return Response({"detail": "Not found."}, status=404)
+        content_cache.bump('services')
         mongo_log('service_logs', {'action': 'update', 'service_id': str(service['_id']), 'title': service.get('title')})
         return Response(serialize_mongo_doc(service))
 
@@ -115,6 +103,7 @@ class ServiceViewSet(ReloadMixin, viewsets.ModelViewSet):
         service = coll.find_one(query)
         if not service: return Response({"detail": "Not found."}, status=404)
         coll.delete_one(query)
+        content_cache.bump('services')
         mongo_log('service_logs', {'action': 'delete', 'service_id': str(service['_id']), 'title': service.get('title')})
         return Response(status=204)
 
@@ -124,10 +113,14 @@ class TechnologyViewSet(ReloadMixin, viewsets.ModelViewSet):
     permission_classes = [permissions.AllowAny]
     lookup_field = 'identifier'
 
+    @cached_json_response('technologies')
     def list(self, request, *args, **kwargs):
         coll = get_collection('technologies')
         if coll is None: return Response([])
-        techs = [serialize_mongo_doc(t) for t in coll.find()]
+        techs = content_cache.get_or_set(
+            'technologies:list', ('technologies',),
+            lambda: [serialize_mongo_doc(t) for t in coll.find()],
+        )
         return Response(techs)
 
     def retrieve(self, request, identifier=None, *args, **kwargs):
@@ -156,6 +149,7 @@ class TechnologyViewSet(ReloadMixin, viewsets.ModelViewSet):
         res = coll.insert_one(data)
         data['id'] = str(res.inserted_id)
         data.pop('_id', None)
+        content_cache.bump('technologies')
         mongo_log('technology_logs', {'action': 'create', 'technology_id': data['id'], 'name': data.get('name')})
         return Response(serialize_mongo_doc(data), status=201)
 
@@ -174,9 +168,11 @@ class TechnologyViewSet(ReloadMixin, viewsets.ModelViewSet):
         data = request.data.copy()
         data.pop('id', None)
         data.pop('_id', None)
+        data['updated_at'] = datetime.datetime.utcnow()
         coll.update_one(query, {"$set": data})
         tech = coll.find_one(query)
         if not tech: return Response({"detail": "Not found."}, status=404)
+        content_cache.bump('technologies')
         mongo_log('technology_logs', {'action': 'update', 'technology_id': str(tech['_id']), 'name': tech.get('name')})
         return Response(serialize_mongo_doc(tech))
 
@@ -198,21 +194,23 @@ class TechnologyViewSet(ReloadMixin, viewsets.ModelViewSet):
         tech = coll.find_one(query)
         if not tech: return Response({"detail": "Not found."}, status=404)
         coll.delete_one(query)
+        content_cache.bump('technologies')
         mongo_log('technology_logs', {'action': 'delete', 'technology_id': str(tech['_id']), 'name': tech.get('name')})
         return Response(status=204)
 
     @action(detail=False, methods=['get'])
+    @cached_json_response('technologies')
     def categorized(self, request):
         coll = get_collection('technologies')
         if coll is None: return Response([])
-        techs = [serialize_mongo_doc(t) for t in coll.find()]
-        
-        grouped_data = {}
-        for tech in techs:
-            category = tech.get('category', 'Uncategorized')
-            if category not in grouped_data:
-                grouped_data[category] = []
-            grouped_data[category].append(tech)
-
-        result = [{"category": category, "items": items} for category, items in grouped_data.items()]
-        return Response(result)
+
+        def load():
+            grouped_data = {}
+            for tech in coll.find():
+                category = tech.get('category', 'Uncategorized')
+                if category not in grouped_data:
+                    grouped_data[category] = []
+                grouped_data[category].append(serialize_mongo_doc(tech))
+            return [{"category": category, "items": items} for category, items in grouped_data.items()]
+
+        return Response(content_cache.get_or_set('technologies:categorized', ('technologies',), load))
@@ -0,0 +1,71 @@
+"""
+Async GET handlers for the theme app (enabled by ASYNC_MONGO_VIEWS,
+see apps.utils.async_views). Responses match UserThemeView/GlobalThemeView.
+"""
+
+import datetime
+
+from asgiref.sync import sync_to_async
+from rest_framework.exceptions import AuthenticationFailed
+
+from apps.utils.async_mongo import get_async_mongo_db
+from apps.utils.async_views import authenticate, json_response
+from apps.utils.responses import async_cached_json_response
+
+from .views import DEFAULT_GLOBAL_THEME
+
+
+def _session_key(request, create):
+    # Session backends are synchronous; this runs in a worker thread
+    session_id = request.session.session_key
+    if not session_id and create:
+        request.session.create()
+        session_id = request.session.session_key
+    return session_id
+
+
+async def user_theme(request):
+    db = get_async_mongo_db()
+    if db is None: return json_response({"error": "DB error"}, status=500)
+
+    try:
+        user = await authenticate(request)
+    except AuthenticationFailed as e:
+        return json_response({"detail": e.detail}, status=401)
+    user_id = str(user.id) if user.is_authenticated else None
+    session_id = await sync_to_async(_session_key)(request, create=not user_id)
+
+    query = {"user_id": user_id} if user_id else {"session_id": session_id}
+    theme_pref = await db['theme_preferences'].find_one(query)
+
+    if not theme_pref:
+        theme_pref = {
+            "user_id": user_id,
+            "session_id": session_id,
+            "theme_mode": "dark",
+            "created_at": datetime.datetime.utcnow()
+        }
+        res = await db['theme_preferences'].insert_one(theme_pref)
+        theme_pref['_id'] = res.inserted_id
+
+    return json_response({
+        "success": True,
+        "data": theme_pref,
+        "is_authenticated": user_id is not None
+    })
+
+
+@async_cached_json_response('global_theme_config')
+async def global_theme(request):
+    db = get_async_mongo_db()
+    if db is None: return json_response({"error": "DB error"}, status=500)
+
+    config = await db['global_theme_config'].find_one({"type": "main"})
+    if not config:
+        config = dict(DEFAULT_GLOBAL_THEME)
+        await db['global_theme_config'].insert_one(config)
+
+    return json_response({
+        "success": True,
+        "data": config
+    })
@@ -1,7 +1,9 @@
 from django.urls import path
+from apps.utils.async_views import async_get
+from . import async_views
 from .views import UserThemeView, GlobalThemeView
 
 urlpatterns = [
-    path('user/', UserThemeView.as_view(), name='user-theme'),
-    path('global/', GlobalThemeView.as_view(), name='global-theme'),
+    path('user/', async_get(UserThemeView.as_view(), async_views.user_theme), name='user-theme'),
+    path('global/', async_get(GlobalThemeView.as_view(), async_views.global_theme), name='global-theme'),
 ]
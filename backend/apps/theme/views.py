@@ -2,21 +2,28 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny
+from apps.utils.cache import content_cache
 from apps.utils.mongo import get_mongo_db, mongo_log
+from apps.utils.responses import cached_json_response
+from apps.utils.serialization import serialize_mongo_doc
 import datetime
 from bson.objectid import ObjectId
 
-def serialize_mongo_doc(doc):
-    if doc is None: return None
-    doc['id'] = str(doc.pop('_id'))
-    return doc
+DEFAULT_GLOBAL_THEME = {
+    "type": "main",
+    "default_theme": "dark",
+    "allow_user_customization": True,
+    "brand_primary": "#3b82f6",
+    "brand_secondary": "#8b5cf6",
+    "brand_accent": "#ec4899"
+}
 
 class UserThemeView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request):
         db = get_mongo_db()
-        if not db: return Response({"error": "DB error"}, status=500)
+        if db is None: return Response({"error": "DB error"}, status=500)
         
         user_id = str(request.user.id) if request.user.is_authenticated else None
         session_id = request.session.session_key
@@ -45,7 +52,7 @@ class UserThemeView(APIView):
 
     def post(self, request):
         db = get_mongo_db()
-        if not db: return Response({"error": "DB error"}, status=500)
+        if db is None: return Response({"error": "DB error"}, status=500)
         
         user_id = str(request.user.id) if request.user.is_authenticated else None
         session_id = request.session.session_key or "guest"
@@ -71,20 +78,14 @@ class UserThemeView(APIView):
 class GlobalThemeView(APIView):
     permission_classes = [AllowAny]
 
+    @cached_json_response('global_theme_config')
     def get(self, request):
         db = get_mongo_db()
-        if not db: return Response({"error": "DB error"}, status=500)
+        if db is None: return Response({"error": "DB error"}, status=500)
         
         config = db['global_theme_config'].find_one({"type": "main"})
         if not config:
-            config = {
-                "type": "main",
-                "default_theme": "dark",
-                "allow_user_customization": True,
-                "brand_primary": "#3b82f6",
-                "brand_secondary": "#8b5cf6",
-                "brand_accent": "#ec4899"
-            }
+            config = dict(DEFAULT_GLOBAL_THEME)
             db['global_theme_config'].insert_one(config)
             
         return Response({
@@ -94,10 +95,12 @@ class GlobalThemeView(APIView):
 
     def post(self, request):
         db = get_mongo_db()
-        if not db: return Response(status=500)
+        if db is None: return Response(status=500)
         
         data = request.data.copy()
+        data['updated_at'] = datetime.datetime.utcnow()
         db['global_theme_config'].update_one({"type": "main"}, {"$set": data}, upsert=True)
+        content_cache.bump('global_theme_config')
         config = db['global_theme_config'].find_one({"type": "main"})
         
         mongo_log('theme_logs', {'action': 'update_global_theme'})
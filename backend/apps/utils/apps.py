@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class UtilsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.utils'
+
+    def ready(self):
+        from . import checks  # noqa: F401  (registers system checks)
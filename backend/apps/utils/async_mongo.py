@@ -0,0 +1,42 @@
+"""
+Async counterpart of apps.utils.mongo for ASGI views.
+Usage:
+    from apps.utils.async_mongo import get_async_mongo_db
+
+    db = get_async_mongo_db()
+    if db is None:
+        ...
+    service = await db['services'].find_one({"slug": slug})
+    services = await db['services'].find().to_list(None)
+
+Backed by pymongo's AsyncMongoClient on the same MONGO_URI, pool settings
+and event listener (mongo_pool_stats) as the sync client. A client
+belongs to the event loop that first used it, so one is kept per running
+loop (uvicorn runs a single loop per worker).
+"""
+
+import asyncio
+import weakref
+
+from django.conf import settings
+from pymongo import AsyncMongoClient
+
+from .mongo import mongo_client_options
+
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_mongo_db(db_name='zsyio_db'):
+    """
+    Returns the async MongoDB database object for the running event loop,
+    or None if MongoDB is not configured. Must be called from a coroutine.
+    """
+    uri = getattr(settings, 'MONGO_URI', None)
+    if not uri:
+        return None
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = AsyncMongoClient(uri, **mongo_client_options())
+        _clients[loop] = client
+    return client[db_name]
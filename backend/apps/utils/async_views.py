@@ -0,0 +1,61 @@
+"""
+Async (ASGI) GET handlers alongside the existing DRF views.
+Usage (urls.py):
+    from apps.utils.async_views import async_get
+    from . import async_views
+
+    path('services/', async_get(service_list, async_views.service_list)),
+
+With ASYNC_MONGO_VIEWS off, async_get() returns the DRF view unchanged.
+With it on, GET/HEAD requests are answered by the coroutine (which talks
+to Mongo through apps.utils.async_mongo) and every other method is handed
+to the DRF view through sync_to_async. Turn it on only when serving with
+an ASGI server (uvicorn config.asgi:application); under WSGI each async
+view would run in its own event loop.
+"""
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from rest_framework.settings import api_settings
+
+from .serialization import dumps
+
+
+def async_get(sync_view, handler):
+    if not getattr(settings, 'ASYNC_MONGO_VIEWS', False):
+        return sync_view
+
+    async def view(request, *args, **kwargs):
+        if request.method in ('GET', 'HEAD'):
+            return await handler(request, *args, **kwargs)
+        return await sync_to_async(sync_view)(request, *args, **kwargs)
+
+    view.__name__ = handler.__name__
+    view.__doc__ = handler.__doc__
+    # DRF views are CSRF exempt; keep that for the methods passed through
+    view.csrf_exempt = True
+    return view
+
+
+def json_response(data, status=200, headers=None):
+    """HttpResponse with `data` (raw pymongo documents allowed) encoded by dumps()."""
+    response = HttpResponse(dumps(data), content_type='application/json', status=status)
+    for name, value in (headers or {}).items():
+        response[name] = value
+    return response
+
+
+async def authenticate(request, authentication_classes=None):
+    """
+    Run DRF authentication classes (JWT by default) off the event loop.
+    Returns the user or AnonymousUser; raises AuthenticationFailed like DRF.
+    """
+    if authentication_classes is None:
+        authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    for auth_class in authentication_classes:
+        result = await sync_to_async(auth_class().authenticate)(request)
+        if result is not None:
+            return result[0]
+    return AnonymousUser()
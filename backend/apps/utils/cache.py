@@ -0,0 +1,193 @@
+"""
+Versioned read-through cache for slowly changing Mongo content.
+Usage:
+    from apps.utils.cache import content_cache
+
+    # Read path: the producer only runs on a miss
+    payload = content_cache.get_or_set(
+        'services:list', ('services',),
+        lambda: [serialize_mongo_doc(s) for s in coll.find()],
+    )
+
+    # Write path: bump the collection's version, every entry that
+    # depends on it is invalidated at once
+    content_cache.bump('services')
+
+Entries are keyed by name plus the current version of every collection they
+depend on, so invalidation never has to find and delete keys. Payloads live
+in a process-local LRU; when CONTENT_CACHE_ALIAS names an entry in
+settings.CACHES (Redis, Memcached, ...), version counters and payloads are
+also shared through it so a bump in one worker is seen by all of them.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+class VersionedCache:
+    def __init__(self, alias=None, timeout=300, max_entries=256, prefix='content'):
+        self.alias = alias
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self.prefix = prefix
+        self._lock = threading.RLock()
+        self._versions = {}
+        self._entries = OrderedDict()
+        self.stats = {'hits': 0, 'misses': 0, 'bumps': 0}
+
+    # -----------------------------------------------------------------
+    # Shared backend (optional)
+    # -----------------------------------------------------------------
+    def _shared(self):
+        if not self.alias:
+            return None
+        try:
+            from django.core.cache import caches
+            return caches[self.alias]
+        except Exception as e:
+            print(f"[Cache] Shared backend '{self.alias}' unavailable: {e}")
+            return None
+
+    def _version_key(self, namespace):
+        return f"{self.prefix}:v:{namespace}"
+
+    # -----------------------------------------------------------------
+    # Versions
+    # -----------------------------------------------------------------
+    def version(self, namespace):
+        shared = self._shared()
+        if shared is not None:
+            try:
+                value = shared.get(self._version_key(namespace))
+                if value is None:
+                    shared.add(self._version_key(namespace), 1, timeout=None)
+                    value = shared.get(self._version_key(namespace), 1)
+                return value
+            except Exception as e:
+                print(f"[Cache] Could not read version for '{namespace}': {e}")
+        with self._lock:
+            return self._versions.get(namespace, 0)
+
+    def versions(self, namespaces):
+        return tuple(self.version(ns) for ns in namespaces)
+
+    def bump(self, *namespaces):
+        """Invalidate every entry that depends on any of `namespaces`."""
+        shared = self._shared()
+        for namespace in namespaces:
+            with self._lock:
+                self._versions[namespace] = self._versions.get(namespace, 0) + 1
+                self.stats['bumps'] += 1
+            if shared is not None:
+                key = self._version_key(namespace)
+                try:
+                    if not shared.add(key, 2, timeout=None):
+                        shared.incr(key)
+                except Exception as e:
+                    print(f"[Cache] Could not bump version for '{namespace}': {e}")
+
+    def bump_once(self, namespace, token, timeout=60):
+        """
+        bump() for events that every worker observes (apps.utils.invalidation):
+        with a shared backend only the first worker to report `token` bumps
+        the shared version; without one each process bumps its own.
+        """
+        shared = self._shared()
+        if shared is not None:
+            try:
+                digest = hashlib.sha1(str(token).encode()).hexdigest()
+                if not shared.add(f"{self.prefix}:once:{namespace}:{digest}", 1, timeout=timeout):
+                    return False
+            except Exception as e:
+                print(f"[Cache] Could not deduplicate bump for '{namespace}': {e}")
+        self.bump(namespace)
+        return True
+
+    # -----------------------------------------------------------------
+    # Entries
+    # -----------------------------------------------------------------
+    def get_or_set(self, key, namespaces, producer):
+        """
+        Return the cached value for `key` at the current versions of
+        `namespaces`, calling `producer()` to build it on a miss.
+        """
+        versions = self.versions(namespaces)
+        value = self.lookup(key, versions)
+        if value is None:
+            value = producer()
+            self.store(key, versions, value)
+        return value
+
+    async def aget_or_set(self, key, namespaces, producer):
+        """get_or_set() for async views: `producer()` returns an awaitable."""
+        versions = self.versions(namespaces)
+        value = self.lookup(key, versions)
+        if value is None:
+            value = await producer()
+            self.store(key, versions, value)
+        return value
+
+    def lookup(self, key, versions):
+        """Return the value stored for `key` at exactly `versions`, or None."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == versions and entry[1] > now:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return entry[2]
+
+        value = None
+        shared = self._shared()
+        if shared is not None:
+            try:
+                value = shared.get(self._entry_key(key, versions))
+            except Exception as e:
+                print(f"[Cache] Shared read failed for '{key}': {e}")
+
+        with self._lock:
+            if value is None:
+                self.stats['misses'] += 1
+            else:
+                self.stats['hits'] += 1
+                self._remember(key, versions, value, now)
+        return value
+
+    def store(self, key, versions, value):
+        """
+        Store `value` for `key` at `versions`. Callers pass the versions
+        they read *before* loading the value, so a bump that races with
+        the load leaves the entry already stale instead of mislabelled.
+        """
+        shared = self._shared()
+        if shared is not None:
+            try:
+                shared.set(self._entry_key(key, versions), value, timeout=self.timeout)
+            except Exception as e:
+                print(f"[Cache] Shared write failed for '{key}': {e}")
+        with self._lock:
+            self._remember(key, versions, value, time.monotonic())
+
+    def _entry_key(self, key, versions):
+        return f"{self.prefix}:e:{key}:{'.'.join(str(v) for v in versions)}"
+
+    def _remember(self, key, versions, value, now):
+        self._entries[key] = (versions, now + self.timeout, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+content_cache = VersionedCache(
+    alias=getattr(settings, 'CONTENT_CACHE_ALIAS', None),
+    timeout=getattr(settings, 'CONTENT_CACHE_TIMEOUT', 300),
+    max_entries=getattr(settings, 'CONTENT_CACHE_MAX_ENTRIES', 256),
+)
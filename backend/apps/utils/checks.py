@@ -0,0 +1,39 @@
+"""
+Django system checks for the MongoDB layer.
+Registered in apps.utils.apps.UtilsConfig.ready().
+
+check_mongo_indexes connects to MongoDB, so it is a deployment check: it
+runs with `manage.py check --deploy` only, not on every runserver or
+management command. Query plans (collection scans) are audited by
+`manage.py ensure_indexes --explain`, not here.
+"""
+
+from django.conf import settings
+from django.core import checks
+
+
+@checks.register('mongo', deploy=True)
+def check_mongo_indexes(app_configs, **kwargs):
+    if not getattr(settings, 'MONGO_INDEX_CHECK', False):
+        return []
+
+    from .indexes import index_name, missing_indexes
+    from .mongo import get_mongo_db
+
+    db = get_mongo_db()
+    if db is None:
+        return []
+
+    try:
+        missing = missing_indexes(db)
+    except Exception as e:
+        return [checks.Warning(f"Could not inspect MongoDB indexes: {e}", id='mongo.W002')]
+
+    return [
+        checks.Warning(
+            f"Missing MongoDB index {spec['collection']}.{index_name(spec)} (app: {spec['app']}).",
+            hint="Run `python manage.py ensure_indexes`.",
+            id='mongo.W001',
+        )
+        for spec in missing
+    ]
@@ -0,0 +1,192 @@
+"""
+Registry of transactional email templates, compiled once at import.
+Usage:
+    from apps.utils.email_templates import email_message
+    from apps.utils.mailer import send_email
+
+    send_email(email_message('newsletter_welcome', [email]), kind='newsletter_welcome')
+    send_email(email_message('contact_admin', [admin], reply_to=email,
+                             name=name, email=email, message=message), kind='contact_admin')
+
+Each template's HTML is minified (whitespace between tags and runs of
+spaces collapsed) and compiled, when the module is loaded, into one
+function that builds the whole Resend message with f-strings. The sender
+string is fixed at that point (RESEND_FROM_EMAIL is read once), only the
+template's own fields are looked up and HTML-escaped, and templates whose
+only field is {year} are rendered once per year and reused.
+Placeholders use str.format syntax ({name}); write literal braces as {{ }}.
+`year` is always available. Subjects are plain text (newlines stripped).
+
+Benchmark with `python manage.py bench_email_templates`.
+"""
+
+import datetime
+import html
+import re
+import string
+import time
+
+from django.conf import settings
+
+_BETWEEN_TAGS_RE = re.compile(r'>\s+<')
+_SPACE_RE = re.compile(r'\s+')
+# Values without these characters are used as-is instead of going through html.escape
+_NEEDS_ESCAPE = re.compile(r'[&<>"\']').search
+
+_FROM_EMAIL = getattr(settings, 'RESEND_FROM_EMAIL', None) or "onboarding@resend.dev"
+
+_year = (0, 0.0)   # (current year, time.time() at which it ends)
+
+
+class TemplateError(ValueError):
+    """A template could not be compiled or rendered."""
+
+
+def minify_html(source):
+    return _BETWEEN_TAGS_RE.sub('><', _SPACE_RE.sub(' ', source)).strip()
+
+
+def current_year():
+    """datetime.date.today().year, recomputed only when the year runs out."""
+    global _year
+    if time.time() >= _year[1]:
+        year = datetime.date.today().year
+        _year = (year, datetime.datetime(year + 1, 1, 1).timestamp())
+    return _year[0]
+
+
+def _fields(source, name):
+    try:
+        pieces = list(string.Formatter().parse(source))
+    except ValueError as e:
+        raise TemplateError(f"{name}: {e}")
+    fields = set()
+    for _, field, spec, conversion in pieces:
+        if field is None:
+            continue
+        if not field.isidentifier() or spec or conversion:
+            raise TemplateError(f"{name}: unsupported placeholder {{{field}}}")
+        fields.add(field)
+    return frozenset(fields)
+
+
+def _fstring(source, prefix):
+    """'Hi {name}!' -> "f'Hi {<prefix>name}!'" (fields already validated)."""
+    parts = []
+    for literal, field, _, _ in string.Formatter().parse(source):
+        parts.append(literal.replace('{', '{{').replace('}', '}}'))
+        if field is not None:
+            parts.append(f"{{{prefix}{field}}}")
+    return 'f' + repr(''.join(parts))
+
+
+def _compile(name, from_address, subject, html_source, fields, subject_fields):
+    """Build build(to, reply_to, context) -> message dict as one straight-line function."""
+    src = ["def build(_to, _reply_to, _ctx):"]
+    loads = [f for f in sorted(fields) if f != 'year']
+    if loads:
+        src.append("    try:")
+        src.extend(f"        _v_{f} = _ctx[{f!r}]" for f in loads)
+        src.append("    except KeyError:")
+        src.append(f"        raise _TemplateError({name!r} + ': missing ' + ', '.join(sorted(_required.difference(_ctx))))")
+    if 'year' in fields:
+        src.append("    _v_year = _ctx['year'] if 'year' in _ctx else _current_year()")
+    for f in sorted(fields):
+        src.append(
+            f"    _h_{f} = _v_{f} if _v_{f}.__class__ is str and not _needs_escape(_v_{f}) "
+            f"else _escape(str(_v_{f}))"
+        )
+    for f in sorted(subject_fields):
+        src.append(
+            f"    _s_{f} = _v_{f} if _v_{f}.__class__ is str and _v_{f}.isprintable() "
+            f"and '  ' not in _v_{f} and _v_{f}.strip() is _v_{f} else ' '.join(str(_v_{f}).split())"
+        )
+    src.append(
+        f"    _message = {{'from': {from_address!r}, 'to': list(_to), "
+        f"'subject': {_fstring(subject, '_s_')}, 'html': {_fstring(html_source, '_h_')}}}"
+    )
+    src.append("    if _reply_to:")
+    src.append("        _message['reply_to'] = _reply_to")
+    src.append("    return _message")
+    namespace = {
+        '__builtins__': {'str': str, 'list': list, 'sorted': sorted, 'KeyError': KeyError},
+        '_TemplateError': TemplateError, '_required': frozenset(loads), '_current_year': current_year,
+        '_needs_escape': _NEEDS_ESCAPE, '_escape': html.escape,
+    }
+    exec(compile('\n'.join(src), f'<email:{name}>', 'exec'), namespace)
+    return namespace['build']
+
+
+class EmailTemplate:
+    def __init__(self, name, sender_name, subject, html_source):
+        self.name = name
+        self.sender_name = sender_name
+        self.from_address = f"{sender_name} <{_FROM_EMAIL}>"
+        self.subject = subject
+        self.html = minify_html(html_source)
+        self.subject_fields = _fields(subject, name)
+        self.fields = _fields(self.html, name) | self.subject_fields
+        self._build = _compile(name, self.from_address, subject, self.html, self.fields, self.subject_fields)
+        # Templates with nothing but {year} render to the same message all year
+        if self.fields <= {'year'}:
+            self._rendered = (None, None)   # (year, message)
+            self.build = self._build_static
+        else:
+            self.build = self._build
+
+    def _build_static(self, to, reply_to, context):
+        if context:
+            return self._build(to, reply_to, context)
+        year, message = self._rendered
+        if year != current_year():
+            year = current_year()
+            message = self._build((), None, {'year': year})
+            self._rendered = (year, message)
+        message = {**message, 'to': list(to)}
+        if reply_to:
+            message['reply_to'] = reply_to
+        return message
+
+    def render(self, context):
+        """Return (subject, html) for a context dict; values are HTML-escaped."""
+        message = self.build((), None, context)
+        return message['subject'], message['html']
+
+
+EMAIL_TEMPLATES = {
+    'contact_admin': EmailTemplate(
+        'contact_admin', 'Zsyio Contact',
+        "New Contact Form Submission from {name}",
+        "<p><strong>Name:</strong> {name}<br><strong>Email:</strong> {email}<br><strong>Message:</strong> {message}</p>",
+    ),
+    'contact_auto_reply': EmailTemplate(
+        'contact_auto_reply', 'Zsyio Team',
+        "We received your message - Zsyio",
+        "<p>Hi {name},</p><p>We have received your message and will get back to you shortly.</p>",
+    ),
+    'newsletter_welcome': EmailTemplate(
+        'newsletter_welcome', 'Zsyio Newsletter',
+        "Welcome to Zsyio Newsletter!",
+        """
+        <div style="font-family: Arial, sans-serif; max-width: 600px; margin: auto; padding: 20px; border: 1px solid #eee; border-radius: 10px; background-color: #f9f9f9;">
+            <div style="text-align: center; margin-bottom: 20px;">
+                <h1 style="color: #4A90E2; margin: 0;">Zsyio</h1>
+            </div>
+            <h2 style="color: #333; text-align: center;">Welcome to our Newsletter!</h2>
+            <p style="color: #555; line-height: 1.6;">Thank you for subscribing to the <strong>Zsyio</strong> newsletter. We are thrilled to have you with us!</p>
+            <p style="color: #555; line-height: 1.6;">You'll be the first to receive updates on our latest projects, industry insights, and special announcements.</p>
+            <div style="text-align: center; margin: 30px 0;">
+                <a href="https://zsyio.com" style="background-color: #4A90E2; color: white; padding: 12px 24px; text-decoration: none; border-radius: 5px; font-weight: bold;">Visit Our Website</a>
+            </div>
+            <hr style="border: 0; border-top: 1px solid #ddd; margin: 20px 0;">
+            <p style="font-size: 12px; color: #999; text-align: center;">You received this email because you subscribed on our website. <br> If you did not sign up for this newsletter, please ignore this email.</p>
+            <p style="font-size: 12px; color: #999; text-align: center;">&copy; {year} Zsyio. All rights reserved.</p>
+        </div>
+        """,
+    ),
+}
+
+
+def email_message(template_name, to, reply_to=None, **context):
+    """Build a Resend message dict from a registered template."""
+    return EMAIL_TEMPLATES[template_name].build(to, reply_to, context)
@@ -0,0 +1,151 @@
+"""
+Single registry of the MongoDB indexes (and hot query shapes) the apps rely on.
+Usage:
+    python manage.py ensure_indexes            # create anything missing
+    python manage.py ensure_indexes --check    # report only
+    python manage.py ensure_indexes --explain  # also explain() every query shape
+
+When a view starts filtering or sorting on a new field, add the index to
+MONGO_INDEXES and the query to QUERY_SHAPES in the same change. The
+`mongo` deployment check (see apps.utils.checks) warns about missing
+indexes in `manage.py check --deploy` when MONGO_INDEX_CHECK is enabled.
+"""
+
+import datetime
+
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import PyMongoError
+
+from .invalidation import CONTENT_COLLECTIONS
+
+# Each entry: owning app, collection, key list, and create_index options.
+MONGO_INDEXES = [
+    # apps.cart — one cart per user; add_item upserts on user_id
+    {'app': 'cart', 'collection': 'carts', 'keys': [('user_id', ASCENDING)], 'unique': True},
+    # apps.services
+    {'app': 'services', 'collection': 'services', 'keys': [('slug', ASCENDING)], 'unique': True},
+    # Normalized shadow keys, see apps.utils.lookup_keys (sparse until backfilled)
+    {'app': 'services', 'collection': 'services', 'keys': [('slug_key', ASCENDING)], 'unique': True, 'sparse': True},
+    {'app': 'services', 'collection': 'technologies', 'keys': [('name', ASCENDING)]},
+    # apps.newsletter
+    {'app': 'newsletter', 'collection': 'subscribers', 'keys': [('email', ASCENDING)], 'unique': True},
+    # apps.authentication
+    {'app': 'authentication', 'collection': 'users', 'keys': [('email', ASCENDING)], 'unique': True},
+    {'app': 'authentication', 'collection': 'users', 'keys': [('email_key', ASCENDING)], 'unique': True, 'sparse': True},
+    # apps.theme
+    {'app': 'theme', 'collection': 'theme_preferences', 'keys': [('user_id', ASCENDING)]},
+    {'app': 'theme', 'collection': 'theme_preferences', 'keys': [('session_id', ASCENDING)]},
+    {'app': 'theme', 'collection': 'global_theme_config', 'keys': [('type', ASCENDING)], 'unique': True},
+    # apps.estimation
+    {'app': 'estimation', 'collection': 'estimation_rules', 'keys': [('type', ASCENDING)], 'unique': True},
+    # apps.chatbot — reply cache warm-up reads the most recent first turns
+    {'app': 'chatbot', 'collection': 'chat_messages', 'keys': [('first_turn', ASCENDING), ('timestamp', DESCENDING)]},
+    # Idle chat sessions expire after 30 days (apps.chatbot.sessions)
+    {'app': 'chatbot', 'collection': 'chat_sessions', 'keys': [('updated_at', ASCENDING)], 'expireAfterSeconds': 30 * 24 * 3600},
+    # apps.utils.mailer — run_email_worker claims due jobs in run_at order
+    {'app': 'utils', 'collection': 'email_jobs', 'keys': [('status', ASCENDING), ('run_at', ASCENDING)]},
+    # apps.utils.mongo_sessions — Django sessions expire at their own expiry date
+    {'app': 'utils', 'collection': 'django_sessions', 'keys': [('expire_at', ASCENDING)], 'expireAfterSeconds': 0},
+    # apps.projects — keyset pagination order
+    {'app': 'projects', 'collection': 'projects', 'keys': [('created_at', DESCENDING), ('_id', DESCENDING)]},
+    # apps.utils.invalidation — poll mode reads the latest updated_at of every content collection
+    *[{'app': 'utils', 'collection': name, 'keys': [('updated_at', DESCENDING)]} for name in CONTENT_COLLECTIONS],
+]
+
+# Representative filters/sorts issued by the views, used for explain().
+QUERY_SHAPES = [
+    {'collection': 'carts', 'filter': {'user_id': 'anonymous'}},
+    {'collection': 'services', 'filter': {'$or': [{'slug': 'Web-Development'}, {'slug_key': 'web-development'}]}},
+    {'collection': 'technologies', 'filter': {'name': 'React'}},
+    {'collection': 'subscribers', 'filter': {'email': 'someone@example.com'}},
+    {'collection': 'users', 'filter': {'$or': [{'email': 'someone@example.com'}, {'email_key': 'someone@example.com'}]}},
+    {'collection': 'theme_preferences', 'filter': {'user_id': 'some-user'}},
+    {'collection': 'theme_preferences', 'filter': {'session_id': 'some-session'}},
+    {'collection': 'global_theme_config', 'filter': {'type': 'main'}},
+    {'collection': 'estimation_rules', 'filter': {'type': {'$in': ['defaults', 'pricing']}}},
+    {'collection': 'chat_messages', 'filter': {'first_turn': True}, 'sort': [('timestamp', DESCENDING)]},
+    {'collection': 'email_jobs', 'filter': {'status': 'pending', 'run_at': {'$lte': datetime.datetime(2025, 1, 1)}}, 'sort': [('run_at', ASCENDING)]},
+    {'collection': 'projects', 'filter': {}, 'sort': [('created_at', DESCENDING), ('_id', DESCENDING)]},
+    {'collection': 'django_sessions', 'filter': {'_id': 'some-session', 'expire_at': {'$gt': datetime.datetime(2025, 1, 1)}}},
+    *[{'collection': name, 'filter': {}, 'sort': [('updated_at', DESCENDING)]} for name in CONTENT_COLLECTIONS],
+]
+
+_CREATE_OPTIONS = ('unique', 'sparse', 'expireAfterSeconds', 'partialFilterExpression', 'collation')
+
+
+def _key_tuple(keys):
+    return tuple((field, int(direction)) for field, direction in keys)
+
+
+def index_name(spec):
+    return spec.get('name') or '_'.join(f"{field}_{int(direction)}" for field, direction in spec['keys'])
+
+
+def existing_index_keys(db, collection):
+    try:
+        return {_key_tuple(info['key'].items()) for info in db[collection].list_indexes()}
+    except PyMongoError:
+        return set()
+
+
+def missing_indexes(db, specs=None):
+    """Registry entries whose key pattern does not exist on the collection."""
+    specs = MONGO_INDEXES if specs is None else specs
+    existing = {}
+    missing = []
+    for spec in specs:
+        collection = spec['collection']
+        if collection not in existing:
+            existing[collection] = existing_index_keys(db, collection)
+        if _key_tuple(spec['keys']) not in existing[collection]:
+            missing.append(spec)
+    return missing
+
+
+def ensure_indexes(db, specs=None):
+    """
+    Create every missing index. Returns a list of (spec, error) where error
+    is None on success, e.g. a unique index that cannot be built because of
+    duplicate values.
+    """
+    results = []
+    for spec in missing_indexes(db, specs):
+        options = {key: spec[key] for key in _CREATE_OPTIONS if key in spec}
+        try:
+            db[spec['collection']].create_index(spec['keys'], name=index_name(spec), **options)
+            results.append((spec, None))
+        except PyMongoError as e:
+            results.append((spec, str(e)))
+    return results
+
+
+def _plan_stages(plan):
+    if not isinstance(plan, dict):
+        return []
+    stages = [plan.get('stage')] if plan.get('stage') else []
+    for child_key in ('inputStage', 'queryPlan'):
+        stages.extend(_plan_stages(plan.get(child_key)))
+    for child in plan.get('inputStages', []):
+        stages.extend(_plan_stages(child))
+    return stages
+
+
+def explain_query_shapes(db, shapes=None):
+    """
+    Run explain() on every registered query shape. Returns a list of
+    (shape, stages, error) where stages is the winning plan's stage list
+    (COLLSCAN means the query is not using an index).
+    """
+    shapes = QUERY_SHAPES if shapes is None else shapes
+    results = []
+    for shape in shapes:
+        try:
+            cursor = db[shape['collection']].find(shape['filter'])
+            if shape.get('sort'):
+                cursor = cursor.sort(shape['sort'])
+            plan = cursor.limit(1).explain()
+            winning = plan.get('queryPlanner', {}).get('winningPlan', {})
+            results.append((shape, _plan_stages(winning), None))
+        except PyMongoError as e:
+            results.append((shape, [], str(e)))
+    return results
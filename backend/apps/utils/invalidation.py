@@ -0,0 +1,195 @@
+"""
+Cache invalidation bus for the content collections.
+Usage:
+    # settings.py
+    CACHE_INVALIDATION_MODE = 'auto'    # 'change_stream' | 'poll' | 'off'
+
+    # started per worker process by apps.utils.middleware.InvalidationBusMiddleware
+    from apps.utils.invalidation import invalidation_bus
+    invalidation_bus.stats()
+
+Every worker runs one daemon thread that turns writes to CONTENT_COLLECTIONS
+- from any worker, the admin, a seed command or a manual edit in Mongo -
+into content_cache.bump(<collection>). All version-keyed caches
+(cached_json_response, service_index, rules_store, catalog_index, ...)
+therefore stay correct within about a second (change streams) or one poll
+interval while keeping CONTENT_CACHE_TIMEOUT long.
+
+'change_stream' watches the database with a resumable change stream
+(replica sets / Atlas). The resume token is kept in memory, so a dropped
+connection resumes where it stopped; if the stream has to restart without
+one, every collection is bumped since events may have been missed.
+'poll' compares a cheap per-collection fingerprint (document count, latest
+updated_at, highest _id) every CACHE_INVALIDATION_POLL_INTERVAL seconds,
+for standalone local servers. Inserts and deletes move the count or _id;
+in-place edits are only seen through updated_at, so every update path
+sets it (a manual edit in Mongo should too, or run with change streams).
+Polling costs 3 queries per collection per interval in every worker
+process: with 12 collections, 4 workers and the default 5 s interval that
+is about 29 queries/s. The updated_at and _id reads are top-1 index scans
+(updated_at indexes are registered in apps.utils.indexes, run
+ensure_indexes), so lowering the interval is cheap but not free.
+'auto' tries the change stream and falls back to polling when the server
+does not support it.
+"""
+
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from pymongo import DESCENDING
+from pymongo.errors import OperationFailure
+
+from .cache import content_cache
+from .mongo import get_mongo_db
+
+logger = logging.getLogger(__name__)
+
+# Collection name == content_cache namespace
+CONTENT_COLLECTIONS = (
+    'services', 'technologies', 'projects', 'about', 'site_config', 'global_theme_config',
+    'color_palettes', 'color_schemes', 'custom_colors', 'gradient_presets', 'estimation_rules',
+    # apps.authentication.authentication.user_cache
+    'users',
+)
+
+_NO_CHANGE_STREAMS = (40573, 40324)   # not a replica set / unrecognized $changeStream
+_HISTORY_LOST = 286
+_RETRY_AFTER = 5
+
+
+class InvalidationBus:
+    def __init__(self, collections, mode='auto', poll_interval=5.0):
+        self.collections = tuple(collections)
+        self.mode = mode
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._stopping = threading.Event()
+        self._resume_token = None
+        self._fingerprints = {}
+        self._stats = {'mode': None, 'events': 0, 'bumps': 0, 'errors': 0, 'last_event': None}
+
+    def ensure_started(self):
+        """Start the watcher thread in this process (no-op once running)."""
+        if self.mode == 'off':
+            return
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            # First use in this process (or after a fork): watch from here
+            self._resume_token = None
+            self._fingerprints = {}
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name='cache-invalidation', daemon=True)
+            self._pid = pid
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    # -----------------------------------------------------------------
+    # Watcher thread
+    # -----------------------------------------------------------------
+    def _run(self):
+        use_stream = self.mode in ('auto', 'change_stream')
+        while not self._stopping.is_set():
+            db = get_mongo_db()
+            if db is None:
+                self._stopping.wait(_RETRY_AFTER)
+                continue
+            try:
+                if use_stream:
+                    self._watch(db)
+                else:
+                    self._poll(db)
+            except OperationFailure as e:
+                if use_stream and self.mode == 'auto' and e.code in _NO_CHANGE_STREAMS:
+                    logger.info("Change streams unavailable, polling for changes every %ss instead", self.poll_interval)
+                    use_stream = False
+                    continue
+                if e.code == _HISTORY_LOST:
+                    self._resume_token = None
+                self._error(e)
+            except Exception as e:
+                self._error(e)
+
+    def _error(self, error):
+        self._count('errors')
+        logger.warning("Watcher error, retrying in %ss: %s", _RETRY_AFTER, error)
+        self._stopping.wait(_RETRY_AFTER)
+
+    def _watch(self, db):
+        pipeline = [{'$match': {'ns.coll': {'$in': list(self.collections)}}}]
+        resuming = self._resume_token is not None
+        with db.watch(pipeline, resume_after=self._resume_token, max_await_time_ms=500) as stream:
+            self._set('mode', 'change_stream')
+            if not resuming and self._stats['events']:
+                # Restarted without a token: changes in the gap are unknown
+                self._bump_all('restart')
+            while not self._stopping.is_set() and stream.alive:
+                change = stream.try_next()
+                self._resume_token = stream.resume_token
+                if change is None:
+                    continue
+                self._count('events')
+                collection = change.get('ns', {}).get('coll')
+                token = str(change['_id'].get('_data', change['_id']))
+                if change.get('operationType') == 'invalidate' or collection not in self.collections:
+                    self._resume_token = None
+                    self._bump_all(token)
+                else:
+                    self._bump(collection, token)
+
+    def _poll(self, db):
+        self._set('mode', 'poll')
+        while not self._stopping.is_set():
+            for collection in self.collections:
+                fingerprint = self._fingerprint(db[collection])
+                previous = self._fingerprints.get(collection)
+                self._fingerprints[collection] = fingerprint
+                if previous is not None and fingerprint != previous:
+                    self._count('events')
+                    self._bump(collection, repr(fingerprint))
+            self._stopping.wait(self.poll_interval)
+
+    @staticmethod
+    def _fingerprint(coll):
+        # A metadata count and two top-1 index reads (updated_at, _id)
+        latest = next(iter(coll.find({}, {'updated_at': 1}).sort('updated_at', DESCENDING).limit(1)), {})
+        newest = next(iter(coll.find({}, {'_id': 1}).sort('_id', DESCENDING).limit(1)), {})
+        return (coll.estimated_document_count(), latest.get('updated_at'), newest.get('_id'))
+
+    def _bump(self, collection, token):
+        if content_cache.bump_once(collection, token):
+            self._count('bumps')
+        self._set('last_event', time.time())
+
+    def _bump_all(self, token):
+        for collection in self.collections:
+            self._bump(collection, token)
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def _set(self, key, value):
+        with self._lock:
+            self._stats[key] = value
+
+
+invalidation_bus = InvalidationBus(
+    CONTENT_COLLECTIONS,
+    mode=getattr(settings, 'CACHE_INVALIDATION_MODE', 'auto'),
+    poll_interval=getattr(settings, 'CACHE_INVALIDATION_POLL_INTERVAL', 5.0),
+)
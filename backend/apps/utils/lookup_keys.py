@@ -0,0 +1,44 @@
+"""
+Normalized shadow fields for case-insensitive point lookups.
+Usage:
+    from apps.utils.lookup_keys import lookup_filter, with_lookup_keys
+
+    # Write path: keep the shadow field in sync
+    coll.insert_one(with_lookup_keys('services', data))
+
+    # Read path: one indexed lookup instead of a ^...$ IGNORECASE regex
+    service = db['services'].find_one(lookup_filter('services', slug))
+
+Each collection in LOOKUP_KEYS stores `<field>_key` = field.strip().lower()
+next to the original value, with a unique index on it (apps.utils.indexes).
+Existing documents are filled in by `python manage.py backfill_lookup_keys`.
+"""
+
+# collection -> (source field, normalized shadow field)
+LOOKUP_KEYS = {
+    'services': ('slug', 'slug_key'),
+    'users': ('email', 'email_key'),
+}
+
+
+def normalize_key(value):
+    return str(value).strip().lower()
+
+
+def with_lookup_keys(collection, doc):
+    """Set the shadow field on `doc` (in place) when its source field is present."""
+    source, shadow = LOOKUP_KEYS[collection]
+    value = doc.get(source)
+    if isinstance(value, str):
+        doc[shadow] = normalize_key(value)
+    return doc
+
+
+def lookup_filter(collection, value):
+    """
+    Filter matching `value` case-insensitively. The exact match on the source
+    field keeps documents that predate the backfill reachable; both branches
+    are served by an index.
+    """
+    source, shadow = LOOKUP_KEYS[collection]
+    return {'$or': [{source: value}, {shadow: normalize_key(value)}]}
@@ -0,0 +1,370 @@
+"""
+Outbound email queue for transactional mail (contact form, newsletter).
+Usage:
+    from apps.utils.mailer import send_email
+
+    send_email({
+        "from": "Zsyio Team <onboarding@resend.dev>",
+        "to": ["someone@example.com"],
+        "subject": "We received your message - Zsyio",
+        "html": "<p>...</p>",
+    }, kind='contact_auto_reply')
+
+send_email() only enqueues, so views can respond as soon as the submission
+itself is persisted. A failed delivery is retried with exponential backoff
+(EMAIL_RETRY_BASE * 2**(attempt - 1) seconds, +/-20% jitter) up to
+EMAIL_MAX_ATTEMPTS tries; after that the job is moved to the
+`email_dead_letters` collection (`run_email_worker --requeue-dead` puts
+them back in line).
+
+EMAIL_QUEUE_BACKEND selects where jobs wait:
+    'thread' (default)  in-process worker threads (EMAIL_WORKERS)
+    'mongo'             the `email_jobs` collection, drained by
+                        `python manage.py run_email_worker`
+    'sync'              send inline without retries (debugging)
+
+EMAIL_SENDER selects the transport: 'resend' (Resend API) or 'stub', which
+only records messages in memory (get_sender().outbox) for tests and local
+development.
+"""
+
+import atexit
+import datetime
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+
+from django.conf import settings
+from pymongo import ReturnDocument
+
+from apps.utils.mongo import get_mongo_db
+
+
+# ---------------------------------------------------------------------
+# Senders
+# ---------------------------------------------------------------------
+
+class ResendSender:
+    def send(self, message):
+        import resend
+
+        resend.api_key = getattr(settings, 'RESEND_API_KEY', None) or os.getenv("RESEND_API_KEY")
+        return resend.Emails.send(message)
+
+
+class StubSender:
+    """Records messages instead of sending them; fail_next makes the next N sends raise."""
+
+    def __init__(self):
+        self.outbox = []
+        self.fail_next = 0
+
+    def send(self, message):
+        if self.fail_next > 0:
+            self.fail_next -= 1
+            raise RuntimeError("Stub sender failure")
+        self.outbox.append(message)
+        return {"id": f"stub-{len(self.outbox)}"}
+
+
+SENDERS = {'resend': ResendSender, 'stub': StubSender}
+_senders = {}
+
+
+def get_sender(name=None):
+    name = name or getattr(settings, 'EMAIL_SENDER', 'resend')
+    if name not in _senders:
+        _senders[name] = SENDERS[name]()
+    return _senders[name]
+
+
+# ---------------------------------------------------------------------
+# Shared retry policy
+# ---------------------------------------------------------------------
+
+def new_job(message, kind):
+    return {
+        "kind": kind,
+        "message": message,
+        "attempts": 0,
+        "last_error": None,
+        "created_at": datetime.datetime.utcnow(),
+    }
+
+
+def retry_delay(attempts, base):
+    return base * 2 ** (attempts - 1) * random.uniform(0.8, 1.2)
+
+
+def deliver(job, sender=None):
+    """One delivery attempt. Returns None on success or the error message."""
+    job['attempts'] += 1
+    try:
+        (sender or get_sender()).send(job['message'])
+        return None
+    except Exception as e:
+        job['last_error'] = str(e)
+        return job['last_error']
+
+
+def dead_letter(job, reason):
+    """Move a job that will not be retried to `email_dead_letters`."""
+    to = job.get('message', {}).get('to')
+    print(f"[Mailer] Giving up on {job.get('kind')} email to {to} after {job.get('attempts')} attempt(s): {reason}")
+    db = get_mongo_db()
+    if db is None:
+        return False
+    try:
+        db['email_dead_letters'].insert_one({
+            "kind": job.get('kind'),
+            "message": job.get('message'),
+            "attempts": job.get('attempts', 0),
+            "last_error": job.get('last_error'),
+            "reason": reason,
+            "created_at": job.get('created_at'),
+            "failed_at": datetime.datetime.utcnow(),
+        })
+        return True
+    except Exception as e:
+        print(f"[MongoDB] Could not store dead-lettered email: {e}")
+        return False
+
+
+# ---------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------
+
+class ThreadEmailQueue:
+    """
+    In-process delay queue drained by a small pool of daemon threads.
+    Jobs are kept in a heap ordered by their next attempt time, so a job
+    waiting for its backoff never blocks the ones behind it.
+    """
+
+    def __init__(self, workers=2, max_attempts=5, retry_base=2.0, maxsize=1000):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.maxsize = maxsize
+        self._cond = threading.Condition()
+        self._heap = []
+        self._seq = itertools.count()
+        self._threads = []
+        self._pid = None
+        self._busy = 0
+        self._stopping = False
+        self.stats = {'enqueued': 0, 'sent': 0, 'retried': 0, 'dead': 0}
+
+    def put(self, job):
+        self._ensure_started()
+        with self._cond:
+            if len(self._heap) >= self.maxsize:
+                full = True
+            else:
+                full = False
+                heapq.heappush(self._heap, (time.monotonic(), next(self._seq), job))
+                self.stats['enqueued'] += 1
+                self._cond.notify()
+        if full:
+            self._dead(job, "queue full")
+            return False
+        return True
+
+    def flush(self, timeout=None):
+        """Wait until every job that is due has been attempted. Returns True if idle."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._busy or (self._heap and self._heap[0][0] <= time.monotonic()):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(timeout=0.05 if remaining is None else min(remaining, 0.05))
+            return True
+
+    def get_stats(self):
+        with self._cond:
+            return dict(self.stats, pending=len(self._heap), backend='thread')
+
+    def shutdown(self, timeout=5.0):
+        if self._pid != os.getpid():
+            return
+        self.flush(timeout=timeout)
+        with self._cond:
+            self._stopping = True
+            left, self._heap = self._heap, []
+            self._cond.notify_all()
+        for _, _, job in left:
+            self._dead(job, "shutdown")
+
+    def _ensure_started(self):
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._cond:
+            if self._pid == pid:
+                return
+            # First use in this process (or after a fork): start our own workers
+            self._heap = []
+            self._busy = 0
+            self._stopping = False
+            self._threads = [
+                threading.Thread(target=self._run, name=f'email-worker-{i}', daemon=True)
+                for i in range(self.workers)
+            ]
+            self._pid = pid
+        for thread in self._threads:
+            thread.start()
+
+    def _next_job(self):
+        with self._cond:
+            while not self._stopping:
+                now = time.monotonic()
+                if self._heap and self._heap[0][0] <= now:
+                    self._busy += 1
+                    return heapq.heappop(self._heap)[2]
+                self._cond.wait(timeout=(self._heap[0][0] - now) if self._heap else None)
+            return None
+
+    def _run(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            try:
+                self._process(job)
+            finally:
+                with self._cond:
+                    self._busy -= 1
+                    self._cond.notify_all()
+
+    def _process(self, job):
+        error = deliver(job)
+        if error is None:
+            self._count('sent')
+        elif job['attempts'] >= self.max_attempts:
+            self._dead(job, error)
+        else:
+            self._count('retried')
+            with self._cond:
+                run_at = time.monotonic() + retry_delay(job['attempts'], self.retry_base)
+                heapq.heappush(self._heap, (run_at, next(self._seq), job))
+                self._cond.notify()
+
+    def _dead(self, job, reason):
+        self._count('dead')
+        dead_letter(job, reason)
+
+    def _count(self, key):
+        with self._cond:
+            self.stats[key] += 1
+
+
+class MongoEmailQueue:
+    """
+    Durable queue in `email_jobs`. Web processes only insert; one or more
+    `run_email_worker` processes claim due jobs with find_one_and_update,
+    so a job is attempted by exactly one worker. A job left in "sending"
+    by a crashed worker is reclaimed after `lock_timeout` seconds.
+    """
+
+    def __init__(self, max_attempts=5, retry_base=2.0, lock_timeout=300):
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.lock_timeout = lock_timeout
+
+    def put(self, job):
+        db = get_mongo_db()
+        if db is None:
+            return False
+        try:
+            db['email_jobs'].insert_one(dict(job, status='pending', run_at=datetime.datetime.utcnow()))
+            return True
+        except Exception as e:
+            print(f"[MongoDB] Could not queue email: {e}")
+            return False
+
+    def claim(self, db):
+        now = datetime.datetime.utcnow()
+        stale = now - datetime.timedelta(seconds=self.lock_timeout)
+        return db['email_jobs'].find_one_and_update(
+            {'$or': [
+                {'status': 'pending', 'run_at': {'$lte': now}},
+                {'status': 'sending', 'locked_at': {'$lte': stale}},
+            ]},
+            {'$set': {'status': 'sending', 'locked_at': now}},
+            sort=[('run_at', 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def run_once(self, db, sender=None):
+        """Claim and attempt one due job. Returns 'sent', 'retry', 'dead' or None if idle."""
+        job = self.claim(db)
+        if job is None:
+            return None
+        error = deliver(job, sender)
+        if error is None:
+            db['email_jobs'].delete_one({'_id': job['_id']})
+            return 'sent'
+        if job['attempts'] >= self.max_attempts:
+            if dead_letter(job, error):
+                db['email_jobs'].delete_one({'_id': job['_id']})
+            return 'dead'
+        db['email_jobs'].update_one({'_id': job['_id']}, {'$set': {
+            'status': 'pending',
+            'attempts': job['attempts'],
+            'last_error': error,
+            'run_at': datetime.datetime.utcnow() + datetime.timedelta(seconds=retry_delay(job['attempts'], self.retry_base)),
+        }, '$unset': {'locked_at': ''}})
+        return 'retry'
+
+
+_thread_queue = ThreadEmailQueue(
+    workers=getattr(settings, 'EMAIL_WORKERS', 2),
+    max_attempts=getattr(settings, 'EMAIL_MAX_ATTEMPTS', 5),
+    retry_base=getattr(settings, 'EMAIL_RETRY_BASE', 2.0),
+    maxsize=getattr(settings, 'EMAIL_QUEUE_SIZE', 1000),
+)
+mongo_email_queue = MongoEmailQueue(
+    max_attempts=getattr(settings, 'EMAIL_MAX_ATTEMPTS', 5),
+    retry_base=getattr(settings, 'EMAIL_RETRY_BASE', 2.0),
+)
+
+
+def send_email(message, kind='email'):
+    """
+    Queue a Resend-style message dict for delivery. Returns False only when
+    the email could not be queued (or, with the 'sync' backend, sent).
+    """
+    job = new_job(message, kind)
+    backend = getattr(settings, 'EMAIL_QUEUE_BACKEND', 'thread')
+    if backend == 'sync':
+        error = deliver(job)
+        if error is not None:
+            print(f"[Mailer] Error sending {kind} email: {error}")
+        return error is None
+    if backend == 'mongo':
+        if mongo_email_queue.put(job):
+            return True
+        # Mongo unavailable: still try from this process rather than lose the mail
+    return _thread_queue.put(job)
+
+
+def flush_email_queue(timeout=None) -> bool:
+    """Wait for the in-process queue to attempt every due job (tests, shutdown)."""
+    return _thread_queue.flush(timeout=timeout)
+
+
+def email_queue_stats() -> dict:
+    """Counters for the in-process queue (enqueued/sent/retried/dead/pending)."""
+    return _thread_queue.get_stats()
+
+
+@atexit.register
+def _drain_on_shutdown():
+    try:
+        _thread_queue.shutdown()
+    except Exception as e:
+        print(f"[Mailer] Error draining email queue on shutdown: {e}")
@@ -0,0 +1,43 @@
+"""
+Fill in the normalized shadow fields declared in apps.utils.lookup_keys.
+
+Usage:
+    python manage.py backfill_lookup_keys
+    python manage.py backfill_lookup_keys --batch-size 1000
+"""
+
+from django.core.management.base import BaseCommand
+from pymongo import UpdateOne
+
+from apps.utils.lookup_keys import LOOKUP_KEYS, normalize_key
+from apps.utils.mongo import get_mongo_db
+
+
+class Command(BaseCommand):
+    help = "Backfill normalized lookup keys (e.g. services.slug_key, users.email_key)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        db = get_mongo_db()
+        if db is None:
+            self.stderr.write(self.style.ERROR('Could not connect to MongoDB'))
+            return
+
+        batch_size = options['batch_size']
+        for collection, (source, shadow) in LOOKUP_KEYS.items():
+            coll = db[collection]
+            ops = []
+            updated = 0
+            for doc in coll.find({source: {'$type': 'string'}}, {source: 1, shadow: 1}):
+                key = normalize_key(doc[source])
+                if doc.get(shadow) == key:
+                    continue
+                ops.append(UpdateOne({'_id': doc['_id']}, {'$set': {shadow: key}}))
+                if len(ops) >= batch_size:
+                    updated += coll.bulk_write(ops, ordered=False).modified_count
+                    ops = []
+            if ops:
+                updated += coll.bulk_write(ops, ordered=False).modified_count
+            self.stdout.write(self.style.SUCCESS(f"{collection}.{shadow}: {updated} document(s) updated"))
@@ -0,0 +1,112 @@
+"""
+Micro-benchmark for apps.utils.email_templates.
+
+Usage:
+    python manage.py bench_email_templates
+    python manage.py bench_email_templates --count 50000 --template contact_admin
+
+Renders `count` complete Resend messages per template and compares:
+    legacy   - the per-request code the views used to run: a settings read
+               for RESEND_FROM_EMAIL plus unescaped f-strings
+    escaped  - legacy with html.escape() on every field, i.e. the same
+               output guarantees as the registry
+    compiled - email_message() from the template registry (escaped, minified)
+No database connection or Resend API key is needed.
+"""
+
+import datetime
+import html
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.utils.email_templates import EMAIL_TEMPLATES, email_message
+
+_CONTEXTS = {
+    'contact_admin': lambda i: {'name': f'Visitor {i}', 'email': f'visitor{i}@example.com', 'message': 'Hello <team>, I need a quote & a timeline. ' * 3},
+    'contact_auto_reply': lambda i: {'name': f'Visitor {i}'},
+    'newsletter_welcome': lambda i: {},
+}
+
+
+def _legacy(template_name, to, context, escape=str):
+    """The f-strings that lived in the contact and newsletter views."""
+    from_email = getattr(settings, 'RESEND_FROM_EMAIL', "onboarding@resend.dev") or "onboarding@resend.dev"
+    if template_name == 'contact_admin':
+        name, email, message = escape(context['name']), escape(context['email']), escape(context['message'])
+        return {
+            "from": f"Zsyio Contact <{from_email}>",
+            "to": [to],
+            "subject": f"New Contact Form Submission from {context['name']}",
+            "html": f"<p><strong>Name:</strong> {name}<br><strong>Email:</strong> {email}<br><strong>Message:</strong> {message}</p>",
+            "reply_to": context['email'],
+        }
+    if template_name == 'contact_auto_reply':
+        return {
+            "from": f"Zsyio Team <{from_email}>",
+            "to": [to],
+            "subject": "We received your message - Zsyio",
+            "html": f"<p>Hi {escape(context['name'])},</p><p>We have received your message and will get back to you shortly.</p>",
+        }
+    return {
+        "from": f"Zsyio Newsletter <{from_email}>",
+        "to": [to],
+        "subject": "Welcome to Zsyio Newsletter!",
+        "html": f"""
+                    <div style="font-family: Arial, sans-serif; max-width: 600px; margin: auto; padding: 20px; border: 1px solid #eee; border-radius: 10px; background-color: #f9f9f9;">
+                        <div style="text-align: center; margin-bottom: 20px;">
+                            <h1 style="color: #4A90E2; margin: 0;">Zsyio</h1>
+                        </div>
+                        <h2 style="color: #333; text-align: center;">Welcome to our Newsletter!</h2>
+                        <p style="color: #555; line-height: 1.6;">Thank you for subscribing to the <strong>Zsyio</strong> newsletter. We are thrilled to have you with us!</p>
+                        <p style="color: #555; line-height: 1.6;">You'll be the first to receive updates on our latest projects, industry insights, and special announcements.</p>
+                        <div style="text-align: center; margin: 30px 0;">
+                            <a href="https://zsyio.com" style="background-color: #4A90E2; color: white; padding: 12px 24px; text-decoration: none; border-radius: 5px; font-weight: bold;">Visit Our Website</a>
+                        </div>
+                        <hr style="border: 0; border-top: 1px solid #ddd; margin: 20px 0;">
+                        <p style="font-size: 12px; color: #999; text-align: center;">You received this email because you subscribed on our website. <br> If you did not sign up for this newsletter, please ignore this email.</p>
+                        <p style="font-size: 12px; color: #999; text-align: center;">&copy; {datetime.datetime.now().year} Zsyio. All rights reserved.</p>
+                    </div>
+                """,
+    }
+
+
+class Command(BaseCommand):
+    help = "Benchmark compiled email templates against the old per-request f-strings."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=20000, help='Messages rendered per template and variant')
+        parser.add_argument('--template', choices=sorted(EMAIL_TEMPLATES), help='Only benchmark one template')
+
+    def handle(self, *args, **options):
+        count = options['count']
+        names = [options['template']] if options['template'] else sorted(EMAIL_TEMPLATES)
+        self.stdout.write(f"{count} messages per run\n")
+        self.stdout.write(f"{'template':<22} {'variant':<9} {'msgs/s':>12} {'html bytes':>11}")
+        for name in names:
+            contexts = [_CONTEXTS[name](i) for i in range(count)]
+            recipients = [f"subscriber{i}@example.com" for i in range(count)]
+
+            start = time.perf_counter()
+            for to, context in zip(recipients, contexts):
+                legacy = _legacy(name, to, context)
+            legacy_elapsed = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for to, context in zip(recipients, contexts):
+                escaped = _legacy(name, to, context, escape=html.escape)
+            escaped_elapsed = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for to, context in zip(recipients, contexts):
+                compiled = email_message(name, [to], **context)
+            compiled_elapsed = time.perf_counter() - start
+
+            for variant, elapsed, message in (
+                ('legacy', legacy_elapsed, legacy),
+                ('escaped', escaped_elapsed, escaped),
+                ('compiled', compiled_elapsed, compiled),
+            ):
+                rate = count / elapsed if elapsed else float('inf')
+                self.stdout.write(f"{name:<22} {variant:<9} {rate:>12,.0f} {len(message['html'].encode()):>11}")
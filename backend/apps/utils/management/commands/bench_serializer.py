@@ -0,0 +1,140 @@
+"""
+Micro-benchmark for apps.utils.serialization.
+
+Usage:
+    python manage.py bench_serializer
+    python manage.py bench_serializer --docs 2000 --repeat 20
+
+Builds synthetic "large" project documents (long descriptions, nested
+challenges/solutions, datetimes, ObjectIds, Decimals) and compares:
+    legacy    - the per-app recursive serialize_mongo_doc from services +
+                DRF JSONRenderer; the slowest of the removed copies (the
+                projects and colors ones differ only in leaving Decimal out)
+    legacy-ac - the about/cart copy, the fastest of the removed copies
+                (Decimal left to DRF)
+    shared    - apps.utils.serialization.serialize_mongo_doc + DRF JSONRenderer
+    dumps     - apps.utils.serialization.dumps on the raw documents
+Speed-ups are relative to legacy. Output must match legacy, except for
+legacy-ac, which renders Decimal as a JSON number.
+No database connection is needed.
+"""
+
+import datetime
+import decimal
+import json
+import time
+
+from bson.objectid import ObjectId
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from apps.utils.serialization import dumps, serialize_mongo_doc
+
+
+def _legacy_serialize_mongo_doc(doc):
+    """The copy that lived in apps/services/views.py (the most complete and slowest one)."""
+    if doc is None:
+        return None
+    if isinstance(doc, list):
+        return [_legacy_serialize_mongo_doc(item) for item in doc]
+    if isinstance(doc, dict):
+        new_doc = {}
+        for k, v in doc.items():
+            if k == '_id':
+                new_doc['id'] = str(v)
+            elif isinstance(v, (ObjectId, datetime.datetime, decimal.Decimal)):
+                if isinstance(v, datetime.datetime):
+                    new_doc[k] = v.isoformat()
+                else:
+                    new_doc[k] = str(v)
+            elif isinstance(v, (list, dict)):
+                new_doc[k] = _legacy_serialize_mongo_doc(v)
+            else:
+                new_doc[k] = v
+        return new_doc
+    return doc
+
+
+def _legacy_about_serialize_mongo_doc(doc):
+    """The copy that lived in apps/about/views.py and apps/cart/views.py."""
+    if doc is None:
+        return None
+    if isinstance(doc, list):
+        return [_legacy_about_serialize_mongo_doc(i) for i in doc]
+    if isinstance(doc, dict):
+        result = {}
+        for k, v in doc.items():
+            if k == '_id':
+                result['id'] = str(v)
+            elif isinstance(v, ObjectId):
+                result[k] = str(v)
+            elif isinstance(v, datetime.datetime):
+                result[k] = v.isoformat()
+            elif isinstance(v, (dict, list)):
+                result[k] = _legacy_about_serialize_mongo_doc(v)
+            else:
+                result[k] = v
+        return result
+    return doc
+
+
+def make_project(i):
+    now = datetime.datetime.utcnow()
+    return {
+        '_id': ObjectId(),
+        'title': f'Project {i}',
+        'summary': 'A short summary of the project for card grids. ' * 4,
+        'description': 'Long form description of the engagement and outcome. ' * 60,
+        'image': f'https://res.cloudinary.com/demo/image/upload/project_{i}.png',
+        'tags': ['React', 'Django', 'MongoDB', 'AWS', 'Tailwind'],
+        'client': {'name': f'Client {i}', 'industry': 'Retail', 'contact_id': ObjectId()},
+        'challenges': [{'title': f'Challenge {j}', 'detail': 'Detail text. ' * 12} for j in range(8)],
+        'solutions': [{'title': f'Solution {j}', 'detail': 'Detail text. ' * 12, 'shipped_at': now} for j in range(8)],
+        'features': [f'Feature {j}' for j in range(20)],
+        'budget': decimal.Decimal('125000.50'),
+        'rating': 4.8,
+        'is_featured': i % 3 == 0,
+        'live_url': None,
+        'created_at': now,
+        'updated_at': now,
+    }
+
+
+class Command(BaseCommand):
+    help = "Benchmark the shared BSON-to-JSON encoder against the legacy per-app serializers."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--docs', type=int, default=500, help='Number of project documents')
+        parser.add_argument('--repeat', type=int, default=10, help='Timed iterations per implementation')
+
+    def handle(self, *args, **options):
+        docs = [make_project(i) for i in range(options['docs'])]
+        repeat = options['repeat']
+        renderer = JSONRenderer()
+
+        candidates = [
+            ('legacy', lambda: renderer.render([_legacy_serialize_mongo_doc(d) for d in docs])),
+            ('legacy-ac', lambda: renderer.render([_legacy_about_serialize_mongo_doc(d) for d in docs])),
+            ('shared', lambda: renderer.render(serialize_mongo_doc(docs))),
+            ('dumps', lambda: dumps(docs)),
+        ]
+
+        reference = json.loads(candidates[0][1]())
+        for name, fn in candidates[2:]:
+            if json.loads(fn()) != reference:
+                self.stderr.write(self.style.ERROR(f"{name} output differs from legacy"))
+                return
+
+        self.stdout.write(f"{len(docs)} documents, {repeat} iterations each\n")
+        baseline = None
+        for name, fn in candidates:
+            fn()  # warm up
+            start = time.perf_counter()
+            for _ in range(repeat):
+                body = fn()
+            elapsed = (time.perf_counter() - start) / repeat
+            baseline = baseline or elapsed
+            self.stdout.write(
+                f"  {name:<10} {elapsed * 1000:8.2f} ms/run  "
+                f"{len(body) / 1024:8.0f} KiB  x{baseline / elapsed:4.2f}"
+            )
@@ -0,0 +1,110 @@
+"""
+Measure Django boot time and which imports it is spent on.
+
+Usage:
+    python manage.py bench_startup
+    python manage.py bench_startup --runs 10 --top 30
+    python manage.py bench_startup --json > startup.json
+
+Each run is a fresh interpreter that imports Django, calls django.setup()
+and loads the URLconf (which imports every view module), i.e. what a
+worker does before it can answer its first request. Timings are the
+median over --runs. One extra run under `python -X importtime` gives the
+per-module breakdown: cumulative microseconds for each top-level package
+and for each project module (apps.*, config.*), as reported by CPython.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+_CHILD = """
+import json, os, time
+t0 = time.perf_counter()
+import django
+django.setup()
+t1 = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+t2 = time.perf_counter()
+print(json.dumps({'setup_ms': (t1 - t0) * 1000, 'urls_ms': (t2 - t1) * 1000}))
+"""
+
+_PROJECT_PREFIXES = ('apps.', 'config.')
+
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us, depth)] from `-X importtime` output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        try:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            self_us, cumulative_us = int(self_us), int(cumulative_us)
+        except ValueError:
+            continue   # the header line
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), self_us, cumulative_us, depth))
+    return rows
+
+
+class Command(BaseCommand):
+    help = "Benchmark django.setup() and URLconf import time, with a per-module import breakdown."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters to time (median is reported)')
+        parser.add_argument('--top', type=int, default=15, help='Rows to show per breakdown table')
+        parser.add_argument('--json', action='store_true', help='Print a JSON report instead of tables')
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE)
+        env.pop('PYTHONPROFILEIMPORTTIME', None)
+
+        runs = [self._run([sys.executable, '-c', _CHILD], env)[0] for _ in range(max(options['runs'], 1))]
+        _, stderr = self._run([sys.executable, '-X', 'importtime', '-c', _CHILD], env)
+        rows = parse_importtime(stderr)
+
+        packages = sorted(
+            ((name, cumulative) for name, _, cumulative, _ in rows if '.' not in name),
+            key=lambda row: row[1], reverse=True,
+        )
+        project = sorted(
+            ((name, cumulative) for name, _, cumulative, _ in rows if name.startswith(_PROJECT_PREFIXES)),
+            key=lambda row: row[1], reverse=True,
+        )
+        report = {
+            'runs': len(runs),
+            'setup_ms': statistics.median(run['setup_ms'] for run in runs),
+            'urls_ms': statistics.median(run['urls_ms'] for run in runs),
+            'modules_imported': len(rows),
+            'packages': [{'module': name, 'cumulative_us': us} for name, us in packages[:options['top']]],
+            'project': [{'module': name, 'cumulative_us': us} for name, us in project[:options['top']]],
+        }
+        report['total_ms'] = report['setup_ms'] + report['urls_ms']
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(
+            f"django.setup() {report['setup_ms']:.1f} ms + URLconf {report['urls_ms']:.1f} ms "
+            f"= {report['total_ms']:.1f} ms (median of {report['runs']}), {report['modules_imported']} modules\n"
+        )
+        for title, table in (('Top-level packages', report['packages']), ('Project modules', report['project'])):
+            self.stdout.write(f"{title:<40} {'cumulative ms':>14}")
+            for row in table:
+                self.stdout.write(f"{row['module']:<40} {row['cumulative_us'] / 1000:>14.1f}")
+            self.stdout.write('')
+
+    def _run(self, cmd, env):
+        proc = subprocess.run(cmd, env=env, capture_output=True, text=True, cwd=settings.BASE_DIR)
+        if proc.returncode != 0:
+            raise RuntimeError(f"Startup run failed:\n{proc.stderr[-2000:]}")
+        # Settings and apps may print on import; the timings are the last line
+        return json.loads(proc.stdout.strip().splitlines()[-1]), proc.stderr
@@ -0,0 +1,62 @@
+"""
+Create (or report) the MongoDB indexes declared in apps.utils.indexes.
+
+Usage:
+    python manage.py ensure_indexes
+    python manage.py ensure_indexes --check
+    python manage.py ensure_indexes --explain
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.utils.indexes import (
+    MONGO_INDEXES,
+    ensure_indexes,
+    explain_query_shapes,
+    index_name,
+    missing_indexes,
+)
+from apps.utils.mongo import get_mongo_db
+
+
+class Command(BaseCommand):
+    help = "Create missing MongoDB indexes from the registry and flag collection scans."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Only report missing indexes, do not create them')
+        parser.add_argument('--explain', action='store_true', help='Run explain() on every registered query shape')
+
+    def handle(self, *args, **options):
+        db = get_mongo_db()
+        if db is None:
+            self.stderr.write(self.style.ERROR('Could not connect to MongoDB'))
+            return
+
+        missing = missing_indexes(db)
+        self.stdout.write(f"{len(MONGO_INDEXES)} registered indexes, {len(missing)} missing")
+
+        if options['check']:
+            for spec in missing:
+                self.stdout.write(self.style.WARNING(
+                    f"  missing: {spec['collection']}.{index_name(spec)} ({spec['app']})"
+                ))
+        else:
+            for spec, error in ensure_indexes(db, missing):
+                label = f"{spec['collection']}.{index_name(spec)}"
+                if error:
+                    self.stderr.write(self.style.ERROR(f"  failed: {label}: {error}"))
+                else:
+                    self.stdout.write(self.style.SUCCESS(f"  created: {label}"))
+
+        if options['explain']:
+            self.stdout.write("\nQuery shapes:")
+            for shape, stages, error in explain_query_shapes(db):
+                label = f"{shape['collection']} {shape['filter']}"
+                if shape.get('sort'):
+                    label += f" sort={shape['sort']}"
+                if error:
+                    self.stderr.write(self.style.ERROR(f"  {label}: {error}"))
+                elif 'COLLSCAN' in stages:
+                    self.stdout.write(self.style.WARNING(f"  COLLSCAN  {label}"))
+                else:
+                    self.stdout.write(self.style.SUCCESS(f"  {' <- '.join(stages):<30} {label}"))
@@ -0,0 +1,71 @@
+"""
+Deliver emails queued in `email_jobs` (EMAIL_QUEUE_BACKEND = 'mongo').
+
+Usage:
+    python manage.py run_email_worker
+    python manage.py run_email_worker --once            # drain due jobs and exit
+    python manage.py run_email_worker --requeue-dead    # retry dead letters
+    python manage.py run_email_worker --sender stub
+"""
+
+import datetime
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.utils.mailer import SENDERS, get_sender, mongo_email_queue
+from apps.utils.mongo import get_mongo_db
+
+
+class Command(BaseCommand):
+    help = "Send queued transactional emails with retries and dead-lettering."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit once no job is due')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds to sleep when idle')
+        parser.add_argument('--sender', choices=sorted(SENDERS), help='Override EMAIL_SENDER')
+        parser.add_argument('--requeue-dead', action='store_true', help='Move dead letters back to email_jobs and exit')
+
+    def handle(self, *args, **options):
+        db = get_mongo_db()
+        if db is None:
+            self.stderr.write(self.style.ERROR('Could not connect to MongoDB'))
+            return
+
+        if options['requeue_dead']:
+            self.requeue_dead(db)
+            return
+
+        sender = get_sender(options['sender'])
+        counts = {'sent': 0, 'retry': 0, 'dead': 0}
+        self.stdout.write(f"Email worker started ({type(sender).__name__})")
+        try:
+            while True:
+                outcome = mongo_email_queue.run_once(db, sender)
+                if outcome is not None:
+                    counts[outcome] += 1
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(
+            f"sent {counts['sent']}, retried {counts['retry']}, dead-lettered {counts['dead']}"
+        ))
+
+    def requeue_dead(self, db):
+        moved = 0
+        for doc in db['email_dead_letters'].find({}):
+            db['email_jobs'].insert_one({
+                'kind': doc.get('kind'),
+                'message': doc.get('message'),
+                'attempts': 0,
+                'last_error': doc.get('last_error'),
+                'created_at': doc.get('created_at'),
+                'status': 'pending',
+                'run_at': datetime.datetime.utcnow(),
+            })
+            db['email_dead_letters'].delete_one({'_id': doc['_id']})
+            moved += 1
+        self.stdout.write(self.style.SUCCESS(f"Requeued {moved} dead-lettered email(s)"))
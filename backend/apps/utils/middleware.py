@@ -0,0 +1,23 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.utils.decorators import sync_and_async_middleware
+
+from .invalidation import invalidation_bus
+
+
+@sync_and_async_middleware
+def InvalidationBusMiddleware(get_response):
+    """
+    Starts the cache invalidation watcher in whichever process serves the
+    request, so every gunicorn/uvicorn worker (including ones forked after
+    import) subscribes exactly once. The per-request cost is a pid check.
+    """
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            invalidation_bus.ensure_started()
+            return await get_response(request)
+        markcoroutinefunction(middleware)
+    else:
+        def middleware(request):
+            invalidation_bus.ensure_started()
+            return get_response(request)
+    return middleware
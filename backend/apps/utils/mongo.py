@@ -10,42 +10,439 @@ Usage:
 
     # Or use the helper (auto-handles None client)
     mongo_log('my_collection', {'action': 'created', 'id': 1})
+
+The client is created lazily, once per process (gunicorn --preload forks
+after import, and a MongoClient must not be shared across a fork), with
+the pool sizes from MONGO_MAX_POOL_SIZE / MONGO_MIN_POOL_SIZE /
+MONGO_MAX_IDLE_TIME_MS. mongo_pool_stats() reports connection checkouts
+and command counts collected by a pymongo event listener, for sizing
+workers against the cluster's connection limit.
+
+mongo_log() is write-behind: documents are put on a bounded in-process
+queue and a background thread flushes them with insert_many(ordered=False)
+once MONGO_LOG_BATCH_SIZE documents are waiting or MONGO_LOG_FLUSH_INTERVAL
+seconds have passed. Set MONGO_LOG_ASYNC = False to go back to a
+synchronous insert_one per call.
 """
 
+import atexit
 import datetime
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+
+import pymongo
 from django.conf import settings
+from pymongo import monitoring
+
+
+class PoolStats(monitoring.ConnectionPoolListener, monitoring.CommandListener):
+    """
+    Connection pool and command counters for this process. pymongo calls
+    the listener from whichever thread runs the operation, so every update
+    takes the lock; each callback is a couple of integer updates.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counters = {
+                'pools': 0,
+                'pool_clears': 0,
+                'open': 0,
+                'created': 0,
+                'closed': 0,
+                'in_use': 0,
+                'peak_in_use': 0,
+                'checkouts': 0,
+                'checkout_failures': 0,
+                'checkout_wait_ms': 0.0,
+                'max_checkout_wait_ms': 0.0,
+                'commands': 0,
+                'command_failures': 0,
+                'command_ms': 0.0,
+            }
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.counters)
+
+    def _add(self, key, amount=1):
+        with self._lock:
+            self.counters[key] += amount
+
+    # Pool events
+    def pool_created(self, event):
+        self._add('pools')
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._add('pool_clears')
+
+    def pool_closed(self, event):
+        self._add('pools', -1)
+
+    def connection_created(self, event):
+        with self._lock:
+            self.counters['created'] += 1
+            self.counters['open'] += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.counters['closed'] += 1
+            self.counters['open'] -= 1
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._add('checkout_failures')
+
+    def connection_checked_out(self, event):
+        wait_ms = (event.duration or 0.0) * 1000
+        with self._lock:
+            c = self.counters
+            c['checkouts'] += 1
+            c['in_use'] += 1
+            c['peak_in_use'] = max(c['peak_in_use'], c['in_use'])
+            c['checkout_wait_ms'] += wait_ms
+            c['max_checkout_wait_ms'] = max(c['max_checkout_wait_ms'], wait_ms)
+
+    def connection_checked_in(self, event):
+        self._add('in_use', -1)
+
+    # Command events
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        with self._lock:
+            self.counters['commands'] += 1
+            self.counters['command_ms'] += event.duration_micros / 1000
+
+    def failed(self, event):
+        with self._lock:
+            self.counters['commands'] += 1
+            self.counters['command_failures'] += 1
+            self.counters['command_ms'] += event.duration_micros / 1000
+
+
+pool_stats = PoolStats()
+
+_client_lock = threading.Lock()
+_client = None
+_client_pid = None
+_retry_at = 0.0
+
+
+def mongo_client_options():
+    """Keyword arguments shared by the sync and async clients."""
+    options = {
+        'maxPoolSize': getattr(settings, 'MONGO_MAX_POOL_SIZE', 100),
+        'minPoolSize': getattr(settings, 'MONGO_MIN_POOL_SIZE', 0),
+        'serverSelectionTimeoutMS': getattr(settings, 'MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000),
+        'tlsAllowInvalidCertificates': True,
+        'event_listeners': [pool_stats],
+    }
+    max_idle = getattr(settings, 'MONGO_MAX_IDLE_TIME_MS', None)
+    if max_idle:
+        options['maxIdleTimeMS'] = max_idle
+    return options
+
+
+def get_mongo_client():
+    """
+    Returns this process's MongoClient, or None if MONGO_URI is not set or
+    the server could not be reached. The first call in a process connects
+    and pings; after a failure the next attempt is made once
+    MONGO_RETRY_INTERVAL seconds have passed. settings.MONGO_CLIENT, if
+    set (tests, scripts), is used as-is.
+    """
+    global _client, _client_pid, _retry_at
+    override = getattr(settings, 'MONGO_CLIENT', None)
+    if override is not None:
+        return override
+    pid = os.getpid()
+    if _client_pid == pid:
+        if _client is not None or time.monotonic() < _retry_at:
+            return _client
+    uri = getattr(settings, 'MONGO_URI', None)
+    if not uri:
+        return None
+    with _client_lock:
+        if _client_pid == pid and (_client is not None or time.monotonic() < _retry_at):
+            return _client
+        if _client_pid != pid:
+            # Forked: the parent's sockets and monitor threads are not ours
+            _client = None
+            pool_stats.reset()
+        _client_pid = pid
+        client = None
+        try:
+            client = pymongo.MongoClient(uri, **mongo_client_options())
+            client.admin.command('ping')
+            print("MongoDB Connected Successfully")
+            _client = client
+        except Exception as e:
+            print(f"MongoDB Connection Failed: {e}")
+            if client is not None:
+                client.close()
+            _retry_at = time.monotonic() + getattr(settings, 'MONGO_RETRY_INTERVAL', 30)
+        return _client
 
 
 def get_mongo_db(db_name='zsyio_db'):
     """
     Returns the MongoDB database object, or None if not connected.
     """
-    client = getattr(settings, 'MONGO_CLIENT', None)
-    if client:
+    client = get_mongo_client()
+    if client is not None:
         return client[db_name]
     return None
 
 
+def mongo_pool_stats() -> dict:
+    """Pool utilization for this process (open/in_use/peak connections, waits, commands)."""
+    stats = pool_stats.snapshot()
+    stats['pid'] = os.getpid()
+    stats['max_pool_size'] = getattr(settings, 'MONGO_MAX_POOL_SIZE', 100)
+    stats['min_pool_size'] = getattr(settings, 'MONGO_MIN_POOL_SIZE', 0)
+    checkouts = stats['checkouts']
+    stats['avg_checkout_wait_ms'] = stats['checkout_wait_ms'] / checkouts if checkouts else 0.0
+    stats['utilization'] = stats['peak_in_use'] / stats['max_pool_size'] if stats['max_pool_size'] else 0.0
+    return stats
+
+
+class MongoLogQueue:
+    """
+    Bounded write-behind queue for audit/log documents.
+
+    Producers (request threads) only pay for a queue.put(). A single daemon
+    thread per process drains the queue and groups documents by
+    (db_name, collection) so each flush is one insert_many per collection.
+
+    Backpressure: when the queue is full, put() waits up to `put_timeout`
+    seconds for the flusher to make room, then drops the document and
+    increments the drop counter instead of blocking the request further.
+    """
+
+    def __init__(self, maxsize=10000, batch_size=500, flush_interval=1.0, put_timeout=0.05):
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._stopping = threading.Event()
+        self.stats = {
+            'enqueued': 0,
+            'written': 0,
+            'dropped': 0,
+            'failed': 0,
+            'flushes': 0,
+        }
+
+    # -----------------------------------------------------------------
+    # Producer side
+    # -----------------------------------------------------------------
+    def put(self, collection_name, document, db_name='zsyio_db'):
+        self._ensure_started()
+        try:
+            self._queue.put((db_name, collection_name, document), timeout=self.put_timeout)
+        except queue.Full:
+            self._count('dropped')
+            print(f"[MongoDB] Log queue full — dropped document for '{collection_name}'")
+            return False
+        self._count('enqueued')
+        return True
+
+    def flush(self, timeout=None):
+        """
+        Drain everything currently queued and write it synchronously.
+        Safe to call from any thread; used by the shutdown hook.
+        """
+        if self._queue is None:
+            return 0
+        deadline = None if timeout is None else time.monotonic() + timeout
+        written = 0
+        while True:
+            batch = self._drain(self.batch_size)
+            if not batch:
+                return written
+            written += self._write(batch)
+            if deadline is not None and time.monotonic() >= deadline:
+                return written
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+        stats['pending'] = self._queue.qsize() if self._queue is not None else 0
+        stats['maxsize'] = self.maxsize
+        return stats
+
+    # -----------------------------------------------------------------
+    # Flusher side
+    # -----------------------------------------------------------------
+    def _ensure_started(self):
+        pid = os.getpid()
+        if self._pid == pid and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == pid and self._thread is not None and self._thread.is_alive():
+                return
+            # First use in this process (or first use after a fork): the
+            # parent's queue and thread are not usable here, start fresh.
+            if self._pid != pid or self._queue is None:
+                self._queue = queue.Queue(maxsize=self.maxsize)
+            self._pid = pid
+            self._stopping.clear()
+            self._thread = threading.Thread(
+                target=self._run, name='mongo-log-flusher', daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            batch = self._drain(self.batch_size, wait=self.flush_interval)
+            if batch:
+                self._write(batch)
+
+    def _drain(self, limit, wait=None):
+        """
+        Collect up to `limit` documents. With `wait`, block until the first
+        document arrives and then keep collecting until the batch is full or
+        the flush interval has elapsed.
+        """
+        batch = []
+        q = self._queue
+        if q is None:
+            return batch
+        if wait is not None:
+            deadline = time.monotonic() + wait
+            while len(batch) < limit:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(q.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            return batch
+        while len(batch) < limit:
+            try:
+                batch.append(q.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        grouped = defaultdict(list)
+        for db_name, collection_name, document in batch:
+            grouped[(db_name, collection_name)].append(document)
+
+        written = 0
+        with self._flush_lock:
+            for (db_name, collection_name), documents in grouped.items():
+                try:
+                    db = get_mongo_db(db_name)
+                    if db is None:
+                        print(f"[MongoDB] Client not initialized — skipping {len(documents)} log(s) to '{collection_name}'")
+                        self._count('failed', len(documents))
+                        continue
+                    db[collection_name].insert_many(documents, ordered=False)
+                    written += len(documents)
+                except Exception as e:
+                    # BulkWriteError still inserts the valid documents with ordered=False
+                    details = getattr(e, 'details', None) or {}
+                    inserted = details.get('nInserted', 0)
+                    written += inserted
+                    self._count('failed', len(documents) - inserted)
+                    print(f"[MongoDB] Batched logging error in '{collection_name}': {e}")
+        self._count('written', written)
+        self._count('flushes')
+        return written
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def shutdown(self, timeout=5.0):
+        self._stopping.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and self._pid == os.getpid():
+            thread.join(timeout=self.flush_interval + 0.5)
+        self.flush(timeout=timeout)
+
+
+_log_queue = MongoLogQueue(
+    maxsize=getattr(settings, 'MONGO_LOG_QUEUE_SIZE', 10000),
+    batch_size=getattr(settings, 'MONGO_LOG_BATCH_SIZE', 500),
+    flush_interval=getattr(settings, 'MONGO_LOG_FLUSH_INTERVAL', 1.0),
+    put_timeout=getattr(settings, 'MONGO_LOG_PUT_TIMEOUT', 0.05),
+)
+
+
+def flush_mongo_logs(timeout=None) -> int:
+    """Synchronously write any queued log documents. Returns the number written."""
+    return _log_queue.flush(timeout=timeout)
+
+
+def mongo_log_stats() -> dict:
+    """Counters for the write-behind queue (enqueued/written/dropped/failed/pending)."""
+    return _log_queue.get_stats()
+
+
+@atexit.register
+def _flush_on_shutdown():
+    try:
+        _log_queue.shutdown()
+    except Exception as e:
+        print(f"[MongoDB] Error flushing log queue on shutdown: {e}")
+
+
 def mongo_log(collection_name: str, document: dict, db_name: str = 'zsyio_db') -> bool:
     """
     Insert a document into a MongoDB collection.
     Automatically adds a 'timestamp' field if not present.
     Returns True on success, False on failure (never raises).
 
+    With MONGO_LOG_ASYNC (the default) "success" means the document was
+    queued for the background flusher; it is written within
+    MONGO_LOG_FLUSH_INTERVAL seconds.
+
     Args:
         collection_name: Name of the MongoDB collection
         document: Dict to insert
         db_name: MongoDB database name (default: 'zsyio_db')
     """
     try:
+        if 'timestamp' not in document:
+            document['timestamp'] = datetime.datetime.utcnow()
+
+        if getattr(settings, 'MONGO_LOG_ASYNC', True):
+            if get_mongo_client() is None:
+                print(f"[MongoDB] Client not initialized — skipping log to '{collection_name}'")
+                return False
+            return _log_queue.put(collection_name, document, db_name)
+
         db = get_mongo_db(db_name)
         if db is None:
             print(f"[MongoDB] Client not initialized — skipping log to '{collection_name}'")
             return False
 
-        if 'timestamp' not in document:
-            document['timestamp'] = datetime.datetime.utcnow()
-
         db[collection_name].insert_one(document)
         print(f"[MongoDB] Logged to '{collection_name}' ✓")
         return True
@@ -0,0 +1,178 @@
+"""
+Django session engine that stores sessions in MongoDB.
+Usage:
+    # settings.py
+    SESSION_ENGINE = 'apps.utils.mongo_sessions'
+
+Sessions live in the `django_sessions` collection as
+{_id: session_key, data: <signed, encoded session>, expire_at: <UTC>}.
+A TTL index on expire_at (see apps.utils.indexes) removes expired ones,
+so `clearsessions` is not needed. Loading a session is one _id lookup.
+Recently used sessions are also kept in a bounded in-process cache for
+SESSION_CACHE_TTL seconds, so repeat requests within that window cost
+none. A session changed or deleted by another worker can therefore be
+seen stale here for up to that long; set SESSION_CACHE_TTL = 0 to always
+read from Mongo.
+
+Without a MongoDB connection sessions are kept in the process cache only,
+so anonymous visitors still get a working (per-worker) session.
+"""
+
+import datetime
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.sessions.backends.base import VALID_KEY_CHARS, CreateError, SessionBase, UpdateError
+from django.utils.crypto import get_random_string
+from pymongo.errors import DuplicateKeyError
+
+from .mongo import get_mongo_db
+
+COLLECTION = 'django_sessions'
+
+
+class _SessionCache:
+    """LRU of session_key -> (data, expire_at, cached_until)."""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, now):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= now or (entry[2] is not None and entry[2] <= time.monotonic()):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, data, expire_at, ttl):
+        if self.max_entries <= 0:
+            return
+        cached_until = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            self._entries[key] = (data, expire_at, cached_until)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+_cache = _SessionCache(getattr(settings, 'SESSION_CACHE_MAX_ENTRIES', 10000))
+
+
+def _utcnow():
+    # pymongo hands back naive UTC datetimes; compare like with like
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+
+class SessionStore(SessionBase):
+    @classmethod
+    def _collection(cls):
+        db = get_mongo_db()
+        return db[COLLECTION] if db is not None else None
+
+    def _expire_at(self):
+        expiry = self.get_expiry_date()
+        if expiry.tzinfo is not None:
+            expiry = expiry.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        return expiry
+
+    def _cache_ttl(self, coll):
+        # Without Mongo the process cache is the only copy: keep it until expiry
+        return getattr(settings, 'SESSION_CACHE_TTL', 30) if coll is not None else None
+
+    def load(self):
+        key = self.session_key
+        now = _utcnow()
+        data = None
+        if key:
+            entry = _cache.get(key, now)
+            if entry is not None:
+                data = entry[0]
+            else:
+                coll = self._collection()
+                if coll is not None:
+                    doc = coll.find_one({'_id': key, 'expire_at': {'$gt': now}})
+                    if doc is not None:
+                        data = doc['data']
+                        _cache.set(key, data, doc['expire_at'], self._cache_ttl(coll))
+        if data is None:
+            self._session_key = None
+            return {}
+        return self.decode(data)
+
+    def exists(self, session_key):
+        if not session_key:
+            return False
+        if _cache.get(session_key, _utcnow()) is not None:
+            return True
+        coll = self._collection()
+        if coll is None:
+            return False
+        return coll.find_one({'_id': session_key, 'expire_at': {'$gt': _utcnow()}}, {'_id': 1}) is not None
+
+    def _get_new_session_key(self):
+        # Collisions surface as DuplicateKeyError on insert (see create()),
+        # so there is no need for an exists() round-trip per new key.
+        return get_random_string(32, VALID_KEY_CHARS)
+
+    def create(self):
+        while True:
+            self._session_key = self._get_new_session_key()
+            try:
+                self.save(must_create=True)
+            except CreateError:
+                continue
+            self.modified = True
+            return
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        data = self.encode(self._get_session(no_load=must_create))
+        expire_at = self._expire_at()
+        coll = self._collection()
+        if coll is not None:
+            if must_create:
+                try:
+                    coll.insert_one({'_id': self.session_key, 'data': data, 'expire_at': expire_at})
+                except DuplicateKeyError:
+                    raise CreateError
+            else:
+                # Like the db backend: never resurrect a session deleted elsewhere
+                result = coll.update_one(
+                    {'_id': self.session_key},
+                    {'$set': {'data': data, 'expire_at': expire_at}},
+                )
+                if result.matched_count == 0:
+                    _cache.delete(self.session_key)
+                    raise UpdateError
+        elif must_create and _cache.get(self.session_key, _utcnow()) is not None:
+            raise CreateError
+        _cache.set(self.session_key, data, expire_at, self._cache_ttl(coll))
+
+    def delete(self, session_key=None):
+        if session_key is None:
+            if self.session_key is None:
+                return
+            session_key = self.session_key
+        _cache.delete(session_key)
+        coll = self._collection()
+        if coll is not None:
+            coll.delete_one({'_id': session_key})
+
+    @classmethod
+    def clear_expired(cls):
+        coll = cls._collection()
+        if coll is not None:
+            coll.delete_many({'expire_at': {'$lte': _utcnow()}})
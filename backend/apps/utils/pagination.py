@@ -0,0 +1,100 @@
+"""
+Keyset (cursor) pagination helpers for Mongo collections.
+Usage:
+    from apps.utils.pagination import decode_cursor, encode_cursor, keyset_filter
+
+    after = decode_cursor(request.query_params.get('cursor'))   # may raise ValueError
+    query = keyset_filter('created_at', after)
+    docs = list(coll.find(query).sort([('created_at', -1), ('_id', -1)]).limit(limit + 1))
+    next_cursor = encode_cursor(docs[limit - 1], 'created_at') if len(docs) > limit else None
+
+Pages are ordered by (field, _id) descending, so the cost of a page is one
+index range scan on {field: -1, _id: -1} no matter how deep the client has
+paged. Cursors are opaque URL-safe strings; clients just echo them back.
+"""
+
+import base64
+import datetime
+import json
+import re
+
+from bson.objectid import ObjectId
+
+_FIELD_RE = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*$')
+
+
+def encode_cursor(doc, field):
+    value = doc.get(field)
+    if isinstance(value, datetime.datetime):
+        value = {'dt': value.isoformat()}
+    _id = doc.get('_id')
+    payload = {
+        'v': value,
+        'i': str(_id),
+        'o': isinstance(_id, ObjectId),
+    }
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return (value, _id) from a cursor string, None for no cursor. Raises ValueError."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        value = payload['v']
+        if isinstance(value, dict) and 'dt' in value:
+            value = datetime.datetime.fromisoformat(value['dt'])
+        _id = ObjectId(payload['i']) if payload.get('o') else payload['i']
+    except Exception:
+        raise ValueError("Invalid cursor.")
+    return value, _id
+
+
+def keyset_filter(field, after):
+    """
+    Mongo filter for the page that follows `after` = (value, _id) in
+    (field desc, _id desc) order. Documents without `field` sort last.
+    """
+    if after is None:
+        return {}
+    value, _id = after
+    if value is None:
+        return {field: None, '_id': {'$lt': _id}}
+    return {'$or': [
+        {field: {'$lt': value}},
+        {field: value, '_id': {'$lt': _id}},
+        {field: None},
+    ]}
+
+
+def parse_fields(raw, always=('_id',)):
+    """
+    Turn a `fields=a,b,c` query parameter into a Mongo projection.
+    Returns (projection, requested) or (None, None) when no fields were
+    asked for. Raises ValueError on malformed names.
+    """
+    if not raw:
+        return None, None
+    requested = [f.strip() for f in raw.split(',') if f.strip()]
+    for name in requested:
+        if name == 'id':
+            continue
+        if not _FIELD_RE.match(name):
+            raise ValueError(f"Invalid field name: {name!r}")
+    projection = {name: 1 for name in requested if name != 'id'}
+    for name in always:
+        projection[name] = 1
+    return projection, set(requested)
+
+
+def parse_limit(raw, default, maximum):
+    if raw in (None, ''):
+        return default
+    try:
+        limit = int(raw)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be an integer.")
+    return max(1, min(limit, maximum))
@@ -0,0 +1,131 @@
+"""
+Pre-encoded JSON responses with strong ETags for read-only content endpoints.
+Usage:
+    from apps.utils.responses import cached_json_response
+
+    class ServiceViewSet(viewsets.ViewSet):
+        @cached_json_response('services')
+        def list(self, request):
+            ...
+            return Response(payload)
+
+The first 200 response for a URL (path + query string) is rendered once and
+the encoded bytes are kept in apps.utils.cache.content_cache together with a
+strong ETag (SHA-1 of the body), pinned to the versions of the collections
+named in the decorator. Until one of those collections is bumped, later
+requests get the stored bytes without running the view, and a matching
+If-None-Match is answered with 304 Not Modified straight away.
+
+Because the ETag is derived from the body, every worker computes the same
+ETag for the same content, so a 304 is still returned (after rendering)
+when the request lands on a worker that has not cached the URL yet.
+"""
+
+import functools
+import hashlib
+
+from django.http import HttpResponse, HttpResponseNotModified
+from rest_framework.response import Response
+
+from .cache import content_cache
+from .serialization import dumps
+
+
+def _etag_matches(request, etag):
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    return etag in (tag.strip() for tag in header.split(','))
+
+
+def _build(body, etag, headers=()):
+    response = HttpResponse(body, content_type='application/json')
+    for name, value in headers:
+        response[name] = value
+    response['ETag'] = etag
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+def _not_modified(etag):
+    response = HttpResponseNotModified()
+    response['ETag'] = etag
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+def json_bytes_response(request, body, etag, headers=()):
+    """Serve already-encoded JSON `body`, answering If-None-Match with 304."""
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+    return _build(body, etag, headers)
+
+
+def cached_json_response(*namespaces):
+    """
+    Decorate a DRF GET handler whose output only depends on the URL and on
+    the content of the Mongo collections listed in `namespaces`. With no
+    namespaces the response is treated as static for the process lifetime.
+    """
+    def decorator(view_method):
+        @functools.wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            key = f"http:{request.get_full_path()}"
+            versions = content_cache.versions(namespaces)
+
+            entry = content_cache.lookup(key, versions)
+            if entry is not None:
+                body, etag, headers = entry
+                return json_bytes_response(request, body, etag, headers)
+
+            response = view_method(self, request, *args, **kwargs)
+            if not isinstance(response, Response) or response.status_code != 200:
+                return response
+
+            body = dumps(response.data)
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            # Keep headers the view set itself (e.g. pagination Link). They are
+            # replayed for every host/scheme, so they must not embed either
+            headers = tuple(
+                (name, value) for name, value in response.items()
+                if name.lower() != 'content-type'
+            )
+            content_cache.store(key, versions, (body, etag, headers))
+            return json_bytes_response(request, body, etag, headers)
+        return wrapper
+    return decorator
+
+
+def async_cached_json_response(*namespaces):
+    """
+    cached_json_response() for async handlers (see apps.utils.async_views)
+    that return a Django HttpResponse. Entries are shared with the sync
+    decorator, so both paths serve the same bytes and ETag for a URL.
+    """
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def wrapper(request, *args, **kwargs):
+            key = f"http:{request.get_full_path()}"
+            versions = content_cache.versions(namespaces)
+
+            entry = content_cache.lookup(key, versions)
+            if entry is not None:
+                body, etag, headers = entry
+                return json_bytes_response(request, body, etag, headers)
+
+            response = await handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+
+            body = response.content
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            headers = tuple(
+                (name, value) for name, value in response.items()
+                if name.lower() != 'content-type'
+            )
+            content_cache.store(key, versions, (body, etag, headers))
+            return json_bytes_response(request, body, etag, headers)
+        return wrapper
+    return decorator
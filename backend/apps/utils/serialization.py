@@ -0,0 +1,239 @@
+"""
+Shared BSON -> JSON serialization for all Zsyio backend apps.
+Usage:
+    from apps.utils.serialization import dumps, serialize_mongo_doc
+
+    # Raw pymongo documents straight to JSON bytes (no intermediate dicts)
+    body = dumps(list(coll.find()))
+
+    # Or let DRF do it: MongoJSONRenderer is the default renderer, so views
+    # can return raw documents
+    return Response(list(coll.find()))
+
+    # When Python code needs the JSON-safe structure itself
+    doc = serialize_mongo_doc(coll.find_one(query))
+
+Conventions (same for both entry points):
+    - `_id` is emitted as `id` (always a string), at every nesting level
+    - ObjectId, Decimal, Decimal128 and UUID become strings
+    - datetime/date/time become ISO 8601 strings
+    - anything else is converted by DRF's JSONEncoder (lazy strings,
+      timedelta, bytes, numpy scalars, sets, ...) and then encoded
+"""
+
+import datetime
+import decimal
+import json
+import uuid
+from json.encoder import encode_basestring
+
+from bson.decimal128 import Decimal128
+from bson.objectid import ObjectId
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+_str = str
+_float_repr = float.__repr__
+_int_repr = int.__repr__
+# Same conversions as DRF's JSONRenderer for types not handled below
+_drf_default = JSONEncoder().default
+
+# Leaf types that are emitted as JSON strings via str()
+_STRINGIFIED = (ObjectId, decimal.Decimal, Decimal128, uuid.UUID)
+# Leaf types that are emitted as JSON strings via isoformat()
+_ISOFORMAT = (datetime.datetime, datetime.date, datetime.time)
+
+
+def _encode_float(value):
+    if value != value or value in (float('inf'), float('-inf')):
+        raise ValueError(f"Out of range float values are not JSON compliant: {value!r}")
+    return _float_repr(value)
+
+
+# Field names repeat across documents, so their encoded form is memoised
+_KEY_CACHE = {}
+_KEY_CACHE_LIMIT = 4096
+
+
+def _encode_key(key):
+    if type(key) is not str:
+        return _encode_key_uncached(key) + ':'
+    encoded = _KEY_CACHE.get(key)
+    if encoded is not None:
+        return encoded
+    encoded = _encode_key_uncached(key) + ':'
+    if len(_KEY_CACHE) < _KEY_CACHE_LIMIT:
+        _KEY_CACHE[key] = encoded
+    return encoded
+
+
+def _encode_key_uncached(key):
+    if type(key) is str:
+        return encode_basestring(key)
+    if key is True:
+        return '"true"'
+    if key is False:
+        return '"false"'
+    if key is None:
+        return '"null"'
+    return encode_basestring(_str(key))
+
+
+def _iterencode(obj, out):
+    """
+    Append the JSON encoding of `obj` to the list via `out` (list.append).
+    Exact-type checks come first because they are by far the common case
+    for pymongo output; subclasses (OrderedDict, ReturnList, ...) fall
+    through to the isinstance checks at the end.
+    """
+    t = type(obj)
+    if t is str:
+        out(encode_basestring(obj))
+    elif t is dict:
+        _iterencode_dict(obj, out)
+    elif t is list or t is tuple:
+        _iterencode_list(obj, out)
+    elif obj is None:
+        out('null')
+    elif obj is True:
+        out('true')
+    elif obj is False:
+        out('false')
+    elif t is int:
+        out(_int_repr(obj))
+    elif t is float:
+        out(_encode_float(obj))
+    elif t is ObjectId:
+        out('"' + _str(obj) + '"')
+    elif t is datetime.datetime:
+        out('"' + obj.isoformat() + '"')
+    elif isinstance(obj, _STRINGIFIED):
+        out(encode_basestring(_str(obj)))
+    elif isinstance(obj, _ISOFORMAT):
+        out('"' + obj.isoformat() + '"')
+    elif isinstance(obj, dict):
+        _iterencode_dict(obj, out)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        _iterencode_list(obj, out)
+    elif isinstance(obj, str):
+        out(encode_basestring(obj))
+    elif isinstance(obj, int):
+        out(_int_repr(int(obj)))
+    elif isinstance(obj, float):
+        out(_encode_float(float(obj)))
+    else:
+        # Raises TypeError for types DRF cannot encode either
+        _iterencode(_drf_default(obj), out)
+
+
+def _iterencode_dict(obj, out):
+    if not obj:
+        out('{}')
+        return
+    out('{')
+    first = True
+    for key, value in obj.items():
+        if first:
+            first = False
+        else:
+            out(',')
+        if key == '_id':
+            out('"id":')
+            out(encode_basestring(_str(value)))
+            continue
+        out(_encode_key(key))
+        # Strings dominate real documents; skip the dispatch call for them
+        if type(value) is str:
+            out(encode_basestring(value))
+        else:
+            _iterencode(value, out)
+    out('}')
+
+
+def _iterencode_list(obj, out):
+    if not obj:
+        out('[]')
+        return
+    out('[')
+    first = True
+    for value in obj:
+        if first:
+            first = False
+        else:
+            out(',')
+        if type(value) is str:
+            out(encode_basestring(value))
+        else:
+            _iterencode(value, out)
+    out(']')
+
+
+def dumps(obj) -> bytes:
+    """Encode `obj` (raw pymongo documents allowed) as compact UTF-8 JSON bytes."""
+    parts = []
+    _iterencode(obj, parts.append)
+    text = ''.join(parts)
+    # Same as DRF's JSONRenderer: keep the output valid inside <script> tags
+    if '\u2028' in text or '\u2029' in text:
+        text = text.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029')
+    return text.encode('utf-8')
+
+
+def _serialize_value(value):
+    if isinstance(value, _STRINGIFIED):
+        return _str(value)
+    if isinstance(value, _ISOFORMAT):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return serialize_mongo_doc(value)
+    if isinstance(value, (list, tuple)):
+        return [serialize_mongo_doc(item) for item in value]
+    return value
+
+
+def serialize_mongo_doc(doc):
+    """
+    Recursively convert a MongoDB document (or list of documents) into
+    JSON-serializable Python objects, following the same conventions as
+    dumps(). Prefer returning raw documents and letting MongoJSONRenderer
+    encode them; use this when the converted structure is needed in Python.
+    """
+    if type(doc) is list:
+        return [serialize_mongo_doc(item) for item in doc]
+    if not isinstance(doc, dict):
+        return _serialize_value(doc) if doc is not None else None
+    result = {}
+    for k, v in doc.items():
+        t = type(v)
+        if k == '_id':
+            result['id'] = _str(v)
+        elif t is str or t is int or t is float or t is bool or v is None:
+            result[k] = v
+        elif t is dict:
+            result[k] = serialize_mongo_doc(v)
+        elif t is list:
+            result[k] = [
+                item if type(item) is str else serialize_mongo_doc(item)
+                for item in v
+            ]
+        else:
+            result[k] = _serialize_value(v)
+    return result
+
+
+class MongoJSONRenderer(JSONRenderer):
+    """
+    DRF JSON renderer backed by dumps(), so views can hand raw pymongo
+    documents to Response() without converting them first.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        body = dumps(data)
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        if indent:
+            # Pretty output is only used by the browsable API
+            body = json.dumps(json.loads(body), indent=indent, ensure_ascii=False).encode('utf-8')
+        return body
@@ -0,0 +1,580 @@
+import datetime
+import io
+import json
+import queue
+import subprocess
+import sys
+import uuid
+from unittest import mock
+
+from bson.objectid import ObjectId
+from django.conf import settings
+from django.contrib.sessions.backends.base import UpdateError
+from django.core import checks
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from django.utils.translation import gettext_lazy
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+
+from .cache import VersionedCache, content_cache
+from .email_templates import EmailTemplate, TemplateError, email_message
+from .indexes import MONGO_INDEXES, QUERY_SHAPES, _plan_stages, ensure_indexes, missing_indexes
+from .invalidation import CONTENT_COLLECTIONS, InvalidationBus
+from .lookup_keys import lookup_filter, with_lookup_keys
+from .mailer import MongoEmailQueue, StubSender, ThreadEmailQueue, new_job
+from .management.commands.bench_startup import parse_importtime
+from .mongo import MongoLogQueue, PoolStats, get_mongo_client
+from .mongo_sessions import SessionStore, _SessionCache
+from .pagination import decode_cursor, encode_cursor, keyset_filter, parse_fields, parse_limit
+from .responses import cached_json_response
+from .serialization import MongoJSONRenderer, dumps, serialize_mongo_doc
+
+
+def fake_db():
+    db = mock.MagicMock()
+    collections = {}
+    db.__getitem__.side_effect = lambda name: collections.setdefault(name, mock.MagicMock(name=name))
+    return db
+
+
+@override_settings(MONGO_URI='mongodb://db.example:27017', MONGO_RETRY_INTERVAL=30)
+class MongoClientTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.multiple('apps.utils.mongo', _client=None, _client_pid=None, _retry_at=0.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_client_is_created_once_per_process(self):
+        with mock.patch('apps.utils.mongo.pymongo.MongoClient') as client_class:
+            client = get_mongo_client()
+            self.assertIs(get_mongo_client(), client)
+            client_class.assert_called_once()
+            with mock.patch('apps.utils.mongo.os.getpid', return_value=-1):
+                get_mongo_client()
+            self.assertEqual(client_class.call_count, 2)
+        self.assertEqual(client_class.call_args.kwargs['maxPoolSize'], 100)
+
+    def test_failed_connect_is_retried_after_interval(self):
+        with mock.patch('apps.utils.mongo.pymongo.MongoClient') as client_class:
+            client_class.return_value.admin.command.side_effect = RuntimeError('unreachable')
+            self.assertIsNone(get_mongo_client())
+            self.assertIsNone(get_mongo_client())
+            client_class.assert_called_once()
+            client_class.return_value.close.assert_called_once()
+
+    def test_override_and_missing_uri(self):
+        override = mock.MagicMock()
+        with override_settings(MONGO_CLIENT=override):
+            self.assertIs(get_mongo_client(), override)
+        with override_settings(MONGO_URI=None):
+            self.assertIsNone(get_mongo_client())
+
+    def test_pool_stats(self):
+        stats = PoolStats()
+        stats.connection_created(None)
+        stats.connection_checked_out(mock.Mock(duration=0.002))
+        stats.connection_checked_out(mock.Mock(duration=None))
+        stats.connection_checked_in(None)
+        counters = stats.snapshot()
+        self.assertEqual((counters['open'], counters['in_use'], counters['peak_in_use']), (1, 1, 2))
+        self.assertEqual(counters['max_checkout_wait_ms'], 2.0)
+
+
+class MongoLogQueueTests(SimpleTestCase):
+    def log_queue(self, **kwargs):
+        log_queue = MongoLogQueue(**kwargs)
+        # Fill the queue by hand; the flusher thread is not under test
+        log_queue._queue = queue.Queue(maxsize=log_queue.maxsize)
+        patcher = mock.patch.object(log_queue, '_ensure_started')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return log_queue
+
+    def test_flush_writes_one_batch_per_collection(self):
+        log_queue = self.log_queue()
+        for i in range(3):
+            log_queue.put('project_logs', {'i': i})
+        log_queue.put('service_logs', {'i': 3})
+        db = fake_db()
+        with mock.patch('apps.utils.mongo.get_mongo_db', return_value=db):
+            self.assertEqual(log_queue.flush(), 4)
+        db['project_logs'].insert_many.assert_called_once_with([{'i': 0}, {'i': 1}, {'i': 2}], ordered=False)
+        db['service_logs'].insert_many.assert_called_once_with([{'i': 3}], ordered=False)
+        self.assertEqual(log_queue.get_stats()['pending'], 0)
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        log_queue = self.log_queue(maxsize=1, put_timeout=0)
+        self.assertTrue(log_queue.put('project_logs', {'i': 0}))
+        self.assertFalse(log_queue.put('project_logs', {'i': 1}))
+        stats = log_queue.get_stats()
+        self.assertEqual((stats['enqueued'], stats['dropped'], stats['pending']), (1, 1, 1))
+
+    def test_partial_bulk_write_counts_failures(self):
+        log_queue = self.log_queue()
+        for i in range(3):
+            log_queue.put('project_logs', {'i': i})
+        db = fake_db()
+        db['project_logs'].insert_many.side_effect = BulkWriteError({'nInserted': 2, 'writeErrors': [{}]})
+        with mock.patch('apps.utils.mongo.get_mongo_db', return_value=db):
+            self.assertEqual(log_queue.flush(), 2)
+        stats = log_queue.get_stats()
+        self.assertEqual((stats['written'], stats['failed']), (2, 1))
+
+
+class PaginationTests(SimpleTestCase):
+    def test_cursor_round_trip(self):
+        oid = ObjectId()
+        when = datetime.datetime(2025, 1, 2, 3, 4, 5)
+        for doc, expected in (
+            ({'_id': oid, 'created_at': when}, (when, oid)),
+            ({'_id': 'legacy-1', 'created_at': None}, (None, 'legacy-1')),
+        ):
+            with self.subTest(doc=doc):
+                cursor = encode_cursor(doc, 'created_at')
+                self.assertNotIn('=', cursor)
+                self.assertEqual(decode_cursor(cursor), expected)
+
+    def test_bad_cursor_raises_value_error(self):
+        self.assertIsNone(decode_cursor(''))
+        for cursor in ('not-base64!', encode_cursor({}, 'created_at')[:-4], 'e30'):
+            with self.subTest(cursor=cursor), self.assertRaises(ValueError):
+                decode_cursor(cursor)
+
+    def test_keyset_filter(self):
+        oid = ObjectId()
+        when = datetime.datetime(2025, 1, 1)
+        self.assertEqual(keyset_filter('created_at', None), {})
+        self.assertEqual(keyset_filter('created_at', (when, oid)), {'$or': [
+            {'created_at': {'$lt': when}},
+            {'created_at': when, '_id': {'$lt': oid}},
+            {'created_at': None},
+        ]})
+        self.assertEqual(keyset_filter('created_at', (None, oid)), {'created_at': None, '_id': {'$lt': oid}})
+
+    def test_fields_and_limit(self):
+        self.assertEqual(parse_fields(None), (None, None))
+        self.assertEqual(
+            parse_fields('id, title,tags.name', always=('_id', 'created_at')),
+            ({'title': 1, 'tags.name': 1, '_id': 1, 'created_at': 1}, {'id', 'title', 'tags.name'}),
+        )
+        with self.assertRaises(ValueError):
+            parse_fields('title,$where')
+        self.assertEqual(parse_limit('', 50, 100), 50)
+        self.assertEqual(parse_limit('500', 50, 100), 100)
+        self.assertEqual(parse_limit('0', 50, 100), 1)
+        with self.assertRaises(ValueError):
+            parse_limit('ten', 50, 100)
+
+
+class MailerTests(SimpleTestCase):
+    def setUp(self):
+        self.sender = StubSender()
+        self.db = fake_db()
+        for patcher in (
+            mock.patch('apps.utils.mailer.get_sender', return_value=self.sender),
+            mock.patch('apps.utils.mailer.get_mongo_db', return_value=self.db),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def thread_queue(self, max_attempts):
+        email_queue = ThreadEmailQueue(workers=1, max_attempts=max_attempts, retry_base=0)
+        self.addCleanup(email_queue.shutdown, timeout=1)
+        return email_queue
+
+    def test_failed_delivery_is_retried(self):
+        self.sender.fail_next = 2
+        email_queue = self.thread_queue(max_attempts=3)
+        email_queue.put(new_job({'to': ['a@example.com']}, 'contact'))
+        self.assertTrue(email_queue.flush(timeout=5))
+
+        self.assertEqual(self.sender.outbox, [{'to': ['a@example.com']}])
+        stats = email_queue.get_stats()
+        self.assertEqual((stats['sent'], stats['retried'], stats['dead']), (1, 2, 0))
+        self.db['email_dead_letters'].insert_one.assert_not_called()
+
+    def test_exhausted_job_is_dead_lettered(self):
+        self.sender.fail_next = 5
+        email_queue = self.thread_queue(max_attempts=2)
+        email_queue.put(new_job({'to': ['a@example.com']}, 'contact'))
+        self.assertTrue(email_queue.flush(timeout=5))
+
+        self.assertEqual(self.sender.outbox, [])
+        self.assertEqual(email_queue.get_stats()['dead'], 1)
+        dead = self.db['email_dead_letters'].insert_one.call_args.args[0]
+        self.assertEqual((dead['kind'], dead['attempts'], dead['reason']), ('contact', 2, 'Stub sender failure'))
+
+    def test_mongo_queue_retries_then_dead_letters(self):
+        email_queue = MongoEmailQueue(max_attempts=2, retry_base=1)
+        jobs = self.db['email_jobs']
+        # Each claim hands back the job as stored: first try, retry, then a fresh job
+        jobs.find_one_and_update.side_effect = [
+            dict(new_job({'to': ['a@example.com']}, 'newsletter'), _id='job-1', attempts=attempts)
+            for attempts in (0, 1, 0)
+        ]
+        self.sender.fail_next = 2
+
+        self.assertEqual(email_queue.run_once(self.db), 'retry')
+        update = jobs.update_one.call_args.args[1]
+        self.assertEqual((update['$set']['status'], update['$set']['attempts']), ('pending', 1))
+        self.assertEqual(email_queue.run_once(self.db), 'dead')
+        jobs.delete_one.assert_called_once_with({'_id': 'job-1'})
+        self.db['email_dead_letters'].insert_one.assert_called_once()
+        self.assertEqual(email_queue.run_once(self.db), 'sent')
+        self.assertEqual(jobs.delete_one.call_count, 2)
+
+
+class BenchStartupTests(SimpleTestCase):
+    def test_parse_importtime(self):
+        stderr = '\n'.join([
+            'import time: self [us] | cumulative | imported package',
+            'import time:       120 |        120 |   _io',
+            'import time:      2500 |       4100 | django',
+            'import time:       900 |        900 |     apps.chatbot.llm',
+            'Connected to MongoDB',
+        ])
+        self.assertEqual(parse_importtime(stderr), [
+            ('_io', 120, 120, 1), ('django', 2500, 4100, 0), ('apps.chatbot.llm', 900, 900, 2),
+        ])
+
+    def test_openai_is_not_imported_at_startup(self):
+        # The chatbot builds its clients on first use (apps.chatbot.llm)
+        code = "import django, sys; django.setup(); from django.urls import get_resolver; " \
+               "get_resolver().url_patterns; print('openai' in sys.modules)"
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, cwd=settings.BASE_DIR)
+        self.assertEqual(result.stdout.strip().splitlines()[-1], 'False')
+
+
+class SerializationTests(SimpleTestCase):
+    def test_mongo_document(self):
+        oid = ObjectId()
+        doc = {'_id': oid, 'when': datetime.datetime(2025, 1, 2, 3, 4, 5), 'tags': [{'_id': oid}]}
+        expected = {'id': str(oid), 'when': '2025-01-02T03:04:05', 'tags': [{'id': str(oid)}]}
+        self.assertEqual(json.loads(dumps(doc)), expected)
+        self.assertEqual(serialize_mongo_doc(doc), expected)
+
+    def test_other_types_match_drf(self):
+        data = {
+            'lazy': gettext_lazy('Not found.'),
+            'delta': datetime.timedelta(minutes=1),
+            'bytes': b'abc',
+            'uuid': uuid.UUID(int=1),
+            'set': {1},
+        }
+        self.assertEqual(
+            json.loads(MongoJSONRenderer().render(data)),
+            json.loads(JSONRenderer().render(data)),
+        )
+
+    def test_unknown_type_raises_type_error(self):
+        with self.assertRaises(TypeError):
+            dumps({'value': object()})
+
+
+class VersionedCacheTests(SimpleTestCase):
+    def test_entries_live_until_a_dependency_is_bumped(self):
+        cache = VersionedCache()
+        producer = mock.Mock(side_effect=['v1', 'v2', 'v3'])
+        self.assertEqual(cache.get_or_set('combined', ('services', 'technologies'), producer), 'v1')
+        self.assertEqual(cache.get_or_set('combined', ('services', 'technologies'), producer), 'v1')
+        cache.bump('technologies')
+        self.assertEqual(cache.get_or_set('combined', ('services', 'technologies'), producer), 'v2')
+        cache.bump('projects')
+        self.assertEqual(cache.get_or_set('combined', ('services', 'technologies'), producer), 'v2')
+        self.assertEqual(cache.stats, {'hits': 2, 'misses': 2, 'bumps': 2})
+
+    def test_value_loaded_during_a_bump_is_stored_stale(self):
+        cache = VersionedCache()
+        versions = cache.versions(('services',))
+        cache.bump('services')
+        cache.store('list', versions, 'old')
+        self.assertIsNone(cache.lookup('list', cache.versions(('services',))))
+
+    def test_lru_is_bounded(self):
+        cache = VersionedCache(max_entries=2)
+        for key in ('a', 'b', 'c'):
+            cache.store(key, (), key)
+        self.assertIsNone(cache.lookup('a', ()))
+        self.assertEqual(cache.lookup('c', ()), 'c')
+
+    def test_shared_backend_propagates_bumps(self):
+        caches['default'].clear()
+        self.addCleanup(caches['default'].clear)
+        worker_a = VersionedCache(alias='default')
+        worker_b = VersionedCache(alias='default')
+        worker_a.store('list', worker_a.versions(('services',)), 'cached')
+        self.assertEqual(worker_b.lookup('list', worker_b.versions(('services',))), 'cached')
+        worker_a.bump('services')
+        self.assertIsNone(worker_b.lookup('list', worker_b.versions(('services',))))
+
+
+class CachedJsonResponseTests(SimpleTestCase):
+    def setUp(self):
+        content_cache.bump('etag_tests')
+        self.view = mock.Mock(return_value=Response([{'title': 'Hosting'}], headers={'X-Next-Cursor': 'abc'}))
+        self.handler = cached_json_response('etag_tests')(lambda viewset, request: self.view(request))
+        self.factory = APIRequestFactory()
+
+    def test_body_is_encoded_once_and_served_with_etag(self):
+        first = self.handler(None, self.factory.get('/api/etag/'))
+        second = self.handler(None, self.factory.get('/api/etag/'))
+        self.assertEqual(self.view.call_count, 1)
+        self.assertEqual(first.content, b'[{"title":"Hosting"}]')
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertEqual(second['X-Next-Cursor'], 'abc')
+
+    def test_matching_if_none_match_gets_304(self):
+        etag = self.handler(None, self.factory.get('/api/etag/'))['ETag']
+        for header in (etag, f'"other", {etag}', '*'):
+            with self.subTest(header=header):
+                response = self.handler(None, self.factory.get('/api/etag/', HTTP_IF_NONE_MATCH=header))
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response['ETag'], etag)
+        response = self.handler(None, self.factory.get('/api/etag/', HTTP_IF_NONE_MATCH='"other"'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_bump_and_query_string_miss_the_cache(self):
+        self.handler(None, self.factory.get('/api/etag/'))
+        self.handler(None, self.factory.get('/api/etag/?limit=1'))
+        content_cache.bump('etag_tests')
+        self.handler(None, self.factory.get('/api/etag/'))
+        self.assertEqual(self.view.call_count, 3)
+
+    def test_errors_are_not_cached(self):
+        self.view.return_value = Response({'detail': 'Not found.'}, status=404)
+        self.handler(None, self.factory.get('/api/etag/'))
+        response = self.handler(None, self.factory.get('/api/etag/'))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.view.call_count, 2)
+
+
+class EmailTemplateTests(SimpleTestCase):
+    def test_contact_admin_message(self):
+        message = email_message(
+            'contact_admin', ['admin@example.com'], reply_to='eve@example.com',
+            name='Eve\nSmith', email='eve@example.com', message='<script>hi</script>',
+        )
+        self.assertEqual(message['to'], ['admin@example.com'])
+        self.assertEqual(message['reply_to'], 'eve@example.com')
+        self.assertEqual(message['subject'], 'New Contact Form Submission from Eve Smith')
+        self.assertIn('&lt;script&gt;hi&lt;/script&gt;', message['html'])
+        self.assertNotIn('<script>', message['html'])
+
+    def test_html_is_minified_and_year_is_filled_in(self):
+        message = email_message('newsletter_welcome', ['a@example.com'])
+        self.assertNotIn('>\n', message['html'])
+        self.assertIn(f'&copy; {datetime.date.today().year} Zsyio', message['html'])
+        self.assertNotIn('reply_to', message)
+
+    def test_static_template_is_rendered_once_per_year(self):
+        first = email_message('newsletter_welcome', ['a@example.com'])
+        second = email_message('newsletter_welcome', ['b@example.com'], reply_to='c@example.com')
+        self.assertIs(first['html'], second['html'])
+        self.assertEqual((first['to'], second['to']), (['a@example.com'], ['b@example.com']))
+        self.assertNotIn('reply_to', first)
+        self.assertIn('&copy; 1999 Zsyio', email_message('newsletter_welcome', ['a@example.com'], year=1999)['html'])
+
+    def test_clean_values_skip_escaping(self):
+        message = email_message('contact_admin', ['admin@example.com'], name=7, email='eve@example.com', message='Hi  "there"')
+        self.assertEqual(message['subject'], 'New Contact Form Submission from 7')
+        self.assertIn('eve@example.com<br>', message['html'])
+        self.assertIn('Hi  &quot;there&quot;</p>', message['html'])
+
+    def test_template_errors(self):
+        with self.assertRaisesMessage(TemplateError, 'missing message, name'):
+            email_message('contact_admin', ['admin@example.com'], email='eve@example.com')
+        for source in ('<p>{user.name}</p>', '<p>{name!r}</p>', '<p>{name</p>'):
+            with self.subTest(source=source), self.assertRaises(TemplateError):
+                EmailTemplate('bad', 'Zsyio', 'Subject', source)
+
+
+class IndexRegistryTests(SimpleTestCase):
+    specs = [
+        {'app': 'cart', 'collection': 'carts', 'keys': [('user_id', ASCENDING)], 'unique': True},
+        {'app': 'projects', 'collection': 'projects', 'keys': [('created_at', DESCENDING), ('_id', DESCENDING)]},
+    ]
+
+    def test_missing_indexes_compare_key_patterns(self):
+        db = fake_db()
+        db['carts'].list_indexes.return_value = [{'key': {'_id': 1}}, {'key': {'user_id': 1}}]
+        db['projects'].list_indexes.return_value = [{'key': {'created_at': 1, '_id': 1}}]
+        self.assertEqual(missing_indexes(db, self.specs), [self.specs[1]])
+
+    def test_ensure_indexes_creates_with_options_and_reports_errors(self):
+        db = fake_db()
+        db['carts'].list_indexes.return_value = []
+        db['projects'].list_indexes.return_value = []
+        db['projects'].create_index.side_effect = OperationFailure('duplicate key')
+        results = ensure_indexes(db, self.specs)
+        db['carts'].create_index.assert_called_once_with([('user_id', 1)], name='user_id_1', unique=True)
+        self.assertEqual(results, [(self.specs[0], None), (self.specs[1], 'duplicate key')])
+
+    def test_every_query_shape_has_an_index(self):
+        indexed = {spec['collection'] for spec in MONGO_INDEXES}
+        for shape in QUERY_SHAPES:
+            self.assertIn(shape['collection'], indexed)
+
+    def test_index_check_only_runs_on_deploy(self):
+        with mock.patch('apps.utils.mongo.get_mongo_db', return_value=None) as get_db:
+            checks.run_checks(tags=['mongo'])
+            get_db.assert_not_called()
+            checks.run_checks(tags=['mongo'], include_deployment_checks=True)
+            get_db.assert_called_once_with()
+
+    def test_plan_stages(self):
+        plan = {'stage': 'LIMIT', 'inputStage': {'stage': 'FETCH', 'inputStage': {'stage': 'IXSCAN'}}}
+        self.assertEqual(_plan_stages(plan), ['LIMIT', 'FETCH', 'IXSCAN'])
+
+
+class LookupKeyTests(SimpleTestCase):
+    def test_shadow_field_and_filter(self):
+        self.assertEqual(with_lookup_keys('services', {'slug': ' Web-Development '}),
+                         {'slug': ' Web-Development ', 'slug_key': 'web-development'})
+        self.assertEqual(with_lookup_keys('users', {'username': 'x'}), {'username': 'x'})
+        self.assertEqual(lookup_filter('users', 'Someone@Example.com'), {'$or': [
+            {'email': 'Someone@Example.com'}, {'email_key': 'someone@example.com'},
+        ]})
+
+    def test_backfill_only_writes_stale_keys(self):
+        db = fake_db()
+        db['services'].find.return_value = [
+            {'_id': 1, 'slug': 'Hosting'},
+            {'_id': 2, 'slug': 'seo', 'slug_key': 'seo'},
+            {'_id': 3, 'slug': 'Web', 'slug_key': 'old'},
+        ]
+        db['users'].find.return_value = []
+        db['services'].bulk_write.return_value.modified_count = 1
+        with mock.patch('apps.utils.management.commands.backfill_lookup_keys.get_mongo_db', return_value=db):
+            call_command('backfill_lookup_keys', batch_size=1, stdout=io.StringIO())
+
+        self.assertEqual([call.args[0] for call in db['services'].bulk_write.call_args_list], [
+            [UpdateOne({'_id': 1}, {'$set': {'slug_key': 'hosting'}})],
+            [UpdateOne({'_id': 3}, {'$set': {'slug_key': 'web'}})],
+        ])
+        db['users'].bulk_write.assert_not_called()
+
+
+class InvalidationBusPollTests(SimpleTestCase):
+    def poll(self, *fingerprints):
+        bus = InvalidationBus(['projects'], mode='poll', poll_interval=0)
+        remaining = list(fingerprints)
+
+        def fingerprint(coll):
+            value = remaining.pop(0)
+            if not remaining:
+                bus.stop()
+            return value
+
+        with mock.patch.object(bus, '_fingerprint', side_effect=fingerprint):
+            bus._poll(mock.MagicMock())
+        return bus
+
+    def test_fingerprint_includes_latest_updated_at(self):
+        oid = ObjectId()
+        coll = mock.MagicMock()
+        coll.estimated_document_count.return_value = 2
+        coll.find.return_value.sort.return_value.limit.side_effect = [
+            [{'updated_at': datetime.datetime(2025, 1, 2)}], [{'_id': oid}],
+        ]
+        self.assertEqual(InvalidationBus._fingerprint(coll), (2, datetime.datetime(2025, 1, 2), oid))
+
+    def test_poll_sort_fields_are_indexed(self):
+        indexed = {(spec['collection'], spec['keys'][0][0]) for spec in MONGO_INDEXES}
+        for name in CONTENT_COLLECTIONS:
+            self.assertIn((name, 'updated_at'), indexed)
+
+    def test_watcher_errors_are_logged(self):
+        bus = InvalidationBus(['projects'], mode='poll')
+        with mock.patch.object(bus._stopping, 'wait'), self.assertLogs('apps.utils.invalidation', 'WARNING') as logs:
+            bus._error(RuntimeError('down'))
+        self.assertIn('down', logs.output[0])
+        self.assertEqual(bus.stats()['errors'], 1)
+
+    def test_in_place_edit_bumps_version(self):
+        oid = ObjectId()
+        before = content_cache.version('projects')
+        bus = self.poll((2, datetime.datetime(2025, 1, 1), oid), (2, datetime.datetime(2025, 1, 2), oid))
+        self.assertEqual(content_cache.version('projects'), before + 1)
+        self.assertEqual(bus.stats()['bumps'], 1)
+
+    def test_change_stream_events_bump_their_collection(self):
+        bus = InvalidationBus(['projects', 'services'], mode='change_stream')
+        events = iter([
+            {'_id': {'_data': '01'}, 'ns': {'coll': 'projects'}, 'operationType': 'update'},
+            None,
+            {'_id': {'_data': '02'}, 'ns': {'coll': 'services'}, 'operationType': 'invalidate'},
+        ])
+        stream = mock.MagicMock(alive=True)
+
+        def try_next():
+            event = next(events, None)
+            if event is not None and event['_id']['_data'] == '02':
+                bus.stop()
+            return event
+
+        stream.try_next.side_effect = try_next
+        db = mock.MagicMock()
+        db.watch.return_value.__enter__.return_value = stream
+        before = content_cache.versions(('projects', 'services'))
+        bus._watch(db)
+
+        self.assertEqual(content_cache.versions(('projects', 'services')), (before[0] + 2, before[1] + 1))
+        self.assertEqual(bus.stats()['events'], 2)
+        self.assertIsNone(bus._resume_token)
+
+    def test_unchanged_collection_is_not_bumped(self):
+        oid = ObjectId()
+        before = content_cache.version('projects')
+        bus = self.poll((2, datetime.datetime(2025, 1, 1), oid), (2, datetime.datetime(2025, 1, 1), oid))
+        self.assertEqual(content_cache.version('projects'), before)
+        self.assertEqual(bus.stats()['bumps'], 0)
+
+
+class MongoSessionStoreTests(SimpleTestCase):
+    def setUp(self):
+        self.coll = mock.MagicMock()
+        db = mock.MagicMock()
+        db.__getitem__.return_value = self.coll
+        for patcher in (
+            mock.patch('apps.utils.mongo_sessions.get_mongo_db', return_value=db),
+            mock.patch('apps.utils.mongo_sessions._cache', _SessionCache()),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_create_retries_on_duplicate_key(self):
+        self.coll.insert_one.side_effect = [DuplicateKeyError('dup'), None]
+        session = SessionStore()
+        session['cart'] = 1
+        session.save()
+        self.assertEqual(self.coll.insert_one.call_count, 2)
+        self.assertEqual(self.coll.insert_one.call_args.args[0]['_id'], session.session_key)
+
+    def test_load_is_cached_after_save(self):
+        session = SessionStore()
+        session['cart'] = 1
+        session.save()
+        self.assertEqual(SessionStore(session.session_key)['cart'], 1)
+        self.coll.find_one.assert_not_called()
+
+    def test_save_updates_without_upsert(self):
+        self.coll.update_one.return_value.matched_count = 1
+        session = SessionStore('k' * 32)
+        session._session_cache = {'cart': 2}
+        session.save()
+        self.assertNotIn('upsert', self.coll.update_one.call_args.kwargs)
+
+    def test_save_of_deleted_session_raises_update_error(self):
+        self.coll.update_one.return_value.matched_count = 0
+        session = SessionStore('k' * 32)
+        session._session_cache = {'cart': 2}
+        with self.assertRaises(UpdateError):
+            session.save()
+        self.coll.find_one.return_value = None
+        self.assertFalse(SessionStore('k' * 32).exists('k' * 32))
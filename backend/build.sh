@@ -11,4 +11,15 @@ python manage.py collectstatic --no-input
 # python manage.py migrate
 
 # Create superuser is handled by our direct MongoDB seeding / auto-seed on login
-# python create_superuser.py
\ No newline at end of file
+# python create_superuser.py
+
+# Fill normalized lookup keys (users.email_key, services.slug_key) before
+# the unique indexes on them are built. Logins match on email_key and fall
+# back to an exact match on email, so users not yet backfilled can still
+# log in (with exact case). Cart service lookups go through the in-memory
+# table in apps.services.lookup, which normalizes slug itself
+# (safe to re-run)
+python manage.py backfill_lookup_keys
+
+# Create MongoDB indexes declared in apps/utils/indexes.py (safe to re-run)
+python manage.py ensure_indexes
\ No newline at end of file
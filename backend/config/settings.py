@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
 import os
+import json
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -82,6 +83,13 @@ CORS_ALLOW_HEADERS = [
     'x-requested-with',
 ]
 
+# Let the SPA read conditional-request and pagination headers
+CORS_EXPOSE_HEADERS = [
+    'ETag',
+    'Link',
+    'X-Next-Cursor',
+]
+
 CORS_ALLOW_METHODS = [
     'DELETE',
     'GET',
@@ -122,6 +130,7 @@ INSTALLED_APPS = [
     'apps.theme',
     'apps.colors',
     'apps.newsletter',
+    'apps.utils',
 ]
 
 MIDDLEWARE = [
@@ -134,6 +143,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'apps.utils.middleware.InvalidationBusMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -191,24 +201,87 @@ DATABASES = {
     }
 }
 
-import pymongo
+# Django sessions are stored in MongoDB (apps.utils.mongo_sessions); the
+# SQL-backed default cannot work on the mongodb_mock engine. Sessions read
+# within SESSION_CACHE_TTL seconds are served from a per-process cache.
+SESSION_ENGINE = os.getenv('SESSION_ENGINE', 'apps.utils.mongo_sessions')
+SESSION_CACHE_TTL = int(os.getenv('SESSION_CACHE_TTL', '30'))
+SESSION_CACHE_MAX_ENTRIES = int(os.getenv('SESSION_CACHE_MAX_ENTRIES', '10000'))
+
+# The MongoClient itself is created lazily, once per process, by
+# apps.utils.mongo.get_mongo_client(); nothing connects at import time.
 MONGO_URI = os.getenv("MONGO_URI")
-if MONGO_URI:
-    try:
-        MONGO_CLIENT = pymongo.MongoClient(
-            MONGO_URI, 
-            serverSelectionTimeoutMS=5000, 
-            tlsAllowInvalidCertificates=True
-        )
-        # Verify connection
-        MONGO_CLIENT.admin.command('ismaster')
-        print("MongoDB Connected Successfully")
-    except Exception as e:
-        print(f"MongoDB Connection Failed: {e}")
-        MONGO_CLIENT = None
-else:
-    print("MONGO_URI not set (skipping MongoDB connection)")
-    MONGO_CLIENT = None
+MONGO_MAX_POOL_SIZE = int(os.getenv('MONGO_MAX_POOL_SIZE', '100'))
+MONGO_MIN_POOL_SIZE = int(os.getenv('MONGO_MIN_POOL_SIZE', '0'))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv('MONGO_MAX_IDLE_TIME_MS', '0')) or None
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000'))
+# Seconds before retrying after a failed connection attempt
+MONGO_RETRY_INTERVAL = int(os.getenv('MONGO_RETRY_INTERVAL', '30'))
+
+# Serve the high-traffic GET endpoints from async views (apps.utils.async_views).
+# Only enable when running under ASGI: uvicorn config.asgi:application
+ASYNC_MONGO_VIEWS = os.getenv('ASYNC_MONGO_VIEWS', 'False') == 'True'
+
+# Write-behind queue for apps.utils.mongo.mongo_log (audit/activity logs)
+MONGO_LOG_ASYNC = os.getenv('MONGO_LOG_ASYNC', 'True') == 'True'
+MONGO_LOG_QUEUE_SIZE = int(os.getenv('MONGO_LOG_QUEUE_SIZE', '10000'))
+MONGO_LOG_BATCH_SIZE = int(os.getenv('MONGO_LOG_BATCH_SIZE', '500'))
+MONGO_LOG_FLUSH_INTERVAL = float(os.getenv('MONGO_LOG_FLUSH_INTERVAL', '1.0'))
+MONGO_LOG_PUT_TIMEOUT = float(os.getenv('MONGO_LOG_PUT_TIMEOUT', '0.05'))
+
+# Versioned read-through cache for catalog/content endpoints (apps.utils.cache).
+# Set CONTENT_CACHE_ALIAS to a CACHES alias (e.g. Redis) to share versions
+# and payloads between gunicorn workers.
+CONTENT_CACHE_ALIAS = os.getenv('CONTENT_CACHE_ALIAS') or None
+CONTENT_CACHE_TIMEOUT = int(os.getenv('CONTENT_CACHE_TIMEOUT', '300'))
+CONTENT_CACHE_MAX_ENTRIES = int(os.getenv('CONTENT_CACHE_MAX_ENTRIES', '256'))
+# Per-worker watcher that bumps content_cache when a content collection changes
+# (apps.utils.invalidation): 'auto' | 'change_stream' | 'poll' | 'off'
+CACHE_INVALIDATION_MODE = os.getenv('CACHE_INVALIDATION_MODE', 'auto')
+# Poll mode runs 3 queries per content collection per interval in every worker
+CACHE_INVALIDATION_POLL_INTERVAL = float(os.getenv('CACHE_INVALIDATION_POLL_INTERVAL', '5.0'))
+
+# Keyset pagination for /api/projects/ (only when the client sends limit or cursor)
+PROJECTS_PAGE_SIZE = int(os.getenv('PROJECTS_PAGE_SIZE', '50'))
+PROJECTS_MAX_PAGE_SIZE = int(os.getenv('PROJECTS_MAX_PAGE_SIZE', '100'))
+
+# In-memory slug -> service table (apps.services.lookup); seconds before a forced reload
+SERVICE_INDEX_MAX_AGE = int(os.getenv('SERVICE_INDEX_MAX_AGE', '300'))
+
+# Estimation rules snapshot (apps.estimation.rules); seconds before a background reload
+ESTIMATION_RULES_MAX_AGE = int(os.getenv('ESTIMATION_RULES_MAX_AGE', '300'))
+ESTIMATE_MAX_BATCH = int(os.getenv('ESTIMATE_MAX_BATCH', '100'))
+ESTIMATE_MAX_SWEEP_POINTS = int(os.getenv('ESTIMATE_MAX_SWEEP_POINTS', '10000'))
+
+# Chatbot LLM routes and connection pool (apps.chatbot.llm).
+# CHATBOT_ROUTES is JSON merged over the defaults, e.g.
+# '{"chat": {"models": {"openai": "gpt-4o-mini"}, "timeout": 20}}'
+OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+CHATBOT_ROUTES = json.loads(os.getenv('CHATBOT_ROUTES') or '{}')
+CHATBOT_HTTP_MAX_CONNECTIONS = int(os.getenv('CHATBOT_HTTP_MAX_CONNECTIONS', '20'))
+CHATBOT_HTTP_MAX_KEEPALIVE = int(os.getenv('CHATBOT_HTTP_MAX_KEEPALIVE', '10'))
+CHATBOT_HTTP_KEEPALIVE_EXPIRY = float(os.getenv('CHATBOT_HTTP_KEEPALIVE_EXPIRY', '60'))
+
+# Reply cache for repeated chatbot questions (apps.chatbot.reply_cache).
+# CHATBOT_CACHE_SEMANTIC adds the local vector-similarity tier (needs numpy).
+CHATBOT_CACHE_MAX_ENTRIES = int(os.getenv('CHATBOT_CACHE_MAX_ENTRIES', '1000'))
+CHATBOT_CACHE_TTL = int(os.getenv('CHATBOT_CACHE_TTL', '86400'))
+CHATBOT_CACHE_SEMANTIC = os.getenv('CHATBOT_CACHE_SEMANTIC', 'False') == 'True'
+CHATBOT_CACHE_SIMILARITY = float(os.getenv('CHATBOT_CACHE_SIMILARITY', '0.92'))
+CHATBOT_CACHE_WARM = int(os.getenv('CHATBOT_CACHE_WARM', '500'))
+
+# Catalog snippets injected into chatbot prompts (apps.chatbot.retrieval)
+CHATBOT_CONTEXT_TOP_K = int(os.getenv('CHATBOT_CONTEXT_TOP_K', '4'))
+CHATBOT_INDEX_MAX_AGE = int(os.getenv('CHATBOT_INDEX_MAX_AGE', '300'))
+CHATBOT_INDEX_MAX_PROJECTS = int(os.getenv('CHATBOT_INDEX_MAX_PROJECTS', '500'))
+
+# Chat sessions (apps.chatbot.sessions): prompt budget in estimated tokens
+CHATBOT_SESSION_TOKEN_BUDGET = int(os.getenv('CHATBOT_SESSION_TOKEN_BUDGET', '1500'))
+CHATBOT_SESSION_SUMMARY_BUDGET = int(os.getenv('CHATBOT_SESSION_SUMMARY_BUDGET', '300'))
+CHATBOT_SESSION_CACHE_SIZE = int(os.getenv('CHATBOT_SESSION_CACHE_SIZE', '1000'))
+
+# Warn in `manage.py check --deploy` about indexes missing from apps.utils.indexes
+MONGO_INDEX_CHECK = os.getenv('MONGO_INDEX_CHECK', 'True') == 'True'
 
 
 # Password validation
@@ -271,8 +344,13 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.AllowAny',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-    )
+        'apps.authentication.authentication.MongoJWTAuthentication',
+    ),
+    # Encodes raw pymongo documents (ObjectId, datetime, Decimal128) directly
+    'DEFAULT_RENDERER_CLASSES': [
+        'apps.utils.serialization.MongoJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
 from datetime import timedelta
@@ -286,10 +364,25 @@ SIMPLE_JWT = {
     'SIGNING_KEY': os.getenv('JWT_SECRET_KEY') or SECRET_KEY,
 }
 
+# MongoJWTAuthentication re-checks the user's document (is_active) at most
+# once per JWT_USER_CACHE_TTL seconds per worker; 0 entries = claims only.
+JWT_USER_CACHE_SIZE = int(os.getenv('JWT_USER_CACHE_SIZE', '1000'))
+JWT_USER_CACHE_TTL = int(os.getenv('JWT_USER_CACHE_TTL', '300'))
+
 RESEND_API_KEY = os.getenv('RESEND_API_KEY')
 RESEND_FROM_EMAIL = os.getenv('RESEND_FROM_EMAIL')
 RESEND_ADMIN_EMAIL = os.getenv('RESEND_ADMIN_EMAIL')
 
+# Outbound email queue (apps.utils.mailer).
+# EMAIL_QUEUE_BACKEND: 'thread' | 'mongo' (run `manage.py run_email_worker`) | 'sync'
+# EMAIL_SENDER: 'resend' | 'stub' (records messages in memory, for tests)
+EMAIL_QUEUE_BACKEND = os.getenv('EMAIL_QUEUE_BACKEND', 'thread')
+EMAIL_SENDER = os.getenv('EMAIL_SENDER', 'resend')
+EMAIL_WORKERS = int(os.getenv('EMAIL_WORKERS', '2'))
+EMAIL_MAX_ATTEMPTS = int(os.getenv('EMAIL_MAX_ATTEMPTS', '5'))
+EMAIL_RETRY_BASE = float(os.getenv('EMAIL_RETRY_BASE', '2.0'))
+EMAIL_QUEUE_SIZE = int(os.getenv('EMAIL_QUEUE_SIZE', '1000'))
+
 APPEND_SLASH = True
 
 # Cloudinary Configuration